@@ -5,13 +5,63 @@ A powerful AI-powered research tool using GPT-4, LangGraph, and RAG
 
 import streamlit as st
 from datetime import datetime
+import queue
+import threading
 import time
-from src.graph.workflow import build_research_graph
-from src.agents.synthesizer import SynthesizerAgent
+import uuid
+from src.graph.workflow import get_research_graph, with_url_registry
+from src.agents.pool import agent_pool
 from src.utils.logging import setup_logger
+from src.utils.tracing import start_trace
 
 logger = setup_logger(__name__)
 
+
+def stream_research(graph, initial_state):
+    """
+    Run the research graph in a worker thread and yield its events.
+    
+    Streamlit can only draw from the script thread, so node updates and
+    report tokens are handed over through a queue.
+    
+    Yields:
+        ('update', {node_name: node_output}) or ('token', text)
+    """
+    events = queue.Queue()
+    
+    def run():
+        try:
+            config = with_url_registry(
+                {'configurable': {'on_token': lambda token: events.put(('token', token))}}
+            )
+            with start_trace(str(uuid.uuid4())):
+                for state_update in graph.stream(initial_state, config=config):
+                    events.put(('update', state_update))
+        except Exception as e:
+            events.put(('error', e))
+        finally:
+            events.put(('done', None))
+    
+    threading.Thread(target=run, daemon=True).start()
+    
+    while True:
+        kind, payload = events.get()
+        if kind == 'done':
+            return
+        if kind == 'error':
+            raise payload
+        yield kind, payload
+
+
+@st.cache_resource(show_spinner="Loading research agents...")
+def load_research_graph():
+    """Warm up the shared agents and compile the graph once per server process."""
+    agent_pool.warm_up()
+    # Keep old session collections from piling up on disk
+    agent_pool.synthesizer.retriever.vector_store.lifecycle.start_background_gc()
+    return get_research_graph()
+
+
 # Page configuration
 st.set_page_config(
     page_title="Autonomous Research Assistant",
@@ -20,6 +70,9 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Pay agent and client startup once, before the first research request
+load_research_graph()
+
 # Custom CSS for better styling
 st.markdown("""
 <style>
@@ -87,6 +140,8 @@ if 'subtopics' not in st.session_state:
     st.session_state.subtopics = []
 if 'start_time' not in st.session_state:
     st.session_state.start_time = None
+if 'timings' not in st.session_state:
+    st.session_state.timings = {}
 
 # Sidebar
 with st.sidebar:
@@ -123,6 +178,21 @@ with st.sidebar:
             if st.session_state.start_time:
                 elapsed = int(time.time() - st.session_state.start_time)
                 st.metric("Time", f"{elapsed}s")
+        
+        if st.session_state.timings:
+            with st.expander("⏱️ Stage timings"):
+                for stage, stats in sorted(
+                    st.session_state.timings.items(),
+                    key=lambda item: item[1]['total_ms'],
+                    reverse=True
+                ):
+                    st.markdown(f"**{stage}**: {stats['total_ms'] / 1000:.1f}s ({int(stats['count'])}×)")
+        
+        with st.expander("🗄️ Vector store"):
+            storage = agent_pool.synthesizer.retriever.vector_store.lifecycle.stats()
+            st.markdown(f"**Collections**: {storage['collections']}")
+            st.markdown(f"**On disk**: {storage['bytes_on_disk'] / 2**20:.1f} MB")
+            st.markdown(f"**Evicted**: {storage['evicted']}")
     
     st.markdown("## 💡 Tips")
     st.markdown("""
@@ -148,6 +218,7 @@ if st.session_state.research_complete:
             st.session_state.logs = []
             st.session_state.documents_count = 0
             st.session_state.subtopics = []
+            st.session_state.timings = {}
             st.session_state.start_time = None
             if 'selected_topic' in st.session_state:
                 del st.session_state.selected_topic
@@ -204,6 +275,7 @@ if not st.session_state.research_complete:
         st.session_state.start_time = time.time()
         st.session_state.research_complete = False
         st.session_state.logs = []
+        st.session_state.documents_count = 0
         
         # Progress section
         st.markdown("### 🔄 Research in Progress")
@@ -211,12 +283,13 @@ if not st.session_state.research_complete:
         progress_bar = st.progress(0)
         status_placeholder = st.empty()
         logs_placeholder = st.empty()
+        report_placeholder = st.empty()
         
         try:
-            # Build graph
+            # Get the shared compiled graph
             status_placeholder.info("🔧 Initializing research workflow...")
             progress_bar.progress(5)
-            graph = build_research_graph()
+            graph = load_research_graph()
             
             # Initialize state
             initial_state = {
@@ -226,6 +299,10 @@ if not st.session_state.research_complete:
                 'subtopics': [],
                 'search_queries': [],
                 'session_id': '',
+                'indexed_count': 0,
+                'iteration': 1,
+                'executed_queries': [],
+                'new_documents': 0,
                 'report': '',
                 'sources': [],
                 'status': 'initialized',
@@ -237,9 +314,15 @@ if not st.session_state.research_complete:
             progress_bar.progress(15)
             time.sleep(0.5)
             
-            # Stream through workflow
+            # Stream through workflow (node updates and report tokens)
             final_state = None
-            for state_update in graph.stream(initial_state):
+            streamed_report = ""
+            for kind, state_update in stream_research(graph, initial_state):
+                if kind == 'token':
+                    streamed_report += state_update
+                    report_placeholder.markdown(streamed_report + "▌")
+                    continue
+                
                 # LangGraph stream returns dict with node_name: state_updates
                 for node_name, node_output in state_update.items():
                     
@@ -254,21 +337,41 @@ if not st.session_state.research_complete:
                                 st.session_state.logs.extend(node_output['logs'])
                         
                         elif status == 'research_complete':
-                            status_placeholder.success("✓ Documents collected!")
+                            status_placeholder.success("✓ Documents collected! Writing report...")
                             progress_bar.progress(70)
                             if 'logs' in node_output:
                                 st.session_state.logs.extend(node_output['logs'])
                             if 'documents' in node_output:
-                                st.session_state.documents_count = len(node_output['documents'])
+                                st.session_state.documents_count += len(node_output['documents'])
+                        
+                        elif status == 'refining':
+                            # Gap analysis found holes; the report is rewritten next pass
+                            status_placeholder.info(
+                                f"🔁 Refining research (pass {node_output.get('iteration', 2)})..."
+                            )
+                            progress_bar.progress(50)
+                            streamed_report = ""
+                            if 'logs' in node_output:
+                                st.session_state.logs.extend(node_output['logs'])
                         
                         elif status == 'complete':
                             status_placeholder.success("✓ Report generated!")
                             progress_bar.progress(100)
+                            report_placeholder.markdown(node_output.get('report', streamed_report))
                             if 'logs' in node_output:
                                 st.session_state.logs.extend(node_output['logs'])
                             # Store the complete state
                             final_state = node_output
                     
+                    # Nodes that don't set a status (parallel executor branches, final gap analysis)
+                    elif isinstance(node_output, dict):
+                        if 'logs' in node_output:
+                            st.session_state.logs.extend(node_output['logs'])
+                        if node_name.startswith('executor'):
+                            status_placeholder.success("✓ Documents collected! Writing report...")
+                            progress_bar.progress(70)
+                            st.session_state.documents_count += len(node_output.get('documents', []))
+                    
                     # Display logs after each node
                     if st.session_state.logs:
                         logs_html = "<div class='activity-log'>"
@@ -289,6 +392,7 @@ if not st.session_state.research_complete:
             st.session_state.sources = final_state.get('sources', [])
             st.session_state.session_id = final_state.get('session_id', '')
             st.session_state.subtopics = final_state.get('subtopics', [])
+            st.session_state.timings = final_state.get('timings', {})
             st.session_state.research_complete = True
             
             time.sleep(0.5)
@@ -358,10 +462,10 @@ if st.session_state.research_complete and st.session_state.report:
     if ask_button and question:
         with st.spinner("Analyzing documents..."):
             try:
-                synthesizer = SynthesizerAgent()
-                answer = synthesizer.answer_question(
+                answer = agent_pool.synthesizer.answer_question(
                     question=question,
-                    session_id=st.session_state.session_id
+                    session_id=st.session_state.session_id,
+                    sources=st.session_state.sources
                 )
                 
                 st.markdown("#### Answer:")
@@ -384,6 +488,7 @@ if st.session_state.research_complete and st.session_state.report:
             st.session_state.logs = []
             st.session_state.documents_count = 0
             st.session_state.subtopics = []
+            st.session_state.timings = {}
             st.session_state.start_time = None
             if 'selected_topic' in st.session_state:
                 del st.session_state.selected_topic
@@ -0,0 +1 @@
+"""Offline benchmark suite: local stand-ins for the LLM, search, embedding and web services."""
@@ -0,0 +1,148 @@
+"""Generated HTML corpus served over local HTTP for offline scraping."""
+
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import zlib
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+# Words the generated pages are written with
+VOCABULARY = (
+    "model data system research network learning energy market policy health "
+    "climate patient quantum battery vehicle sensor protein genome language "
+    "robot supply chain security privacy cloud edge compute storage grid "
+    "solar carbon finance risk regulation adoption clinical trial accuracy "
+    "latency throughput benchmark dataset training inference deployment "
+    "evaluation survey analysis trend growth impact cost efficiency scale"
+).split()
+
+
+class _CorpusHandler(SimpleHTTPRequestHandler):
+    """Static file handler with optional response delay and no access log."""
+    
+    latency_ms = 0.0
+    
+    def do_GET(self):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        super().do_GET()
+    
+    def log_message(self, format, *args):
+        pass
+
+
+class LocalCorpus:
+    """
+    A directory of generated article pages served on 127.0.0.1.
+    
+    Use as a context manager, or call start() and stop().
+    """
+    
+    def __init__(
+        self,
+        pages: int = 200,
+        words_per_page: int = 1200,
+        latency_ms: float = 0.0,
+        seed: int = 0
+    ):
+        """
+        Generate the corpus.
+        
+        Args:
+            pages: Number of pages
+            words_per_page: Article length
+            latency_ms: Delay before each HTTP response
+            seed: Seed for the generated text
+        """
+        self.pages = pages
+        self.words_per_page = words_per_page
+        self.latency_ms = latency_ms
+        self.root = tempfile.mkdtemp(prefix="bench-corpus-")
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._snippets: List[str] = []
+        self._generate(random.Random(seed))
+    
+    def start(self) -> "LocalCorpus":
+        """Start serving on an ephemeral port."""
+        handler = type("Handler", (_CorpusHandler,), {'latency_ms': self.latency_ms})
+        self._server = ThreadingHTTPServer(
+            ("127.0.0.1", 0), partial(handler, directory=self.root)
+        )
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self) -> None:
+        """Stop the server and delete the generated pages."""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        shutil.rmtree(self.root, ignore_errors=True)
+    
+    def __enter__(self) -> "LocalCorpus":
+        return self.start()
+    
+    def __exit__(self, *exc) -> None:
+        self.stop()
+    
+    @property
+    def base_url(self) -> str:
+        """Root URL of the running server."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def url(self, page: int) -> str:
+        """URL of a page."""
+        return f"{self.base_url}/page-{page}.html"
+    
+    def title(self, page: int) -> str:
+        """Title of a page."""
+        return f"Article {page}"
+    
+    def snippet(self, page: int) -> str:
+        """Search-result snippet of a page."""
+        return self._snippets[page]
+    
+    def pages_for(self, query: str, count: int) -> List[int]:
+        """
+        Pages a query hashes to (stable across runs).
+        
+        Args:
+            query: Search query
+            count: Number of pages
+            
+        Returns:
+            Consecutive page numbers starting at the query's hash
+        """
+        start = zlib.crc32(query.lower().encode()) % self.pages
+        return [(start + i) % self.pages for i in range(min(count, self.pages))]
+    
+    def _generate(self, rng: random.Random) -> None:
+        """Write page-<n>.html files with boilerplate around an article."""
+        for page in range(self.pages):
+            paragraphs = []
+            remaining = self.words_per_page
+            while remaining > 0:
+                length = min(remaining, rng.randint(60, 120))
+                words = [rng.choice(VOCABULARY) for _ in range(length)]
+                paragraphs.append(" ".join(words).capitalize() + ".")
+                remaining -= length
+            
+            self._snippets.append(paragraphs[0][:200])
+            body = "\n".join(f"<p>{p}</p>" for p in paragraphs)
+            html = (
+                f"<html><head><title>{self.title(page)}</title></head><body>"
+                f"<nav><a href='/'>Home</a> <a href='/about'>About</a></nav>"
+                f"<article><h1>{self.title(page)}</h1>\n{body}\n</article>"
+                f"<footer>Copyright benchmark corpus</footer></body></html>"
+            )
+            with open(os.path.join(self.root, f"page-{page}.html"), 'w', encoding='utf-8') as f:
+                f.write(html)
@@ -0,0 +1,401 @@
+"""
+Offline end-to-end benchmarks for research runs and Q&A.
+
+OpenAI chat, OpenAI embeddings and Tavily are replaced by local stubs
+(benchmarks/stubs.py) with configurable latency and failure injection;
+pages are scraped over real HTTP from a generated local corpus. Each
+scenario drives run_research (or SynthesizerAgent.answer_question) at a
+given workload and concurrency and reports p50/p95 latency, throughput
+and memory, overall and per stage, against a stored baseline.
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --topics 1,8 --concurrency 1,4 --questions 16
+    python benchmarks/run_benchmarks.py --save-baseline   # record new reference numbers
+
+Memory is tracked with tracemalloc, which also slows Python code down;
+compare only against baselines recorded with the same options (the
+baseline stores them and a mismatch is reported).
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Add parent directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# Settings require API keys; the stubs never use them
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("TAVILY_API_KEY", "tvly-benchmark")
+
+from benchmarks.corpus import LocalCorpus
+from benchmarks.stubs import StubProfile, install_stubs
+from src.utils.config import settings
+from src.utils.tracing import start_trace
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+
+TOPICS = [
+    "Impact of artificial intelligence on healthcare",
+    "Solid-state battery commercialization",
+    "Quantum computing error correction",
+    "Carbon capture economics",
+    "Edge computing for autonomous vehicles",
+    "Privacy risks of large language models",
+    "Supply chain resilience after the pandemic",
+    "Gene editing in agriculture",
+]
+
+QUESTIONS = [
+    "What are the main findings?",
+    "Which risks are mentioned most often?",
+    "How does adoption differ across industries?",
+    "What do the sources say about cost?",
+    "What is the outlook for the next five years?",
+    "Where do the sources disagree?",
+]
+
+# Metrics where a higher value is an improvement
+HIGHER_IS_BETTER = {'throughput_per_s'}
+
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    Linear-interpolated percentile.
+    
+    Args:
+        values: Samples
+        q: Percentile in [0, 100]
+        
+    Returns:
+        Percentile value (0.0 for no samples)
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def stage_stats(traces) -> Dict[str, Dict[str, float]]:
+    """
+    Per-stage latency and memory percentiles across traces.
+    
+    Args:
+        traces: Traces of the scenario's runs
+        
+    Returns:
+        Dict mapping span name -> count, p50_ms, p95_ms, p50_alloc_kb
+    """
+    durations: Dict[str, List[float]] = {}
+    allocations: Dict[str, List[float]] = {}
+    for trace in traces:
+        for record in trace.spans:
+            durations.setdefault(record['name'], []).append(record['duration_ms'])
+            if 'alloc_kb' in record:
+                allocations.setdefault(record['name'], []).append(record['alloc_kb'])
+    
+    return {
+        name: {
+            'count': len(samples),
+            'p50_ms': round(percentile(samples, 50), 1),
+            'p95_ms': round(percentile(samples, 95), 1),
+            'p50_alloc_kb': round(percentile(allocations.get(name, []), 50), 1),
+        }
+        for name, samples in sorted(durations.items())
+    }
+
+
+def measure(jobs: List, run_one, concurrency: int) -> Tuple[Dict, List]:
+    """
+    Run jobs on a thread pool, each in its own trace.
+    
+    Args:
+        jobs: Job arguments
+        run_one: Callable(job) -> True on success
+        concurrency: Worker threads
+        
+    Returns:
+        (metrics dict, list of job results)
+    """
+    def timed(job):
+        with start_trace(str(uuid.uuid4())) as trace:
+            start = time.perf_counter()
+            try:
+                result = run_one(job)
+            except Exception as e:
+                result = e
+            latency_ms = (time.perf_counter() - start) * 1000
+        return latency_ms, trace, result
+    
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bench") as pool:
+        outcomes = list(pool.map(timed, jobs))
+    wall_s = time.perf_counter() - wall_start
+    
+    latencies = [latency for latency, _, _ in outcomes]
+    results = [result for _, _, result in outcomes]
+    errors = sum(1 for r in results if isinstance(r, Exception) or r is False)
+    
+    metrics = {
+        'jobs': len(jobs),
+        'concurrency': concurrency,
+        'errors': errors,
+        'wall_s': round(wall_s, 2),
+        'throughput_per_s': round(len(jobs) / wall_s, 3),
+        'p50_ms': round(percentile(latencies, 50), 1),
+        'p95_ms': round(percentile(latencies, 95), 1),
+        'peak_mb': round(tracemalloc.get_traced_memory()[1] / 2**20, 1) if tracemalloc.is_tracing() else 0.0,
+        'stages': stage_stats([trace for _, trace, _ in outcomes]),
+    }
+    return metrics, results
+
+
+def benchmark_research(topics: int, concurrency: int) -> Tuple[Dict, List[str]]:
+    """
+    Run `topics` research runs with the given concurrency.
+    
+    Returns:
+        (metrics, session IDs of completed runs)
+    """
+    from src.graph.workflow import run_research
+    
+    jobs = [
+        TOPICS[i % len(TOPICS)] + (f" (part {i // len(TOPICS) + 1})" if i >= len(TOPICS) else "")
+        for i in range(topics)
+    ]
+    metrics, states = measure(jobs, run_research, concurrency)
+    
+    failed = [s for s in states if isinstance(s, Exception) or s.get('status') != 'complete']
+    metrics['errors'] = len(failed)
+    sessions = [s['session_id'] for s in states if s not in failed and s.get('session_id')]
+    return metrics, sessions
+
+
+def benchmark_qa(session_ids: List[str], questions: int, concurrency: int) -> Dict:
+    """Ask `questions` questions spread over the given sessions."""
+    from src.agents.pool import agent_pool
+    
+    jobs = [
+        (QUESTIONS[i % len(QUESTIONS)], session_ids[i % len(session_ids)])
+        for i in range(questions)
+    ]
+    metrics, _ = measure(
+        jobs, lambda job: bool(agent_pool.synthesizer.answer_question(*job)), concurrency
+    )
+    return metrics
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float, min_delta_ms: float) -> List[str]:
+    """
+    List regressions of more than `tolerance` against the baseline.
+    
+    Stages are compared on p50 only; their p95 over a handful of spans
+    is too noisy to gate on.
+    
+    Args:
+        results: Scenario name -> metrics
+        baseline: Stored results (same shape)
+        tolerance: Allowed relative slowdown, e.g. 0.25
+        min_delta_ms: Latency changes smaller than this are ignored
+        
+    Returns:
+        Human-readable regression lines
+    """
+    regressions = []
+    for scenario, metrics in results.items():
+        reference = baseline.get(scenario)
+        if not reference:
+            continue
+        
+        pairs = [(key, metrics[key], reference.get(key)) for key in ('p50_ms', 'p95_ms', 'throughput_per_s', 'peak_mb')]
+        for stage, stats in metrics['stages'].items():
+            ref_stats = reference.get('stages', {}).get(stage, {})
+            pairs.append((f"{stage}.p50_ms", stats['p50_ms'], ref_stats.get('p50_ms')))
+        
+        for key, value, ref in pairs:
+            if not ref or (key.endswith('_ms') and abs(value - ref) < min_delta_ms):
+                continue
+            change = (value - ref) / ref
+            if key in HIGHER_IS_BETTER:
+                change = -change
+            if change > tolerance:
+                regressions.append(f"{scenario}: {key} {ref} -> {value} ({change:+.0%})")
+    return regressions
+
+
+def print_report(results: Dict, baseline: Dict) -> None:
+    """Print scenario and per-stage tables, with change vs baseline."""
+    def delta(value, ref):
+        return f"{(value - ref) / ref:+.0%}" if ref else "   -"
+    
+    for scenario, m in results.items():
+        ref = baseline.get(scenario, {})
+        print("\n" + "="*80)
+        print(f"{scenario}")
+        print("="*80)
+        print(f"jobs={m['jobs']} errors={m['errors']} wall={m['wall_s']}s "
+              f"throughput={m['throughput_per_s']}/s ({delta(m['throughput_per_s'], ref.get('throughput_per_s'))})")
+        print(f"latency p50={m['p50_ms']}ms ({delta(m['p50_ms'], ref.get('p50_ms'))}) "
+              f"p95={m['p95_ms']}ms ({delta(m['p95_ms'], ref.get('p95_ms'))}) "
+              f"peak memory={m['peak_mb']}MB ({delta(m['peak_mb'], ref.get('peak_mb'))})")
+        
+        print(f"\n{'stage':<24}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p50 vs':>9}{'p50 alloc kB':>14}")
+        for stage, s in m['stages'].items():
+            ref_stage = ref.get('stages', {}).get(stage, {})
+            print(f"{stage:<24}{s['count']:>7}{s['p50_ms']:>10}{s['p95_ms']:>10}"
+                  f"{delta(s['p50_ms'], ref_stage.get('p50_ms')):>9}{s['p50_alloc_kb']:>14}")
+
+
+def configure(args, workdir: str) -> None:
+    """Point storage at a scratch directory and apply benchmark settings."""
+    settings.chroma_persist_dir = os.path.join(workdir, "chroma_db")
+    settings.cache_dir = os.path.join(workdir, "cache")
+    settings.checkpoint_path = os.path.join(workdir, "checkpoints.sqlite")
+    settings.trace_dir = os.path.join(workdir, "traces")
+    settings.enable_caching = args.warm_cache
+    settings.enable_checkpoints = args.checkpoints
+    # The harness opens its own trace per job
+    settings.enable_tracing = False
+    settings.graph_mode = args.mode
+    settings.iterative_research = args.iterative
+    # The stubs stand in for OpenAI embeddings, not a local model
+    settings.embedding_model = "text-embedding-3-small"
+    settings.embedding_warmup = False
+    # Every corpus page lives on one host; don't let that serialize scraping
+    settings.scrape_per_host_limit = settings.scrape_max_workers
+
+
+def parse_args():
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ints = lambda value: [int(v) for v in value.split(",")]
+    parser.add_argument("--topics", type=ints, default=[1, 4], help="Research runs per scenario (comma-separated)")
+    parser.add_argument("--concurrency", type=ints, default=[1, 4], help="Concurrent runs (comma-separated)")
+    parser.add_argument("--questions", type=int, default=8, help="Q&A questions per concurrency level (0 = skip)")
+    parser.add_argument("--mode", choices=["sequential", "parallel"], default="sequential", help="Graph mode")
+    parser.add_argument("--iterative", action="store_true", help="Enable gap-analysis passes")
+    parser.add_argument("--checkpoints", action="store_true", help="Checkpoint runs to SQLite")
+    parser.add_argument("--warm-cache", action="store_true", help="Keep search/page/embedding caches on")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed research runs before the scenarios")
+    parser.add_argument("--pages", type=int, default=200, help="Corpus size")
+    parser.add_argument("--page-latency", type=float, default=5, help="HTTP response delay (ms)")
+    parser.add_argument("--llm-latency", type=float, default=50, help="Chat latency per call (ms)")
+    parser.add_argument("--llm-per-token", type=float, default=0.2, help="Chat latency per output token (ms)")
+    parser.add_argument("--search-latency", type=float, default=30, help="Search latency per call (ms)")
+    parser.add_argument("--embed-latency", type=float, default=20, help="Embedding latency per request (ms)")
+    parser.add_argument("--embed-per-text", type=float, default=0.1, help="Embedding latency per text (ms)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Injected failure rate for every stub")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for corpus, jitter and failures")
+    parser.add_argument("--no-memory", action="store_true", help="Skip tracemalloc (faster, no memory numbers)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Write results to the baseline file")
+    parser.add_argument("--output", type=Path, help="Also write results to this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="Allowed relative regression")
+    parser.add_argument("--min-delta-ms", type=float, default=50, help="Ignore latency changes below this")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 1 when a metric regresses")
+    return parser.parse_args()
+
+
+def main() -> int:
+    """Run all scenarios and report against the baseline."""
+    args = parse_args()
+    options = {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()
+               if k not in ('baseline', 'save_baseline', 'output', 'tolerance', 'min_delta_ms', 'fail_on_regression')}
+    
+    workdir = tempfile.mkdtemp(prefix="bench-")
+    configure(args, workdir)
+    if not args.no_memory:
+        tracemalloc.start()
+    
+    print("="*80)
+    print("OFFLINE BENCHMARK")
+    print("="*80)
+    print(f"Options: {options}")
+    print(f"Scratch directory: {workdir}")
+    
+    from src.agents.pool import agent_pool
+    
+    results: Dict[str, Dict] = {}
+    with LocalCorpus(pages=args.pages, latency_ms=args.page_latency, seed=args.seed) as corpus:
+        profile = lambda latency, per_item, offset: StubProfile(
+            latency_ms=latency, per_item_ms=per_item,
+            failure_rate=args.failure_rate, seed=args.seed + offset
+        )
+        install_stubs(
+            agent_pool, corpus,
+            llm=profile(args.llm_latency, args.llm_per_token, 1),
+            search=profile(args.search_latency, 0, 2),
+            embeddings=profile(args.embed_latency, args.embed_per_text, 3),
+        )
+        
+        # Load lazily imported libraries and open stores before timing anything
+        from src.graph.workflow import run_research
+        for i in range(args.warmup):
+            run_research(f"{TOPICS[0]} (warm-up {i + 1})")
+        
+        sessions: List[str] = []
+        for topics in args.topics:
+            for concurrency in args.concurrency:
+                name = f"research topics={topics} concurrency={concurrency}"
+                print(f"\nRunning {name}...")
+                results[name], completed = benchmark_research(topics, concurrency)
+                sessions += completed
+        
+        if args.questions and sessions:
+            for concurrency in args.concurrency:
+                name = f"qa questions={args.questions} concurrency={concurrency}"
+                print(f"\nRunning {name}...")
+                results[name] = benchmark_qa(sessions, args.questions, concurrency)
+    
+    shutil.rmtree(workdir, ignore_errors=True)
+    
+    baseline = {}
+    if args.baseline.exists():
+        stored = json.loads(args.baseline.read_text())
+        baseline = stored.get('results', {})
+        if stored.get('options') != options:
+            print(f"\n⚠️  Baseline {args.baseline} was recorded with different options: {stored.get('options')}")
+    
+    print_report(results, baseline)
+    
+    report = {'options': options, 'results': results}
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\n✅ Baseline saved to {args.baseline}")
+        return 0
+    
+    regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+    print("\n" + "="*80)
+    if not baseline:
+        print(f"No baseline at {args.baseline} (run with --save-baseline)")
+    elif regressions:
+        print(f"❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for line in regressions:
+            print(f"  - {line}")
+    else:
+        print(f"✅ No regressions beyond {args.tolerance:.0%}")
+    print("="*80)
+    
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
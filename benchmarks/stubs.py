@@ -0,0 +1,305 @@
+"""Local stand-ins for the OpenAI chat, OpenAI embeddings and Tavily APIs."""
+
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+# Angles the stub planner turns a topic into search queries with
+QUERY_ANGLES = [
+    "overview", "recent research", "key challenges", "industry adoption",
+    "case studies", "future outlook", "criticism and risks", "economic impact",
+]
+
+
+class StubServiceError(Exception):
+    """Injected failure raised by a stub service."""
+
+
+@dataclass
+class StubProfile:
+    """
+    Latency and failure behaviour of one stub service.
+    
+    Args:
+        latency_ms: Base latency of every call
+        per_item_ms: Extra latency per output token (LLM) or input text (embeddings)
+        jitter: Random +/- fraction applied to the latency
+        failure_rate: Probability that a call raises StubServiceError
+        seed: Seed for jitter and failure injection
+    """
+    latency_ms: float = 0.0
+    per_item_ms: float = 0.0
+    jitter: float = 0.1
+    failure_rate: float = 0.0
+    seed: int = 0
+    
+    def __post_init__(self):
+        self._random = random.Random(self.seed)
+        self._lock = threading.Lock()
+    
+    def delay(self, items: int = 0) -> float:
+        """Seconds a call producing/consuming `items` units takes."""
+        delay_ms = self.latency_ms + self.per_item_ms * items
+        if delay_ms <= 0:
+            return 0.0
+        with self._lock:
+            factor = 1 + self._random.uniform(-self.jitter, self.jitter)
+        return delay_ms * factor / 1000
+    
+    def wait(self, items: int = 0) -> None:
+        """Sleep for the latency of a call."""
+        time.sleep(self.delay(items))
+    
+    def maybe_fail(self, service: str) -> None:
+        """Raise StubServiceError with probability failure_rate."""
+        if self.failure_rate <= 0:
+            return
+        with self._lock:
+            failed = self._random.random() < self.failure_rate
+        if failed:
+            raise StubServiceError(f"Injected {service} failure")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+class StubChatModel:
+    """
+    Stand-in for ChatOpenAI (invoke/stream and their async forms) with canned, prompt-aware answers.
+    
+    Recognises the planner, gap analysis, synthesizer and Q&A prompts
+    from src.llm.prompts and answers each in the shape its agent expects.
+    """
+    
+    def __init__(
+        self,
+        profile: Optional[StubProfile] = None,
+        report_words: int = 600,
+        follow_up_queries: int = 2
+    ):
+        """
+        Initialize the stub model.
+        
+        Args:
+            profile: Latency/failure profile (per_item_ms is per output token)
+            report_words: Length of generated reports
+            follow_up_queries: Queries proposed by each gap analysis (0 = always sufficient)
+        """
+        self.profile = profile or StubProfile()
+        self.report_words = report_words
+        self.follow_up_queries = follow_up_queries
+        self._gap_calls = 0
+        self._lock = threading.Lock()
+    
+    def invoke(self, messages, **kwargs) -> AIMessage:
+        """Answer a list of [SystemMessage, HumanMessage]."""
+        system, user = messages[0].content, messages[-1].content
+        self.profile.maybe_fail("chat")
+        content = self._respond(system, user)
+        completion_tokens = estimate_tokens(content)
+        self.profile.wait(completion_tokens)
+        
+        return AIMessage(
+            content=content,
+            response_metadata={'token_usage': {
+                'prompt_tokens': estimate_tokens(system + user),
+                'completion_tokens': completion_tokens,
+            }}
+        )
+    
+    async def ainvoke(self, messages, **kwargs) -> AIMessage:
+        """Async invoke(); the latency is awaited, not slept."""
+        system, user = messages[0].content, messages[-1].content
+        self.profile.maybe_fail("chat")
+        content = self._respond(system, user)
+        completion_tokens = estimate_tokens(content)
+        await asyncio.sleep(self.profile.delay(completion_tokens))
+        
+        return AIMessage(
+            content=content,
+            response_metadata={'token_usage': {
+                'prompt_tokens': estimate_tokens(system + user),
+                'completion_tokens': completion_tokens,
+            }}
+        )
+    
+    def stream(self, messages) -> Iterator[AIMessageChunk]:
+        """Yield the answer word by word, paced like token generation."""
+        system, user = messages[0].content, messages[-1].content
+        self.profile.maybe_fail("chat")
+        self.profile.wait()
+        for word in re.findall(r'\S+\s*', self._respond(system, user)):
+            time.sleep(self.profile.per_item_ms * estimate_tokens(word) / 1000)
+            yield AIMessageChunk(content=word)
+    
+    async def astream(self, messages) -> AsyncIterator[AIMessageChunk]:
+        """Async stream()."""
+        system, user = messages[0].content, messages[-1].content
+        self.profile.maybe_fail("chat")
+        await asyncio.sleep(self.profile.delay())
+        for word in re.findall(r'\S+\s*', self._respond(system, user)):
+            await asyncio.sleep(self.profile.per_item_ms * estimate_tokens(word) / 1000)
+            yield AIMessageChunk(content=word)
+    
+    def _respond(self, system: str, user: str) -> str:
+        """Build the canned answer for a prompt."""
+        topic = _field(user, 'Research Topic') or _field(user, 'Topic') or 'the topic'
+        
+        if 'coverage gaps' in system:
+            with self._lock:
+                self._gap_calls += 1
+                call = self._gap_calls
+            queries = [f"{topic} follow-up {call}.{i}" for i in range(self.follow_up_queries)]
+            return json.dumps({
+                'sufficient': not queries,
+                'gaps': [f"gap {call}.{i}" for i in range(len(queries))],
+                'search_queries': queries,
+            })
+        
+        if 'research planner' in system:
+            return json.dumps({
+                'subtopics': [f"{topic}: {angle}" for angle in QUERY_ANGLES[:4]],
+                'search_queries': [f"{topic} {angle}" for angle in QUERY_ANGLES[:5]],
+            })
+        
+        if 'research assistant' in system:
+            return f"Based on the stored research, {_sentence(user, 40)} [1][2]."
+        
+        # Report: mostly filler with a citation per paragraph
+        paragraphs = []
+        words_per_paragraph = 80
+        for i in range(max(1, self.report_words // words_per_paragraph)):
+            paragraphs.append(f"{_sentence(user, words_per_paragraph, offset=i)} [{i % 5 + 1}].")
+        return f"# {topic}\n\n" + "\n\n".join(paragraphs)
+
+
+class StubSearchClient:
+    """Stand-in for TavilyClient.search returning pages of a LocalCorpus."""
+    
+    def __init__(self, corpus, profile: Optional[StubProfile] = None):
+        """
+        Initialize the stub search client.
+        
+        Args:
+            corpus: LocalCorpus whose pages are returned as results
+            profile: Latency/failure profile
+        """
+        self.corpus = corpus
+        self.profile = profile or StubProfile()
+    
+    def search(self, query: str, max_results: int = 5, search_depth: str = "basic") -> Dict:
+        """Return the corpus pages the query hashes to."""
+        self.profile.maybe_fail("search")
+        self.profile.wait(max_results)
+        
+        results = []
+        for rank, page in enumerate(self.corpus.pages_for(query, max_results)):
+            results.append({
+                'url': self.corpus.url(page),
+                'title': self.corpus.title(page),
+                'content': self.corpus.snippet(page),
+                'score': round(1 - rank * 0.1, 2),
+            })
+        return {'query': query, 'results': results}
+
+
+class StubEmbeddingsClient:
+    """
+    Stand-in for OpenAI().embeddings with hashed bag-of-words vectors.
+    
+    Texts sharing words get similar vectors, so retrieval still ranks
+    chunks by overlap with the query.
+    """
+    
+    def __init__(self, profile: Optional[StubProfile] = None, dimensions: int = 256):
+        """
+        Initialize the stub embeddings client.
+        
+        Args:
+            profile: Latency/failure profile (per_item_ms is per input text)
+            dimensions: Vector size
+        """
+        self.profile = profile or StubProfile()
+        self.dimensions = dimensions
+    
+    @property
+    def embeddings(self) -> "StubEmbeddingsClient":
+        """Mirror the OpenAI client's `client.embeddings.create` layout."""
+        return self
+    
+    def create(self, input: List[str], model: str = "stub"):
+        """Embed a batch of texts."""
+        self.profile.maybe_fail("embeddings")
+        self.profile.wait(len(input))
+        
+        data = [
+            SimpleNamespace(index=i, embedding=self._vector(text))
+            for i, text in enumerate(input)
+        ]
+        tokens = sum(estimate_tokens(text) for text in input)
+        return SimpleNamespace(data=data, usage=SimpleNamespace(total_tokens=tokens), model=model)
+    
+    def _vector(self, text: str) -> List[float]:
+        """Hash words into a normalized bag-of-words vector."""
+        vector = [0.0] * self.dimensions
+        for word in re.findall(r'\w+', text.lower()):
+            vector[zlib.crc32(word.encode()) % self.dimensions] += 1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+
+def install_stubs(
+    pool,
+    corpus,
+    llm: Optional[StubProfile] = None,
+    search: Optional[StubProfile] = None,
+    embeddings: Optional[StubProfile] = None,
+    report_words: int = 600,
+    follow_up_queries: int = 2
+) -> None:
+    """
+    Swap the external clients of an AgentPool's agents for stubs.
+    
+    Scraping is left alone: it fetches the corpus over real HTTP.
+    
+    Args:
+        pool: AgentPool (agents are created if needed)
+        corpus: Running LocalCorpus
+        llm: Chat model profile
+        search: Search API profile
+        embeddings: Embeddings API profile
+        report_words: Length of generated reports
+        follow_up_queries: Queries proposed by each gap analysis
+    """
+    chat = StubChatModel(llm, report_words=report_words, follow_up_queries=follow_up_queries)
+    pool.planner.llm.llm = chat
+    pool.synthesizer.llm.llm = chat
+    pool.executor.search.client = StubSearchClient(corpus, search)
+    
+    embedding_function = pool.synthesizer.retriever.vector_store.embedding_function
+    if hasattr(embedding_function, 'client'):
+        embedding_function.client = StubEmbeddingsClient(embeddings)
+
+
+def _field(text: str, label: str) -> Optional[str]:
+    """Value of a 'Label: value' line in a prompt."""
+    match = re.search(rf'^{re.escape(label)}:\s*(.+)$', text, re.MULTILINE)
+    return match.group(1).strip() if match else None
+
+
+def _sentence(text: str, words: int, offset: int = 0) -> str:
+    """Take `words` words from a prompt, cycling, as filler prose."""
+    vocabulary = re.findall(r'[A-Za-z]{3,}', text) or ['research']
+    start = (offset * words) % len(vocabulary)
+    return " ".join(vocabulary[(start + i) % len(vocabulary)] for i in range(words))
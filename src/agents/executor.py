@@ -1,14 +1,90 @@
 """Executor agent - collects research documents."""
 
-from typing import List, Dict
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Iterable, Iterator, Optional
 from src.tools.websearch import TavilySearch
 from src.tools.scraper import WebScraper
+from src.tools.urls import normalize_url
 from src.utils.config import settings
 from src.utils.logging import setup_logger
+from src.utils.tracing import submit
 
 logger = setup_logger(__name__)
 
 
+def merge_documents(documents: List[Dict]) -> List[Dict]:
+    """
+    Merge documents that point at the same page.
+    
+    Executor branches sharing a run's UrlRegistry never fetch a page
+    twice, but branches run without one can, so the same page can arrive
+    more than once. The first copy is kept and tagged with the queries of
+    every copy.
+    
+    Args:
+        documents: Documents from one or more executor runs
+        
+    Returns:
+        Documents with one entry per normalized URL, in first-seen order
+    """
+    merged: Dict[str, Dict] = {}
+    for doc in documents:
+        key = normalize_url(doc['url'])
+        queries = doc.get('queries') or [doc.get('query')]
+        if key not in merged:
+            merged[key] = {**doc, 'queries': list(queries)}
+            continue
+        for query in queries:
+            if query not in merged[key]['queries']:
+                merged[key]['queries'].append(query)
+    
+    if len(merged) < len(documents):
+        logger.info(f"Merged {len(documents) - len(merged)} duplicate documents")
+    return list(merged.values())
+
+
+class UrlRegistry:
+    """
+    Single-flight record of the pages claimed in one research run.
+    
+    Every executor branch of a run shares one instance (passed through the
+    run config), so a page surfaced by queries in different branches is
+    still fetched only once.
+    """
+    
+    def __init__(self):
+        """Start with no pages claimed."""
+        self._lock = threading.Lock()
+        self._queries: Dict[str, List[str]] = {}  # normalized url -> queries that surfaced it
+    
+    def claim(self, key: str, query: str) -> bool:
+        """
+        Claim a page for fetching, or tag it with another query.
+        
+        Args:
+            key: Normalized URL
+            query: Query that surfaced the page
+            
+        Returns:
+            True if the caller should fetch the page, False if it was
+            already fetched or is in flight
+        """
+        with self._lock:
+            if key in self._queries:
+                if query not in self._queries[key]:
+                    self._queries[key].append(query)
+                return False
+            self._queries[key] = [query]
+            return True
+    
+    def queries(self, key: str) -> List[str]:
+        """Queries that surfaced a claimed page (the live list, tags may follow)."""
+        with self._lock:
+            return self._queries[key]
+
+
 class ExecutorAgent:
     """Executes research plan by collecting documents."""
     
@@ -18,56 +94,31 @@ class ExecutorAgent:
         self.scraper = WebScraper()
         logger.info("ExecutorAgent initialized")
     
-    def execute_research(self, queries: List[str]) -> List[Dict]:
+    def execute_research(
+        self,
+        queries: List[str],
+        exclude_urls: Optional[Iterable[str]] = None,
+        registry: Optional[UrlRegistry] = None
+    ) -> List[Dict]:
         """
         Execute research by searching and scraping documents.
         
         Args:
             queries: List of search queries
-            
+            exclude_urls: Pages already collected (skipped, not re-fetched)
+            registry: Run-wide single-flight registry shared with other
+                executor branches (a private one if not given)
+                
         Returns:
             List of documents with content and metadata
         """
         try:
             logger.info(f"Executing research with {len(queries)} queries")
             
-            all_documents = []
+            all_documents = list(self.iter_research(queries, exclude_urls, registry))
             
             for query in queries:
-                logger.info(f"Processing query: '{query}'")
-                
-                # Step 1: Search
-                search_results = self.search.search(query)
-                
-                if not search_results:
-                    logger.warning(f"No results for query: '{query}'")
-                    continue
-                
-                # Step 2: Get URLs to scrape (limit per query)
-                urls_to_scrape = [
-                    r['url'] for r in search_results[:settings.max_sources_per_query]
-                ]
-                
-                # Step 3: Scrape URLs
-                scraped_content = self.scraper.scrape_multiple(urls_to_scrape)
-                
-                # Step 4: Build documents
-                for result in search_results[:settings.max_sources_per_query]:
-                    url = result['url']
-                    content = scraped_content.get(url)
-                    
-                    # Only add if scraping succeeded
-                    if content:
-                        document = {
-                            'url': url,
-                            'title': result['title'],
-                            'content': content,
-                            'source': 'web',
-                            'query': query
-                        }
-                        all_documents.append(document)
-                
-                logger.info(f"Collected {len([d for d in all_documents if d['query'] == query])} "
+                logger.info(f"Collected {len([d for d in all_documents if query in d['queries']])} "
                            f"documents for query: '{query}'")
             
             logger.info(f"Total documents collected: {len(all_documents)}")
@@ -75,4 +126,105 @@ class ExecutorAgent:
             
         except Exception as e:
             logger.error(f"Failed to execute research: {e}")
-            raise
\ No newline at end of file
+            raise
+    
+    def iter_research(
+        self,
+        queries: List[str],
+        exclude_urls: Optional[Iterable[str]] = None,
+        registry: Optional[UrlRegistry] = None
+    ) -> Iterator[Dict]:
+        """
+        Search and scrape as a pipeline, yielding documents as they finish.
+        
+        All searches start at once; each result URL is handed to the scraper
+        as soon as its search returns, so no query waits on another query's
+        pages. Work still running when the deadline (search + scrape
+        timeouts) passes is dropped.
+        
+        URLs are deduplicated across queries by their normalized form, so
+        each page is fetched once per registry (i.e. once per run when
+        branches share one). A document's 'query' is the
+        first query that surfaced it and 'queries' lists all of them; tags
+        added after a document was yielded are appended to that same list.
+        
+        Args:
+            queries: List of search queries
+            exclude_urls: Pages already collected (skipped, not re-fetched)
+            registry: Run-wide single-flight registry (a private one if not given)
+            
+        Yields:
+            Documents with content and metadata, in completion order
+        """
+        if not queries:
+            return
+        
+        deadline = time.monotonic() + settings.search_timeout + settings.scrape_batch_timeout
+        search_pool = ThreadPoolExecutor(
+            max_workers=min(settings.executor_max_searches, len(queries)),
+            thread_name_prefix="search"
+        )
+        scrape_pool = ThreadPoolExecutor(
+            max_workers=self.scraper.max_workers,
+            thread_name_prefix="scraper"
+        )
+        
+        # Step 1: Fire every search at once
+        searches = {submit(search_pool, self.search.search, query): query for query in queries}
+        scrapes = {}
+        registry = registry or UrlRegistry()
+        excluded = {normalize_url(url) for url in exclude_urls or ()}
+        pending = set(searches)
+        
+        try:
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning(f"Research deadline reached, dropping {len(pending)} pending tasks")
+                    break
+                
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    if future in searches:
+                        # Step 2: Hand this query's URLs to the scraper right away
+                        query = searches[future]
+                        search_results = future.result()
+                        
+                        if not search_results:
+                            logger.warning(f"No results for query: '{query}'")
+                            continue
+                        
+                        for result in search_results[:settings.max_sources_per_query]:
+                            key = normalize_url(result['url'])
+                            
+                            # Collected in an earlier pass
+                            if key in excluded:
+                                continue
+                            
+                            # Single-flight: tag pages already fetched or in flight
+                            if not registry.claim(key, query):
+                                continue
+                            
+                            scrape = submit(scrape_pool, self.scraper.scrape_url, result['url'])
+                            scrapes[scrape] = (key, result)
+                            pending.add(scrape)
+                    else:
+                        # Step 3: Emit the document once its page is scraped
+                        key, result = scrapes[future]
+                        content = future.result()
+                        
+                        # Only yield if scraping succeeded
+                        if content:
+                            queries_for_page = registry.queries(key)
+                            yield {
+                                'url': result['url'],
+                                'title': result['title'],
+                                'content': content,
+                                'source': 'web',
+                                'query': queries_for_page[0],
+                                'queries': queries_for_page
+                            }
+        finally:
+            search_pool.shutdown(wait=False, cancel_futures=True)
+            scrape_pool.shutdown(wait=False, cancel_futures=True)
\ No newline at end of file
@@ -1,8 +1,10 @@
 """Planner agent - creates research strategy."""
 
-from typing import Dict
+from typing import Dict, List
 from src.llm.client import LLMClient
-from src.llm.prompts import PLANNER_SYSTEM_PROMPT, PLANNER_USER_TEMPLATE
+from src.llm.prompts import PLANNER_SYSTEM_PROMPT, PLANNER_USER_TEMPLATE, PLAN_SCHEMA
+from src.llm.prompts import GAP_SYSTEM_PROMPT, GAP_USER_TEMPLATE, GAP_SCHEMA
+from src.tools.websearch import normalize_query
 from src.utils.config import settings
 from src.utils.logging import setup_logger
 
@@ -14,7 +16,7 @@ class PlannerAgent:
     
     def __init__(self):
         """Initialize planner with LLM client."""
-        self.llm = LLMClient(temperature=settings.temperature_planner)
+        self.llm = LLMClient(temperature=settings.temperature_planner, name="planner")
         logger.info("PlannerAgent initialized")
     
     def create_plan(self, topic: str) -> Dict:
@@ -35,10 +37,12 @@ class PlannerAgent:
             # Format user message
             user_message = PLANNER_USER_TEMPLATE.format(topic=topic)
             
-            # Call LLM with JSON mode
+            # Call LLM with JSON mode (plans for a repeated topic barely differ)
             plan = self.llm.invoke_with_json(
                 system_prompt=PLANNER_SYSTEM_PROMPT,
-                user_message=user_message
+                user_message=user_message,
+                schema=PLAN_SCHEMA,
+                use_cache=True
             )
             
             # Validate response
@@ -52,4 +56,56 @@ class PlannerAgent:
             
         except Exception as e:
             logger.error(f"Failed to create plan for '{topic}': {e}")
+            raise
+    
+    def refine_plan(self, topic: str, report: str, executed_queries: List[str]) -> Dict:
+        """
+        Find coverage gaps in a draft report and plan follow-up queries.
+        
+        Args:
+            topic: Research topic
+            report: Draft report from the previous pass
+            executed_queries: Queries already run (never repeated)
+            
+        Returns:
+            Dict with:
+            - sufficient: bool - Whether coverage is already good enough
+            - gaps: List[str] - Missing or weak areas
+            - search_queries: List[str] - New queries only
+        """
+        try:
+            logger.info(f"Analyzing coverage gaps for: '{topic}'")
+            
+            user_message = GAP_USER_TEMPLATE.format(
+                topic=topic,
+                executed_queries="\n".join(f"- {q}" for q in executed_queries),
+                report=report
+            )
+            
+            result = self.llm.invoke_with_json(
+                system_prompt=GAP_SYSTEM_PROMPT,
+                user_message=user_message,
+                schema=GAP_SCHEMA
+            )
+            
+            # Drop anything that normalizes to a query we already ran
+            seen = {normalize_query(q) for q in executed_queries}
+            queries = []
+            for query in result.get('search_queries', []):
+                key = normalize_query(query)
+                if key and key not in seen:
+                    seen.add(key)
+                    queries.append(query)
+            
+            sufficient = bool(result.get('sufficient')) or not queries
+            logger.info(f"Gap analysis: {'sufficient' if sufficient else f'{len(queries)} new queries'}")
+            
+            return {
+                'sufficient': sufficient,
+                'gaps': result.get('gaps', []),
+                'search_queries': [] if sufficient else queries
+            }
+        
+        except Exception as e:
+            logger.error(f"Failed to refine plan for '{topic}': {e}")
             raise
\ No newline at end of file
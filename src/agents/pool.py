@@ -0,0 +1,81 @@
+"""Process-wide pool of lazily constructed agents."""
+
+import threading
+import time
+from typing import TYPE_CHECKING, Optional
+from src.utils.logging import setup_logger
+
+if TYPE_CHECKING:
+    from src.agents.planner import PlannerAgent
+    from src.agents.executor import ExecutorAgent
+    from src.agents.synthesizer import SynthesizerAgent
+
+logger = setup_logger(__name__)
+
+
+class AgentPool:
+    """
+    Shared agents for every graph run in the process.
+    
+    Each agent (and its LLM, Tavily, Chroma and embedding clients) is
+    created on first use and then reused, so importing the graph has no
+    side effects and later runs skip client setup. Agent modules are
+    imported on first use too, since they pull in the LLM, search and
+    vector store libraries.
+    """
+    
+    def __init__(self):
+        """Initialize an empty pool."""
+        self._lock = threading.Lock()
+        self._planner: Optional['PlannerAgent'] = None
+        self._executor: Optional['ExecutorAgent'] = None
+        self._synthesizer: Optional['SynthesizerAgent'] = None
+    
+    @property
+    def planner(self) -> 'PlannerAgent':
+        """Shared planner agent."""
+        if self._planner is None:
+            with self._lock:
+                if self._planner is None:
+                    from src.agents.planner import PlannerAgent
+                    self._planner = PlannerAgent()
+        return self._planner
+    
+    @property
+    def executor(self) -> 'ExecutorAgent':
+        """Shared executor agent."""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    from src.agents.executor import ExecutorAgent
+                    self._executor = ExecutorAgent()
+        return self._executor
+    
+    @property
+    def synthesizer(self) -> 'SynthesizerAgent':
+        """Shared synthesizer agent."""
+        if self._synthesizer is None:
+            with self._lock:
+                if self._synthesizer is None:
+                    from src.agents.synthesizer import SynthesizerAgent
+                    self._synthesizer = SynthesizerAgent()
+        return self._synthesizer
+    
+    def warm_up(self) -> None:
+        """Construct every agent now so the first research run doesn't pay for it."""
+        start = time.perf_counter()
+        self.planner
+        self.executor
+        self.synthesizer
+        logger.info(f"Agent pool ready in {time.perf_counter() - start:.1f}s")
+    
+    def reset(self) -> None:
+        """Drop all agents (they are rebuilt on next use)."""
+        with self._lock:
+            self._planner = None
+            self._executor = None
+            self._synthesizer = None
+
+
+# Global pool instance
+agent_pool = AgentPool()
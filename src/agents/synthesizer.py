@@ -1,22 +1,31 @@
 """Synthesizer agent - generates research reports."""
 
-from typing import Dict, List
+from typing import Callable, Dict, Iterator, List, Optional
 from src.llm.client import LLMClient
 from src.llm.prompts import SYNTHESIZER_SYSTEM_PROMPT, SYNTHESIZER_USER_TEMPLATE
 from src.llm.prompts import QA_SYSTEM_PROMPT, QA_USER_TEMPLATE
+from src.llm.rate_limiter import Priority
 from src.rag.retriever import Retriever
 from src.utils.config import settings
 from src.utils.logging import setup_logger
 
 logger = setup_logger(__name__)
 
+# Shortest overlap between adjacent chunks that is treated as repeated text
+MIN_OVERLAP_FRACTION = 0.25
+
 
 class SynthesizerAgent:
     """Synthesizes research documents into comprehensive reports."""
     
     def __init__(self):
         """Initialize LLM client and retriever."""
-        self.llm = LLMClient(temperature=settings.temperature_synthesizer)
+        # Reports are batch work; Q&A calls jump the queue (see answer_question)
+        self.llm = LLMClient(
+            temperature=settings.temperature_synthesizer,
+            name="synthesizer",
+            priority=Priority.BATCH
+        )
         self.retriever = Retriever()
         logger.info("SynthesizerAgent initialized")
     
@@ -24,7 +33,11 @@ class SynthesizerAgent:
         self, 
         topic: str, 
         documents: List[Dict], 
-        session_id: str
+        session_id: str,
+        on_token: Optional[Callable[[str], None]] = None,
+        index_documents: Optional[List[Dict]] = None,
+        system_prompt: Optional[str] = None,
+        subtopics: Optional[List[str]] = None
     ) -> Dict:
         """
         Synthesize documents into a research report.
@@ -33,6 +46,11 @@ class SynthesizerAgent:
             topic: Research topic
             documents: List of documents from executor
             session_id: Unique session ID for RAG storage
+            on_token: Optional callback receiving report text as it streams
+            index_documents: Documents not yet stored in the session
+                collection (defaults to all of them)
+            system_prompt: Report system prompt (defaults to SYNTHESIZER_SYSTEM_PROMPT)
+            subtopics: Planner subtopics, retrieved for alongside the topic
             
         Returns:
             Dict with:
@@ -42,32 +60,25 @@ class SynthesizerAgent:
         try:
             logger.info(f"Synthesizing report for: '{topic}' ({len(documents)} documents)")
             
-            # Step 1: Store documents in RAG
-            self.retriever.store_documents(documents, session_id)
-            
-            # Step 2: Retrieve relevant chunks
-            relevant_chunks = self.retriever.retrieve(
-                query=topic,
-                session_id=session_id,
-                top_k=settings.retrieval_top_k
-            )
-            
-            # Step 3: Format context with citations
-            context = self._format_context_with_citations(relevant_chunks, documents)
-            
-            # Step 4: Generate report
-            user_message = SYNTHESIZER_USER_TEMPLATE.format(
-                topic=topic,
-                context=context
-            )
+            # Step 4: Generate report (streamed when someone is listening)
+            if on_token:
+                parts = []
+                for token in self.stream_report(
+                    topic, documents, session_id, index_documents, system_prompt, subtopics
+                ):
+                    parts.append(token)
+                    on_token(token)
+                report = "".join(parts)
+            else:
+                report = self.llm.invoke(
+                    system_prompt=system_prompt or SYNTHESIZER_SYSTEM_PROMPT,
+                    user_message=self._prepare_report(
+                        topic, documents, session_id, index_documents, subtopics
+                    )
+                )
             
-            report = self.llm.invoke(
-                system_prompt=SYNTHESIZER_SYSTEM_PROMPT,
-                user_message=user_message
-            )
-            
-            # Step 5: Extract unique sources
-            sources = list(set([doc['url'] for doc in documents]))
+            # Step 5: Extract unique sources (in citation order)
+            sources = list(dict.fromkeys(doc['url'] for doc in documents))
             
             logger.info(f"Report generated: {len(report)} chars, {len(sources)} sources")
             
@@ -80,14 +91,52 @@ class SynthesizerAgent:
             logger.error(f"Failed to synthesize report: {e}")
             raise
     
-    def answer_question(self, question: str, session_id: str) -> str:
+    def stream_report(
+        self, 
+        topic: str, 
+        documents: List[Dict], 
+        session_id: str,
+        index_documents: Optional[List[Dict]] = None,
+        system_prompt: Optional[str] = None,
+        subtopics: Optional[List[str]] = None
+    ) -> Iterator[str]:
+        """
+        Synthesize a research report, yielding its text as it is generated.
+        
+        Args:
+            topic: Research topic
+            documents: List of documents from executor
+            session_id: Unique session ID for RAG storage
+            index_documents: Documents not yet stored (defaults to all)
+            system_prompt: Report system prompt (defaults to SYNTHESIZER_SYSTEM_PROMPT)
+            subtopics: Planner subtopics, retrieved for alongside the topic
+            
+        Yields:
+            Report text fragments, in order
+        """
+        user_message = self._prepare_report(
+            topic, documents, session_id, index_documents, subtopics
+        )
+        yield from self.llm.stream(
+            system_prompt=system_prompt or SYNTHESIZER_SYSTEM_PROMPT,
+            user_message=user_message
+        )
+    
+    def answer_question(
+        self,
+        question: str,
+        session_id: str,
+        sources: Optional[List[str]] = None
+    ) -> str:
         """
         Answer a question using stored research.
         
         Args:
             question: User question
             session_id: Session ID with stored documents
-            
+            sources: The session report's sources list, so citation numbers
+                match the report (without it, sources are numbered by relevance)
+                
         Returns:
             Answer with citations
         """
@@ -95,17 +144,14 @@ class SynthesizerAgent:
             logger.info(f"Answering question: '{question}'")
             
             # Retrieve relevant chunks
-            relevant_chunks = self.retriever.retrieve(
-                query=question,
+            hits = self.retriever.retrieve_many(
+                queries=[question],
                 session_id=session_id,
                 top_k=5
-            )
+            )[0]
             
-            # Format context
-            context = "\n\n".join([
-                f"[{i+1}] {chunk}" 
-                for i, chunk in enumerate(relevant_chunks)
-            ])
+            # Format context (numbered like the report's sources)
+            context = self._format_context_with_citations(hits, sources or [])
             
             # Generate answer
             user_message = QA_USER_TEMPLATE.format(
@@ -115,7 +161,10 @@ class SynthesizerAgent:
             
             answer = self.llm.invoke(
                 system_prompt=QA_SYSTEM_PROMPT,
-                user_message=user_message
+                user_message=user_message,
+                priority=Priority.INTERACTIVE,
+                use_cache=True,
+                cache_context=context
             )
             
             logger.info("Answer generated")
@@ -125,27 +174,158 @@ class SynthesizerAgent:
             logger.error(f"Failed to answer question: {e}")
             raise
     
+    def _prepare_report(
+        self, 
+        topic: str, 
+        documents: List[Dict], 
+        session_id: str,
+        index_documents: Optional[List[Dict]] = None,
+        subtopics: Optional[List[str]] = None
+    ) -> str:
+        """
+        Index documents and build the report prompt.
+        
+        Args:
+            topic: Research topic
+            documents: List of documents from executor
+            session_id: Unique session ID for RAG storage
+            index_documents: Documents not yet stored (defaults to all)
+            subtopics: Planner subtopics to retrieve for alongside the topic
+            
+        Returns:
+            User message for the synthesizer LLM call
+        """
+        # Step 1: Store documents in RAG (later passes only add new ones)
+        to_index = documents if index_documents is None else index_documents
+        if to_index:
+            self.retriever.store_documents(to_index, session_id)
+        
+        # Step 2: Retrieve relevant chunks for the topic and every subtopic at once
+        queries = [topic] + [s for s in dict.fromkeys(subtopics or []) if s != topic]
+        results = self.retriever.retrieve_many(
+            queries=queries,
+            session_id=session_id,
+            top_k=settings.retrieval_top_k
+        )
+        hits = _interleave(results, settings.retrieval_top_k)
+        
+        # Step 3: Format context with citations
+        context = self._format_context_with_citations(
+            hits, list(dict.fromkeys(doc['url'] for doc in documents))
+        )
+        
+        return SYNTHESIZER_USER_TEMPLATE.format(
+            topic=topic,
+            context=context
+        )
+    
     def _format_context_with_citations(
         self, 
-        chunks: List[str], 
-        documents: List[Dict]
+        hits: List[Dict], 
+        sources: List[str]
     ) -> str:
         """
-        Format chunks with source citations.
+        Format retrieved chunks grouped by source, with source citations.
+        
+        Each source keeps one number: its position in sources (the report's
+        sources list), or the next free number for sources not in it.
+        Adjacent chunks of a source are joined without their overlap.
         
         Args:
-            chunks: Retrieved text chunks
-            documents: Original documents with URLs
+            hits: Retrieved hits (see Retriever.retrieve_many), best first
+            sources: Source URLs in citation order
             
         Returns:
             Formatted context string with [1], [2] citations
         """
         # Create URL to index mapping
-        url_to_index = {doc['url']: i + 1 for i, doc in enumerate(documents)}
+        url_to_index = {}
+        for url in sources:
+            url_to_index.setdefault(url, len(url_to_index) + 1)
+        
+        # Group hits by source, most relevant source first
+        by_source: Dict[str, List[Dict]] = {}
+        for hit in hits:
+            by_source.setdefault(hit.get('url') or hit['text'], []).append(hit)
         
-        # Format chunks (simplified - just number them)
         context_parts = []
-        for i, chunk in enumerate(chunks):
-            context_parts.append(f"[{i+1}] {chunk}")
+        for url, source_hits in by_source.items():
+            index = url_to_index.setdefault(url, len(url_to_index) + 1)
+            title = source_hits[0].get('title')
+            if not source_hits[0].get('url'):
+                header = f"[{index}]"
+            elif title:
+                header = f"[{index}] {title} ({url})"
+            else:
+                header = f"[{index}] {url}"
+            context_parts.append(f"{header}\n{_merge_adjacent(source_hits)}")
+        
+        return "\n\n".join(context_parts)
+
+
+def _interleave(results: List[List[Dict]], limit: int) -> List[Dict]:
+    """
+    Merge per-query hits round-robin, so every query is represented.
+    
+    Args:
+        results: Hits per query, best first
+        limit: Max hits to return
+        
+    Returns:
+        Distinct hits, the topic's best hit first
+    """
+    merged: Dict[str, Dict] = {}
+    for rank in range(max((len(hits) for hits in results), default=0)):
+        for hits in results:
+            if rank < len(hits):
+                merged.setdefault(hits[rank]['text'], hits[rank])
+                if len(merged) == limit:
+                    return list(merged.values())
+    return list(merged.values())
+
+
+def _merge_adjacent(hits: List[Dict]) -> str:
+    """
+    Join one source's chunks in document order.
+    
+    Consecutive chunks are joined with their shared overlap removed;
+    gaps are marked with an ellipsis.
+    
+    Args:
+        hits: Hits from a single source
+        
+    Returns:
+        Source text for the context
+    """
+    ordered = sorted(hits, key=lambda hit: hit.get('chunk_index') or 0)
+    text = ordered[0]['text']
+    for previous, hit in zip(ordered, ordered[1:]):
+        if hit.get('chunk_index') is not None and previous.get('chunk_index') == hit['chunk_index'] - 1:
+            text = _join_overlapping(text, hit['text'])
+        else:
+            text += "\n...\n" + hit['text']
+    return text
+
+
+def _join_overlapping(first: str, second: str) -> str:
+    """
+    Append second to first, dropping the text the splitter repeated.
+    
+    Only an overlap of at least MIN_OVERLAP_FRACTION of chunk_overlap that
+    starts on a word boundary counts; a short accidental match (a shared
+    letter or word ending) would corrupt the text, so those chunks are
+    joined as they are.
+    
+    Args:
+        first: Earlier chunk text
+        second: The chunk that follows it
         
-        return "\n\n".join(context_parts)
\ No newline at end of file
+    Returns:
+        Joined text
+    """
+    min_size = max(1, int(settings.chunk_overlap * MIN_OVERLAP_FRACTION))
+    for size in range(min(len(first), len(second), settings.chunk_overlap), min_size - 1, -1):
+        start = len(first) - size
+        if first.endswith(second[:size]) and (start == 0 or not first[start - 1].isalnum()):
+            return first + second[size:]
+    return first + " " + second
\ No newline at end of file
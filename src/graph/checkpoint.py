@@ -0,0 +1,131 @@
+"""
+Checkpoint Store
+Persists research graph state after every step so failed runs can resume.
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Dict, Optional
+from src.utils.config import settings
+from src.utils.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+_checkpointer = None
+_checkpointer_lock = threading.Lock()
+
+
+def get_checkpointer():
+    """
+    Get the process-wide checkpoint saver.
+    
+    Returns:
+        LangGraph SqliteSaver writing to Settings.checkpoint_path
+    """
+    global _checkpointer
+    with _checkpointer_lock:
+        if _checkpointer is None:
+            from langgraph.checkpoint.sqlite import SqliteSaver
+            
+            path = settings.checkpoint_path
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            _checkpointer = SqliteSaver(sqlite3.connect(path, check_same_thread=False))
+            logger.info(f"Checkpoint store opened: {path}")
+        return _checkpointer
+
+
+def prune_checkpoints(
+    keep_per_run: Optional[int] = None,
+    max_runs: Optional[int] = None
+) -> int:
+    """
+    Delete old checkpoints so the store stays bounded.
+    
+    Every step saves the full state, scraped pages included, so only the
+    newest checkpoints of the most recent runs are kept.
+    
+    Args:
+        keep_per_run: Newest checkpoints kept per run (defaults to config; 0 = all)
+        max_runs: Most recently updated runs kept (defaults to config; 0 = all)
+        
+    Returns:
+        Number of checkpoints deleted
+    """
+    keep_per_run = settings.checkpoint_keep_per_run if keep_per_run is None else keep_per_run
+    max_runs = settings.checkpoint_max_runs if max_runs is None else max_runs
+    saver = get_checkpointer()
+    
+    deleted = 0
+    with saver.lock, saver.cursor() as cur:
+        if max_runs:
+            cur.execute(
+                "DELETE FROM checkpoints WHERE thread_id NOT IN ("
+                " SELECT thread_id FROM checkpoints GROUP BY thread_id"
+                " ORDER BY MAX(thread_ts) DESC LIMIT ?)",
+                (max_runs,)
+            )
+            deleted += cur.rowcount
+        if keep_per_run:
+            cur.execute(
+                "DELETE FROM checkpoints WHERE rowid IN ("
+                " SELECT rowid FROM (SELECT rowid, ROW_NUMBER() OVER"
+                " (PARTITION BY thread_id ORDER BY thread_ts DESC) AS age FROM checkpoints)"
+                " WHERE age > ?)",
+                (keep_per_run,)
+            )
+            deleted += cur.rowcount
+    
+    if deleted:
+        logger.info(f"Pruned {deleted} old checkpoints")
+    return deleted
+
+
+def run_config(run_id: str, **configurable) -> Dict:
+    """
+    Build the LangGraph config that ties a run to its checkpoints.
+    
+    Args:
+        run_id: Research run ID
+        **configurable: Extra configurable values (e.g. on_token)
+        
+    Returns:
+        Config dict for graph.invoke / graph.stream
+    """
+    return {'configurable': {'thread_id': run_id, **configurable}}
+
+
+def find_resume_point(graph, run_id: str) -> Optional[Dict]:
+    """
+    Find the checkpoint a run should continue from.
+    
+    Nodes report failures as status 'error' instead of raising, so the
+    run may have carried on past the failure. The resume point is the
+    newest checkpoint that still has nodes to run and is not in an
+    error state.
+    
+    Args:
+        graph: Compiled graph with a checkpointer
+        run_id: Research run ID
+        
+    Returns:
+        Config of that checkpoint, or None if the run already finished
+        
+    Raises:
+        ValueError: If no checkpoint exists for run_id
+    """
+    history = list(graph.get_state_history(run_config(run_id)))
+    if not history:
+        raise ValueError(f"No checkpoint found for run {run_id}")
+    
+    # History is newest first
+    latest = history[0]
+    if not latest.next and latest.values.get('status') == 'complete':
+        return None
+    
+    for snapshot in history:
+        if snapshot.next and snapshot.values.get('status') != 'error':
+            logger.info(f"Resuming run {run_id} before: {', '.join(snapshot.next)}")
+            return snapshot.config
+    
+    return None
@@ -3,20 +3,38 @@ LangGraph Node Functions
 Wraps agents as nodes that LangGraph can execute.
 """
 
-from typing import Dict
+from typing import TYPE_CHECKING, Callable, Dict, Optional
+import functools
 import uuid
-from src.agents.planner import PlannerAgent
-from src.agents.executor import ExecutorAgent
-from src.agents.synthesizer import SynthesizerAgent
+from src.agents.executor import UrlRegistry, merge_documents
+from src.agents.pool import agent_pool
 from src.graph.state import ResearchState
 from src.utils.logging import setup_logger
+from src.utils.tracing import current_trace, span
+
+if TYPE_CHECKING:
+    from langchain_core.runnables import RunnableConfig
 
 logger = setup_logger(__name__)
 
-# Initialize agents once (reused across invocations)
-planner = PlannerAgent()
-executor = ExecutorAgent()
-synthesizer = SynthesizerAgent()
+
+def traced_node(name: str, node: Callable) -> Callable:
+    """
+    Wrap a node so its whole run is recorded as a "node.<name>" span.
+    
+    Args:
+        name: Node name
+        node: Node function
+        
+    Returns:
+        Node function with the same signature (LangGraph still sees 'config')
+    """
+    @functools.wraps(node)
+    def wrapper(state, *args, **kwargs):
+        with span(f"node.{name}"):
+            return node(state, *args, **kwargs)
+    
+    return wrapper
 
 
 def planner_node(state: ResearchState) -> Dict:
@@ -33,7 +51,7 @@ def planner_node(state: ResearchState) -> Dict:
         logger.info(f"=== PLANNER NODE: Analyzing topic '{state['topic']}' ===")
         
         topic = state['topic']
-        plan = planner.create_plan(topic)
+        plan = agent_pool.planner.create_plan(topic)
         
         logger.info(f"Generated {len(plan['subtopics'])} subtopics")
         logger.info(f"Generated {len(plan['search_queries'])} search queries")
@@ -57,13 +75,15 @@ def planner_node(state: ResearchState) -> Dict:
         }
 
 
-def executor_node(state: ResearchState) -> Dict:
+def executor_node(state: ResearchState, config: Optional['RunnableConfig'] = None) -> Dict:
     """
     Executor Node: Executes search queries and collects documents.
     
     Args:
         state: Current research state with 'search_queries'
-        
+        config: Run config; its 'url_registry' keeps pages single-flight
+            across iterations
+            
     Returns:
         Dict with documents, status, and logs
     """
@@ -73,7 +93,11 @@ def executor_node(state: ResearchState) -> Dict:
         queries = state['search_queries']
         logger.info(f"Executing {len(queries)} search queries")
         
-        documents = executor.execute_research(queries)
+        # Pages from earlier passes are already in the session
+        collected = [doc['url'] for doc in state.get('documents') or []]
+        documents = agent_pool.executor.execute_research(
+            queries, exclude_urls=collected, registry=url_registry(config)
+        )
         
         logger.info(f"Collected {len(documents)} documents")
         
@@ -95,43 +119,116 @@ def executor_node(state: ResearchState) -> Dict:
         }
 
 
-def synthesizer_node(state: ResearchState) -> Dict:
+def make_executor_shard(index: int, count: int):
+    """
+    Build an executor branch node for parallel fan-out.
+    
+    The branch runs every `count`-th query starting at `index`. Branches
+    run in the same graph step, so they only write the accumulating
+    'documents' and 'logs' fields (never 'status' or 'error'). They share
+    the run config's 'url_registry', so a page surfaced in several
+    branches is fetched once.
+    
+    Args:
+        index: Shard number (0-based)
+        count: Total number of shards
+        
+    Returns:
+        Node function for this shard
+    """
+    def executor_shard_node(state: ResearchState, config: Optional['RunnableConfig'] = None) -> Dict:
+        try:
+            queries = state['search_queries'][index::count]
+            logger.info(f"=== EXECUTOR SHARD {index + 1}/{count}: {len(queries)} queries ===")
+            
+            collected = [doc['url'] for doc in state.get('documents') or []]
+            documents = agent_pool.executor.execute_research(
+                queries, exclude_urls=collected, registry=url_registry(config)
+            )
+            
+            return {
+                'documents': documents,  # Merged with other shards via operator.add
+                'logs': [
+                    f"✓ Executor {index + 1}/{count}: Collected {len(documents)} documents "
+                    f"from {len(queries)} queries"
+                ]
+            }
+        
+        except Exception as e:
+            logger.error(f"Executor shard {index + 1} failed: {str(e)}")
+            return {'logs': [f"✗ Executor {index + 1}/{count}: Error - {str(e)}"]}
+    
+    return executor_shard_node
+
+
+def url_registry(config: Optional['RunnableConfig']) -> Optional[UrlRegistry]:
+    """The run's shared UrlRegistry from the run config, if any."""
+    return (config or {}).get('configurable', {}).get('url_registry')
+
+
+def synthesizer_node(state: ResearchState, config: Optional['RunnableConfig'] = None) -> Dict:
     """
     Synthesizer Node: Creates research report from collected documents.
     
+    If the run config carries an 'on_token' callable under 'configurable',
+    report text is streamed to it while the full report is still returned.
+    A 'system_prompt' there replaces the default report prompt.
+    
+    On later passes of the iterative loop the session collection is
+    reused and only documents added since the last pass are indexed.
+    
     Args:
         state: Current research state with 'topic' and 'documents'
+        config: LangGraph run config (optional)
         
     Returns:
-        Dict with session_id, report, sources, status, and logs
+        Dict with session_id, report, sources, indexed_count, new_documents,
+        timings, status, and logs
     """
     try:
         logger.info("=== SYNTHESIZER NODE: Generating research report ===")
         
         topic = state['topic']
-        documents = state['documents']
+        documents = merge_documents(state['documents'])
+        
+        # Documents from earlier passes are already embedded
+        indexed_count = state.get('indexed_count') or 0
+        new_documents = merge_documents(state['documents'][indexed_count:])
         
         # Generate or use existing session ID
         session_id = state.get('session_id') or str(uuid.uuid4())
         
         logger.info(f"Synthesizing {len(documents)} documents into report")
         
-        result = synthesizer.synthesize_report(
+        configurable = (config or {}).get('configurable', {})
+        on_token = configurable.get('on_token')
+        
+        result = agent_pool.synthesizer.synthesize_report(
             topic=topic,
             documents=documents,
-            session_id=session_id
+            session_id=session_id,
+            on_token=on_token,
+            index_documents=new_documents,
+            system_prompt=configurable.get('system_prompt'),
+            subtopics=state.get('subtopics') or []
         )
         
         logger.info("Report generated successfully")
         logger.info(f"Used {len(result['sources'])} unique sources")
         
+        # Stage timings so far (the run's caller adds the final figures)
+        trace = current_trace()
+        
         return {
             'session_id': session_id,
             'report': result['report'],
             'sources': result['sources'],
+            'indexed_count': len(state['documents']),
+            'new_documents': len(new_documents),
+            'timings': trace.summary() if trace else {},
             'status': 'complete',
             'logs': [
-                f"✓ Synthesizer: Processed {len(documents)} documents",
+                f"✓ Synthesizer: Processed {len(documents)} documents ({len(new_documents)} new)",
                 f"✓ Synthesizer: Generated comprehensive report",
                 f"✓ Synthesizer: Cited {len(result['sources'])} sources"
             ]
@@ -143,4 +240,58 @@ def synthesizer_node(state: ResearchState) -> Dict:
             'status': 'error',
             'error': f"Synthesis failed: {str(e)}",
             'logs': [f"✗ Synthesizer: Error - {str(e)}"]
+        }
+
+
+def gap_analysis_node(state: ResearchState) -> Dict:
+    """
+    Gap Analysis Node: Plans follow-up queries for a draft report.
+    
+    Only queries that were not run before are emitted. If coverage is
+    judged sufficient, no queries are returned and the loop ends.
+    
+    Args:
+        state: Current research state with 'topic', 'report' and 'search_queries'
+        
+    Returns:
+        Dict with search_queries, executed_queries, iteration, and logs
+        (plus status when another pass follows)
+    """
+    try:
+        iteration = state.get('iteration') or 1
+        logger.info(f"=== GAP ANALYSIS NODE: Reviewing pass {iteration} ===")
+        
+        executed = (state.get('executed_queries') or []) + state['search_queries']
+        
+        plan = agent_pool.planner.refine_plan(
+            topic=state['topic'],
+            report=state['report'],
+            executed_queries=executed
+        )
+        
+        if plan['sufficient']:
+            return {
+                'search_queries': [],
+                'executed_queries': executed,
+                'logs': [f"✓ Gap Analysis: Coverage sufficient after pass {iteration}"]
+            }
+        
+        return {
+            'search_queries': plan['search_queries'],
+            'executed_queries': executed,
+            'iteration': iteration + 1,
+            'status': 'refining',
+            'logs': [
+                f"✓ Gap Analysis: Found {len(plan['gaps'])} gaps",
+                f"✓ Gap Analysis: Starting pass {iteration + 1} with "
+                f"{len(plan['search_queries'])} new queries"
+            ]
+        }
+    
+    except Exception as e:
+        # Keep the report we already have
+        logger.error(f"Gap analysis node failed: {str(e)}")
+        return {
+            'search_queries': [],
+            'logs': [f"✗ Gap Analysis: Error - {str(e)}"]
         }
\ No newline at end of file
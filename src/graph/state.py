@@ -17,6 +17,7 @@ class ResearchState(TypedDict):
     
     # INPUT - User provides
     topic: str  # The research topic
+    run_id: str  # Checkpoint key for resuming this run
     
     # PLANNER OUTPUTS
     subtopics: List[str]  # Key areas identified for research
@@ -28,6 +29,12 @@ class ResearchState(TypedDict):
     
     # RAG SESSION
     session_id: str  # Unique ID for vector store collection
+    indexed_count: int  # Entries of 'documents' already stored in the collection
+    
+    # ITERATION (iterative mode)
+    iteration: int  # Current research pass, starting at 1
+    executed_queries: List[str]  # Queries run in earlier passes
+    new_documents: int  # Documents added by the latest pass
     
     # SYNTHESIZER OUTPUTS
     report: str  # Final research report
@@ -36,4 +43,5 @@ class ResearchState(TypedDict):
     # METADATA
     status: str  # Current workflow status
     logs: Annotated[List[str], operator.add]  # Activity log (accumulates)
+    timings: Dict[str, Dict]  # Span summary by stage (count, total_ms, tokens, ...)
     error: str  # Error message if something fails
\ No newline at end of file
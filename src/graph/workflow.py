@@ -3,15 +3,81 @@ LangGraph Workflow Definition
 Orchestrates the autonomous research workflow using LangGraph.
 """
 
-from langgraph.graph import StateGraph, END
+import os
+import threading
+import uuid
+from typing import Dict, List, Optional, Tuple
+from src.agents.executor import UrlRegistry
 from src.graph.state import ResearchState
-from src.graph.nodes import planner_node, executor_node, synthesizer_node
+from src.graph.checkpoint import get_checkpointer, run_config, find_resume_point, prune_checkpoints
+from src.graph.nodes import planner_node, executor_node, synthesizer_node, gap_analysis_node
+from src.graph.nodes import make_executor_shard, traced_node
+from src.agents.pool import agent_pool
+from src.utils.config import settings
 from src.utils.logging import setup_logger
+from src.utils.tracing import prune_trace_files, start_trace
 
 logger = setup_logger(__name__)
 
+# Compiled graphs by (parallel, iterative, checkpointed, shards), shared across runs
+_graph_cache: Dict[Tuple[bool, bool, bool, int], object] = {}
+_graph_lock = threading.Lock()
 
-def build_research_graph():
+
+def shard_names(count: int) -> List[str]:
+    """Node names of the parallel executor branches."""
+    return [f"executor_{i}" for i in range(count)]
+
+
+def route_to_shards(state: ResearchState) -> List[str]:
+    """
+    Fan out from the planner to one executor branch per query group.
+    
+    Only branches that have at least one query are started; if the
+    planner produced no queries, go straight to the synthesizer.
+    
+    Args:
+        state: State after the planner
+        
+    Returns:
+        Names of the nodes to run next
+    """
+    count = min(len(state.get('search_queries') or []), settings.executor_shards)
+    return shard_names(count) or ["synthesizer"]
+
+
+def should_refine(state: ResearchState) -> str:
+    """
+    Decide after synthesis whether another research pass is worth it.
+    
+    Stops on errors, at max_iterations, or once a pass added fewer new
+    documents than min_marginal_yield of those already collected.
+    
+    Args:
+        state: State after the synthesizer
+        
+    Returns:
+        "gap_analysis" to continue, "end" to stop
+    """
+    iteration = state.get('iteration') or 1
+    if state.get('status') != 'complete' or iteration >= settings.max_iterations:
+        return "end"
+    
+    if iteration > 1:
+        new = state.get('new_documents') or 0
+        before = (state.get('indexed_count') or 0) - new
+        if before and new / before < settings.min_marginal_yield:
+            logger.info(f"Pass {iteration} added {new} documents to {before}, stopping")
+            return "end"
+    
+    return "gap_analysis"
+
+
+def build_research_graph(
+    parallel: Optional[bool] = None,
+    iterative: Optional[bool] = None,
+    checkpointer=None
+):
     """
     Builds the research workflow graph.
     
@@ -20,55 +86,207 @@ def build_research_graph():
     2. Executor Node: Executes queries → collects documents  
     3. Synthesizer Node: Synthesizes documents → generates report
     
+    In parallel mode step 2 is split into up to `executor_shards`
+    branches that run in the same graph step. Their documents merge
+    through the 'documents' reducer and the synthesizer starts once
+    every started branch has finished.
+    
+    In iterative mode the synthesizer is followed by gap analysis, which
+    sends only new queries back to step 2 until coverage is sufficient,
+    max_iterations is reached or a pass adds too few new documents.
+    
+    Args:
+        parallel: Use the fan-out topology (defaults to config graph_mode)
+        iterative: Add the gap analysis loop (defaults to config iterative_research)
+        checkpointer: LangGraph checkpoint saver (runs then need a run_id config)
+        
     Returns:
         Compiled LangGraph that can be invoked with initial state
     """
-    logger.info("Building research workflow graph")
+    # Imported here so importing the workflow module stays cheap
+    from langgraph.graph import StateGraph, END
+    
+    if parallel is None:
+        parallel = settings.graph_mode == 'parallel'
+    if iterative is None:
+        iterative = settings.iterative_research
+    
+    logger.info(f"Building research workflow graph ({'parallel' if parallel else 'sequential'}"
+                f"{', iterative' if iterative else ''})")
     
     # Create state graph with ResearchState schema
     workflow = StateGraph(ResearchState)
     
     # Add nodes
-    workflow.add_node("planner", planner_node)
-    workflow.add_node("executor", executor_node)
-    workflow.add_node("synthesizer", synthesizer_node)
+    workflow.add_node("planner", traced_node("planner", planner_node))
+    workflow.add_node("synthesizer", traced_node("synthesizer", synthesizer_node))
     
     # Define edges (workflow flow)
     workflow.set_entry_point("planner")  # Start with planner
-    workflow.add_edge("planner", "executor")  # planner → executor
-    workflow.add_edge("executor", "synthesizer")  # executor → synthesizer
-    workflow.add_edge("synthesizer", END)  # synthesizer → done
     
+    if parallel:
+        shards = shard_names(settings.executor_shards)
+        for i, name in enumerate(shards):
+            workflow.add_node(name, traced_node(name, make_executor_shard(i, len(shards))))
+            workflow.add_edge(name, "synthesizer")  # each branch → synthesizer
+        workflow.add_conditional_edges("planner", route_to_shards)  # planner → branches
+    else:
+        shards = ["executor"]
+        workflow.add_node("executor", traced_node("executor", executor_node))
+        workflow.add_edge("planner", "executor")  # planner → executor
+        workflow.add_edge("executor", "synthesizer")  # executor → synthesizer
+    
+    if iterative:
+        workflow.add_node("gap_analysis", traced_node("gap_analysis", gap_analysis_node))
+        
+        # synthesizer → gap analysis, or done
+        workflow.add_conditional_edges(
+            "synthesizer",
+            should_refine,
+            {"gap_analysis": "gap_analysis", "end": END}
+        )
+        
+        # gap analysis → executor(s) with the new queries, or done
+        def route_after_gap(state: ResearchState):
+            """Send the new queries to the executor step, or finish."""
+            if not state.get('search_queries'):
+                return "end"
+            return route_to_shards(state) if parallel else "executor"
+        
+        workflow.add_conditional_edges(
+            "gap_analysis",
+            route_after_gap,
+            {**{name: name for name in shards}, "end": END}
+        )
+    else:
+        workflow.add_edge("synthesizer", END)  # synthesizer → done
+    
+    executor_step = f"{settings.executor_shards} × Executor" if parallel else "Executor"
     logger.info("Workflow graph built successfully")
-    logger.info("Flow: START → Planner → Executor → Synthesizer → END")
+    if iterative:
+        logger.info(f"Flow: START → Planner → {executor_step} → Synthesizer "
+                    f"⇄ Gap Analysis (≤ {settings.max_iterations} passes) → END")
+    else:
+        logger.info(f"Flow: START → Planner → {executor_step} → Synthesizer → END")
     
     # Compile and return
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
+
+
+def get_research_graph(
+    parallel: Optional[bool] = None,
+    iterative: Optional[bool] = None,
+    checkpointed: bool = False
+):
+    """
+    Get the compiled research graph, building it once per process.
+    
+    Compiled graphs hold no per-run state, so one instance can serve
+    every run (including concurrent ones).
+    
+    Args:
+        parallel: Use the fan-out topology (defaults to config graph_mode)
+        iterative: Add the gap analysis loop (defaults to config iterative_research)
+        checkpointed: Save state to the checkpoint store after every step
+        
+    Returns:
+        Compiled LangGraph that can be invoked with initial state
+    """
+    if parallel is None:
+        parallel = settings.graph_mode == 'parallel'
+    if iterative is None:
+        iterative = settings.iterative_research
+    
+    key = (parallel, iterative, checkpointed, settings.executor_shards)
+    with _graph_lock:
+        if key not in _graph_cache:
+            checkpointer = get_checkpointer() if checkpointed else None
+            _graph_cache[key] = build_research_graph(parallel, iterative, checkpointer)
+        return _graph_cache[key]
+
+
+def with_url_registry(config: Optional[Dict] = None) -> Dict:
+    """
+    Add a fresh run-scoped UrlRegistry to a run config.
+    
+    Args:
+        config: LangGraph run config (may be None)
+        
+    Returns:
+        Config whose 'configurable' carries 'url_registry'
+    """
+    config = dict(config or {})
+    config['configurable'] = {'url_registry': UrlRegistry(), **config.get('configurable', {})}
+    return config
 
 
-def run_research(topic: str) -> ResearchState:
+def invoke_traced(graph, graph_input, config: Optional[Dict], run_id: str) -> ResearchState:
+    """
+    Invoke the graph while recording per-stage timing spans.
+    
+    The span summary is put in the final state's 'timings'. With
+    export_traces on, every span is also appended to
+    <trace_dir>/<run_id>.jsonl and old trace files are pruned.
+    
+    Args:
+        graph: Compiled research graph
+        graph_input: Initial state (None to resume from a checkpoint)
+        config: LangGraph run config
+        run_id: Research run ID
+        
+    Returns:
+        Final state
+    """
+    # One single-flight URL registry for every executor branch of the run
+    config = with_url_registry(config)
+    
+    if not settings.enable_tracing:
+        return graph.invoke(graph_input, config)
+    
+    with start_trace(run_id) as trace:
+        final_state = graph.invoke(graph_input, config)
+    
+    final_state['timings'] = trace.summary()
+    if settings.export_traces:
+        trace.export_jsonl(os.path.join(settings.trace_dir, f"{run_id}.jsonl"))
+        prune_trace_files(settings.trace_dir, settings.trace_max_files)
+    return final_state
+
+
+def run_research(topic: str, run_id: Optional[str] = None) -> ResearchState:
     """
     Convenience function to run research workflow.
     
+    With checkpoints enabled, state is saved after every step under
+    run_id so a failed run can be continued with resume_research().
+    
     Args:
         topic: Research topic to investigate
+        run_id: Checkpoint key for this run (generated if not given)
         
     Returns:
         Final state with report and sources
     """
-    logger.info(f"Starting research workflow for topic: {topic}")
+    run_id = run_id or str(uuid.uuid4())
+    logger.info(f"Starting research workflow for topic: {topic} (run {run_id})")
     
-    # Build graph
-    graph = build_research_graph()
+    # Reuse the compiled graph
+    graph = get_research_graph(checkpointed=settings.enable_checkpoints)
+    config = run_config(run_id) if settings.enable_checkpoints else None
     
     # Initialize state
     initial_state = {
         'topic': topic,
+        'run_id': run_id,
         'documents': [],
         'logs': [],
         'subtopics': [],
         'search_queries': [],
         'session_id': '',
+        'indexed_count': 0,
+        'iteration': 1,
+        'executed_queries': [],
+        'new_documents': 0,
         'report': '',
         'sources': [],
         'status': 'initialized',
@@ -77,13 +295,81 @@ def run_research(topic: str) -> ResearchState:
     
     # Execute workflow
     logger.info("Executing workflow...")
-    final_state = graph.invoke(initial_state)
+    final_state = invoke_traced(graph, initial_state, config, run_id)
+    if settings.enable_checkpoints:
+        prune_checkpoints()
     
     logger.info(f"Workflow completed with status: {final_state['status']}")
     
     return final_state
 
 
+def resume_research(run_id: str) -> ResearchState:
+    """
+    Continue a checkpointed run from its last successful step.
+    
+    Completed steps (planning, searches, scrapes) are not repeated.
+    
+    Args:
+        run_id: ID of the run to resume
+        
+    Returns:
+        Final state with report and sources
+    """
+    graph = get_research_graph(checkpointed=True)
+    
+    resume_config = find_resume_point(graph, run_id)
+    if resume_config is None:
+        logger.info(f"Run {run_id} already complete")
+        return graph.get_state(run_config(run_id)).values
+    
+    logger.info("Resuming workflow...")
+    final_state = invoke_traced(graph, None, resume_config, run_id)
+    prune_checkpoints()
+    
+    logger.info(f"Workflow completed with status: {final_state['status']}")
+    
+    return final_state
+
+
+def resynthesize(run_id: str, system_prompt: Optional[str] = None) -> ResearchState:
+    """
+    Write a new report from a checkpointed run's documents.
+    
+    Nothing is searched or scraped: the documents come from the
+    checkpoint. The session collection is reused, or rebuilt from those
+    documents if it has been garbage-collected since.
+    
+    Args:
+        run_id: ID of a run whose documents were collected
+        system_prompt: Synthesizer system prompt to use instead of the default
+        
+    Returns:
+        Updated state with the new report (also saved to the checkpoint)
+    """
+    graph = get_research_graph(checkpointed=True)
+    config = run_config(run_id)
+    
+    state = graph.get_state(config).values
+    if not state or not state.get('documents'):
+        raise ValueError(f"No collected documents in checkpoint for run {run_id}")
+    
+    logger.info(f"Re-synthesizing run {run_id} from {len(state['documents'])} documents")
+    
+    # An evicted session collection is re-indexed from the checkpointed documents
+    if state.get('session_id') and not agent_pool.synthesizer.retriever.has_session(state['session_id']):
+        logger.info(f"Session {state['session_id']} was evicted, re-indexing its documents")
+        state = {**state, 'indexed_count': 0}
+    
+    update = synthesizer_node(state, run_config(run_id, system_prompt=system_prompt))
+    
+    # Record the new report as the synthesizer's output
+    graph.update_state(config, update, as_node="synthesizer")
+    prune_checkpoints()
+    
+    return graph.get_state(config).values
+
+
 # Example usage
 if __name__ == "__main__":
     # Test the workflow
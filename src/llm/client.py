@@ -2,41 +2,156 @@
 from langchain_openai import ChatOpenAI 
 #from langchain.chat_models import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator, AsyncIterator, Tuple
+import asyncio
+import functools
 import json
+import os
+import threading
+import time
+from ..utils.cache import DiskCache, MemoryCache, make_key
 from ..utils.config import settings
 from ..utils.logging import setup_logger
+from ..utils.tracing import span
+from .json_parser import extract_json
+from .rate_limiter import Priority, get_rate_limiter
 
 logger = setup_logger(__name__)
 
+# openai exceptions worth retrying besides rate limits (APITimeoutError
+# subclasses APIConnectionError)
+TRANSIENT_ERRORS = ('APIConnectionError', 'InternalServerError')
+
+# Chat models shared by every client with the same configuration
+_chat_models: Dict[tuple, ChatOpenAI] = {}
+_chat_models_lock = threading.Lock()
+
+# Response caches shared by every client (see get_response_caches)
+_response_caches: Optional[Tuple[Optional[MemoryCache], Optional[DiskCache]]] = None
+_response_caches_lock = threading.Lock()
+
+
+def get_chat_model(model: str, temperature: float) -> ChatOpenAI:
+    """
+    Get the shared chat model for a model/temperature pair.
+    
+    Sharing one ChatOpenAI per configuration shares its HTTP connection
+    pools (sync and async) across agents and sessions. Its own retries
+    are off: 429s and transient errors are retried through the rate
+    limiter instead (see LLMClient._retry_delay).
+    
+    Args:
+        model: Model name
+        temperature: Sampling temperature
+        
+    Returns:
+        ChatOpenAI instance
+    """
+    key = (model, temperature)
+    with _chat_models_lock:
+        if key not in _chat_models:
+            _chat_models[key] = ChatOpenAI(
+                model=model,
+                temperature=temperature,
+                max_tokens=settings.max_tokens,
+                openai_api_key=settings.openai_api_key,
+                max_retries=0
+            )
+        return _chat_models[key]
+
+
+@functools.lru_cache(maxsize=None)
+def _structured_output_supported() -> bool:
+    """
+    Check that the installed SDKs can send a response_format.
+    
+    langchain-openai routes any response_format through
+    client.beta.chat.completions.parse, which older openai releases
+    (e.g. the pinned 1.12) don't have.
+    
+    Returns:
+        True if structured output can be requested
+    """
+    from openai.resources.beta import Beta
+    
+    if hasattr(Beta, 'chat'):
+        return True
+    logger.warning(f"LLM_JSON_MODE={settings.llm_json_mode} needs a newer openai package; "
+                   f"sending JSON calls without response_format")
+    return False
+
+
+def get_response_caches() -> Tuple[Optional[MemoryCache], Optional[DiskCache]]:
+    """
+    Get the process-wide LLM response caches.
+    
+    Returns:
+        (memory tier, disk tier); either is None when disabled
+    """
+    global _response_caches
+    with _response_caches_lock:
+        if _response_caches is None:
+            memory, disk = None, None
+            if settings.enable_caching:
+                memory = MemoryCache(
+                    max_entries=settings.llm_cache_max_entries,
+                    ttl=settings.llm_cache_ttl
+                )
+                if settings.llm_cache_disk:
+                    disk = DiskCache(
+                        os.path.join(settings.cache_dir, 'llm.sqlite'),
+                        ttl=settings.llm_cache_ttl,
+                        max_bytes=settings.llm_cache_max_mb * 1024 * 1024
+                    )
+            _response_caches = (memory, disk)
+        return _response_caches
+
+
 class LLMClient:
     """Wrapper for OpenAI LLM with standard configurations."""
     
-    def __init__(self, temperature: float = 0.7, model: Optional[str] = None):
+    def __init__(
+        self,
+        temperature: float = 0.7,
+        model: Optional[str] = None,
+        name: str = "llm",
+        priority: int = Priority.NORMAL
+    ):
         """
         Initialize LLM client.
         
         Args:
             temperature: Sampling temperature
             model: Model name (defaults to config)
+            name: Caller name used in timing spans ("llm.<name>")
+            priority: Default scheduling priority (Priority.*)
         """
         self.model = model or settings.llm_model
         self.temperature = temperature
-        self.llm = ChatOpenAI(
-            model=self.model,
-            temperature=self.temperature,
-            max_tokens=settings.max_tokens,
-            openai_api_key=settings.openai_api_key
-        )
+        self.span_name = f"llm.{name}" if name != "llm" else "llm"
+        self.priority = priority
+        self.llm = get_chat_model(self.model, self.temperature)
+        self.limiter = get_rate_limiter()
+        self.cache, self.disk_cache = get_response_caches()
         logger.info(f"Initialized LLM client with model: {self.model}")
     
-    def invoke(self, system_prompt: str, user_message: str) -> str:
+    def invoke(
+        self,
+        system_prompt: str,
+        user_message: str,
+        priority: Optional[int] = None,
+        use_cache: bool = False,
+        cache_context: Optional[str] = None
+    ) -> str:
         """
         Invoke LLM with system and user messages.
         
         Args:
             system_prompt: System instruction
             user_message: User input
+            priority: Scheduling priority (defaults to the client's)
+            use_cache: Serve a cached response for an identical earlier call
+            cache_context: Retrieved context the answer depends on (part of the cache key)
             
         Returns:
             LLM response as string
@@ -46,41 +161,501 @@ class LLMClient:
                 SystemMessage(content=system_prompt),
                 HumanMessage(content=user_message)
             ]
-            response = self.llm.invoke(messages)
-            return response.content
-            
+            key = self._cache_key(messages, cache_context) if use_cache else None
+            with span(self.span_name, model=self.model) as record:
+                content = self._complete(messages, priority, record, key)
+            self._cache_set(key, content)
+            return content
+        
         except Exception as e:
             logger.error(f"LLM invocation failed: {str(e)}")
             raise
     
-    def invoke_with_json(self, system_prompt: str, user_message: str) -> Dict:
+    async def ainvoke(
+        self,
+        system_prompt: str,
+        user_message: str,
+        priority: Optional[int] = None,
+        use_cache: bool = False,
+        cache_context: Optional[str] = None
+    ) -> str:
         """
-        Invoke LLM and parse response as JSON.
+        Async invoke(): waits for the rate limiter and the API without holding a thread.
         
         Args:
             system_prompt: System instruction
             user_message: User input
+            priority: Scheduling priority (defaults to the client's)
+            use_cache: Serve a cached response for an identical earlier call
+            cache_context: Retrieved context the answer depends on (part of the cache key)
             
         Returns:
-            Parsed JSON response as dict
+            LLM response as string
         """
         try:
-            # Add JSON instruction to system prompt
-            json_system_prompt = system_prompt + "\n\nYou must respond with valid JSON only."
+            messages = [
+                SystemMessage(content=system_prompt),
+                HumanMessage(content=user_message)
+            ]
+            key = self._cache_key(messages, cache_context) if use_cache else None
+            with span(self.span_name, model=self.model) as record:
+                content = await self._acomplete(messages, priority, record, key)
+            self._cache_set(key, content)
+            return content
+        
+        except Exception as e:
+            logger.error(f"LLM invocation failed: {str(e)}")
+            raise
+    
+    def stream(self, system_prompt: str, user_message: str, priority: Optional[int] = None) -> Iterator[str]:
+        """
+        Invoke LLM and yield the response as it is generated.
+        
+        Args:
+            system_prompt: System instruction
+            user_message: User input
+            priority: Scheduling priority (defaults to the client's)
             
+        Yields:
+            Response text fragments, in order
+        """
+        try:
             messages = [
-                SystemMessage(content=json_system_prompt),
+                SystemMessage(content=system_prompt),
                 HumanMessage(content=user_message)
             ]
-            response = self.llm.invoke(messages)
+            with span(self.span_name, model=self.model, streamed=True) as record:
+                record['output_chars'] = 0
+                for attempt in range(settings.llm_max_retries + 1):
+                    with self.limiter.slot(self._estimate_tokens(messages), self._priority(priority)) as reservation:
+                        try:
+                            for chunk in self.llm.stream(messages):
+                                if chunk.content:
+                                    record['output_chars'] += len(chunk.content)
+                                    yield chunk.content
+                        except Exception as e:
+                            # Text already yielded can't be taken back, so only retry before it
+                            delay = None if record['output_chars'] else self._retry_delay(e, attempt)
+                            if delay is None:
+                                raise
+                        else:
+                            reservation.settle(self._estimate_tokens(messages, record['output_chars']))
+                            return
+                    time.sleep(delay)
+        
+        except Exception as e:
+            logger.error(f"LLM streaming failed: {str(e)}")
+            raise
+    
+    async def astream(self, system_prompt: str, user_message: str, priority: Optional[int] = None) -> AsyncIterator[str]:
+        """
+        Async stream(): yields response text fragments as they arrive.
+        
+        Args:
+            system_prompt: System instruction
+            user_message: User input
+            priority: Scheduling priority (defaults to the client's)
             
-            # Parse JSON response
-            return json.loads(response.content)
+        Yields:
+            Response text fragments, in order
+        """
+        try:
+            messages = [
+                SystemMessage(content=system_prompt),
+                HumanMessage(content=user_message)
+            ]
+            with span(self.span_name, model=self.model, streamed=True) as record:
+                record['output_chars'] = 0
+                for attempt in range(settings.llm_max_retries + 1):
+                    async with self.limiter.aslot(self._estimate_tokens(messages), self._priority(priority)) as reservation:
+                        try:
+                            async for chunk in self.llm.astream(messages):
+                                if chunk.content:
+                                    record['output_chars'] += len(chunk.content)
+                                    yield chunk.content
+                        except Exception as e:
+                            delay = None if record['output_chars'] else self._retry_delay(e, attempt)
+                            if delay is None:
+                                raise
+                        else:
+                            reservation.settle(self._estimate_tokens(messages, record['output_chars']))
+                            return
+                    await asyncio.sleep(delay)
+        
+        except Exception as e:
+            logger.error(f"LLM streaming failed: {str(e)}")
+            raise
+    
+    def invoke_with_json(
+        self,
+        system_prompt: str,
+        user_message: str,
+        priority: Optional[int] = None,
+        use_cache: bool = False,
+        cache_context: Optional[str] = None,
+        schema: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Invoke LLM and parse response as JSON.
+        
+        Replies go through a tolerant parser, so fenced, chatty or
+        truncated JSON is repaired locally instead of failing the call.
+        With Settings.llm_json_mode on (and SDKs that support it), the
+        API's structured output is requested as well.
+        
+        Args:
+            system_prompt: System instruction
+            user_message: User input
+            priority: Scheduling priority (defaults to the client's)
+            use_cache: Serve a cached response for an identical earlier call
+            cache_context: Retrieved context the answer depends on (part of the cache key)
+            schema: {"name": ..., "schema": <JSON schema>} to constrain the output
+                to in json_schema mode (JSON mode is used without one)
+                
+        Returns:
+            Parsed JSON response as dict
+        """
+        try:
+            messages = self._json_messages(system_prompt, user_message)
+            response_format = self._response_format(schema)
+            key = self._cache_key(messages, cache_context, response_format) if use_cache else None
+            with span(self.span_name, model=self.model, json=True) as record:
+                content = self._complete(messages, priority, record, key, response_format)
             
+            # Parse JSON response (only parseable responses are cached)
+            result = extract_json(content)
+            self._cache_set(key, content)
+            return result
+        
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse JSON response: {str(e)}")
-            logger.error(f"Response was: {response.content}")
+            logger.error(f"Response was: {content}")
             raise
         except Exception as e:
             logger.error(f"LLM JSON invocation failed: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+    
+    async def ainvoke_with_json(
+        self,
+        system_prompt: str,
+        user_message: str,
+        priority: Optional[int] = None,
+        use_cache: bool = False,
+        cache_context: Optional[str] = None,
+        schema: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Async invoke_with_json().
+        
+        Args:
+            system_prompt: System instruction
+            user_message: User input
+            priority: Scheduling priority (defaults to the client's)
+            use_cache: Serve a cached response for an identical earlier call
+            cache_context: Retrieved context the answer depends on (part of the cache key)
+            schema: {"name": ..., "schema": <JSON schema>} for json_schema mode
+            
+        Returns:
+            Parsed JSON response as dict
+        """
+        try:
+            messages = self._json_messages(system_prompt, user_message)
+            response_format = self._response_format(schema)
+            key = self._cache_key(messages, cache_context, response_format) if use_cache else None
+            with span(self.span_name, model=self.model, json=True) as record:
+                content = await self._acomplete(messages, priority, record, key, response_format)
+            
+            result = extract_json(content)
+            self._cache_set(key, content)
+            return result
+        
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse JSON response: {str(e)}")
+            logger.error(f"Response was: {content}")
+            raise
+        except Exception as e:
+            logger.error(f"LLM JSON invocation failed: {str(e)}")
+            raise
+    
+    def cache_stats(self) -> Dict[str, int]:
+        """
+        Get response cache counters (shared by all clients).
+        
+        Returns:
+            Dict with hits, misses, size (and disk_size when the disk tier is on)
+        """
+        if not self.cache:
+            return {'hits': 0, 'misses': 0, 'size': 0}
+        
+        memory = self.cache.stats()
+        if not self.disk_cache:
+            return memory
+        
+        # Memory misses fall through to disk, so disk decides the final miss count
+        disk = self.disk_cache.stats()
+        return {
+            'hits': memory['hits'] + disk['hits'],
+            'misses': disk['misses'],
+            'size': memory['size'],
+            'disk_size': disk['size']
+        }
+    
+    def _complete(
+        self,
+        messages: List,
+        priority: Optional[int],
+        record: Dict,
+        cache_key: Optional[str],
+        response_format: Optional[Dict] = None
+    ) -> str:
+        """
+        Get response text from the cache or the API.
+        
+        Args:
+            messages: Chat messages
+            priority: Scheduling priority (None for the client's)
+            record: Span record for usage and cache_hit
+            cache_key: Response cache key (None to bypass the cache)
+            response_format: OpenAI response_format for structured output
+            
+        Returns:
+            Response text
+        """
+        cached = self._cache_get(cache_key)
+        if cache_key:
+            record['cache_hit'] = cached is not None
+        if cached is not None:
+            logger.info(f"LLM cache hit ({self.span_name})")
+            return cached
+        
+        response = self._call(messages, priority, response_format)
+        self._record_usage(record, response)
+        return response.content
+    
+    async def _acomplete(
+        self,
+        messages: List,
+        priority: Optional[int],
+        record: Dict,
+        cache_key: Optional[str],
+        response_format: Optional[Dict] = None
+    ) -> str:
+        """Async _complete()."""
+        cached = self._cache_get(cache_key)
+        if cache_key:
+            record['cache_hit'] = cached is not None
+        if cached is not None:
+            logger.info(f"LLM cache hit ({self.span_name})")
+            return cached
+        
+        response = await self._acall(messages, priority, response_format)
+        self._record_usage(record, response)
+        return response.content
+    
+    def _call(self, messages: List, priority: Optional[int], response_format: Optional[Dict] = None):
+        """
+        Send messages through the rate limiter, retrying rate-limit and
+        transient errors.
+        
+        Args:
+            messages: Chat messages
+            priority: Scheduling priority (None for the client's)
+            response_format: OpenAI response_format (None for plain text)
+            
+        Returns:
+            Chat model response
+        """
+        for attempt in range(settings.llm_max_retries + 1):
+            with self.limiter.slot(self._estimate_tokens(messages), self._priority(priority)) as reservation:
+                try:
+                    response = self.llm.invoke(messages, **self._format_kwargs(response_format))
+                except Exception as e:
+                    delay = self._retry_delay(e, attempt)
+                    if delay is None:
+                        raise
+                else:
+                    reservation.settle(self._usage_tokens(messages, response))
+                    return response
+            # Back off outside the slot so other requests can use it
+            time.sleep(delay)
+    
+    async def _acall(self, messages: List, priority: Optional[int], response_format: Optional[Dict] = None):
+        """Async _call()."""
+        for attempt in range(settings.llm_max_retries + 1):
+            async with self.limiter.aslot(self._estimate_tokens(messages), self._priority(priority)) as reservation:
+                try:
+                    response = await self.llm.ainvoke(messages, **self._format_kwargs(response_format))
+                except Exception as e:
+                    delay = self._retry_delay(e, attempt)
+                    if delay is None:
+                        raise
+                else:
+                    reservation.settle(self._usage_tokens(messages, response))
+                    return response
+            await asyncio.sleep(delay)
+    
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """
+        Decide whether and when a failed request is retried.
+        
+        A 429 pauses the whole limiter for its Retry-After, so every caller
+        backs off. Connection errors, timeouts and 5xx responses only back
+        off the failed request.
+        
+        Args:
+            error: Exception raised by the chat model
+            attempt: Zero-based attempt number
+            
+        Returns:
+            Seconds the caller should wait before retrying (0 when the
+            limiter already holds it back), or None to give up
+        """
+        if attempt >= settings.llm_max_retries:
+            return None
+        
+        if self._is_rate_limit(error):
+            delay = self._retry_after(error)
+            if delay is None:
+                delay = 2 ** attempt
+            logger.warning(f"LLM rate limited (attempt {attempt + 1}), retrying in {delay:.1f}s")
+            self.limiter.penalize(delay)
+            return 0
+        
+        if self._is_transient(error):
+            delay = 2 ** attempt
+            logger.warning(f"LLM request failed ({error}), retrying in {delay}s")
+            return delay
+        
+        return None
+    
+    def _cache_key(
+        self,
+        messages: List,
+        cache_context: Optional[str],
+        response_format: Optional[Dict] = None
+    ) -> str:
+        """Key a call by model, temperature, prompt hash and context hash."""
+        prompt_hash = make_key(*(m.content for m in messages), json.dumps(response_format, sort_keys=True))
+        context_hash = make_key(cache_context or '')
+        return make_key('llm', self.model, self.temperature, prompt_hash, context_hash)
+    
+    @staticmethod
+    def _response_format(schema: Optional[Dict]) -> Optional[Dict]:
+        """
+        Pick the API's structured output mode for a JSON call.
+        
+        Args:
+            schema: {"name": ..., "schema": ...} or None
+            
+        Returns:
+            OpenAI response_format, or None when structured output is off
+        """
+        mode = settings.llm_json_mode
+        if mode != 'off' and not _structured_output_supported():
+            return None
+        if mode == 'json_schema' and schema:
+            return {'type': 'json_schema', 'json_schema': {**schema, 'strict': True}}
+        if mode in ('json_schema', 'json_object'):
+            return {'type': 'json_object'}
+        return None
+    
+    @staticmethod
+    def _format_kwargs(response_format: Optional[Dict]) -> Dict:
+        """Chat model call kwargs for a response_format."""
+        return {'response_format': response_format} if response_format else {}
+    
+    def _cache_get(self, key: Optional[str]) -> Optional[str]:
+        """Look up a response in memory, then on disk (promoting disk hits)."""
+        if not key or not self.cache:
+            return None
+        
+        content = self.cache.get(key)
+        if content is None and self.disk_cache:
+            content = self.disk_cache.get(key)
+            if content is not None:
+                self.cache.set(key, content)
+        return content
+    
+    def _cache_set(self, key: Optional[str], content: str) -> None:
+        """Store a response in every enabled tier."""
+        if not key or not self.cache or not content:
+            return
+        
+        self.cache.set(key, content)
+        if self.disk_cache:
+            self.disk_cache.set(key, content)
+    
+    def _priority(self, priority: Optional[int]) -> int:
+        """Resolve a per-call priority against the client default."""
+        return self.priority if priority is None else priority
+    
+    @staticmethod
+    def _json_messages(system_prompt: str, user_message: str) -> List:
+        """Messages for a JSON call (JSON instruction added to the system prompt)."""
+        json_system_prompt = system_prompt + "\n\nYou must respond with valid JSON only."
+        return [
+            SystemMessage(content=json_system_prompt),
+            HumanMessage(content=user_message)
+        ]
+    
+    @staticmethod
+    def _estimate_tokens(messages: List, output_chars: Optional[int] = None) -> int:
+        """
+        Rough token count (~4 characters per token) for rate budgeting.
+        
+        Args:
+            messages: Chat messages
+            output_chars: Length of the completion, or None to assume max_tokens
+            
+        Returns:
+            Estimated prompt plus completion tokens
+        """
+        prompt_tokens = sum(len(m.content) for m in messages) // 4
+        completion_tokens = settings.max_tokens if output_chars is None else output_chars // 4
+        return prompt_tokens + completion_tokens
+    
+    @classmethod
+    def _usage_tokens(cls, messages: List, response) -> int:
+        """Tokens the API reports for a response, estimated if missing."""
+        usage = (getattr(response, 'response_metadata', None) or {}).get('token_usage') or {}
+        if usage.get('total_tokens') or usage.get('prompt_tokens'):
+            return usage.get('total_tokens') or usage['prompt_tokens'] + usage.get('completion_tokens', 0)
+        return cls._estimate_tokens(messages, len(response.content or ''))
+    
+    @staticmethod
+    def _is_rate_limit(error: Exception) -> bool:
+        """True for HTTP 429 / openai.RateLimitError."""
+        return (
+            getattr(error, 'status_code', None) == 429
+            or type(error).__name__ == 'RateLimitError'
+        )
+    
+    @staticmethod
+    def _is_transient(error: Exception) -> bool:
+        """True for connection errors, timeouts and 5xx responses."""
+        status = getattr(error, 'status_code', None)
+        return (
+            (isinstance(status, int) and status >= 500)
+            or any(cls.__name__ in TRANSIENT_ERRORS for cls in type(error).__mro__)
+        )
+    
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        """Seconds from the response's retry-after-ms / retry-after header, if any."""
+        headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+        try:
+            if headers.get('retry-after-ms'):
+                return float(headers['retry-after-ms']) / 1000
+            if headers.get('retry-after'):
+                return float(headers['retry-after'])
+        except (TypeError, ValueError):
+            pass
+        return None
+    
+    @staticmethod
+    def _record_usage(record: Dict, response) -> None:
+        """Copy token usage from an LLM response onto a timing span."""
+        usage = (getattr(response, 'response_metadata', None) or {}).get('token_usage') or {}
+        record['prompt_tokens'] = usage.get('prompt_tokens', 0)
+        record['completion_tokens'] = usage.get('completion_tokens', 0)
+        record['output_chars'] = len(response.content or '')
\ No newline at end of file
@@ -0,0 +1,153 @@
+"""Tolerant parsing of JSON from LLM responses."""
+
+import json
+from typing import Any, List, Optional
+from src.utils.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+# Partial trailing elements dropped before giving up on a repair
+MAX_REPAIR_CUTS = 5
+
+
+def extract_json(text: str) -> Any:
+    """
+    Parse the first JSON object in an LLM response.
+    
+    Handles, without another LLM call:
+    - code fences and prose before or after the object
+    - trailing commas
+    - output truncated mid-object (open strings, arrays and objects are closed)
+    
+    Args:
+        text: Raw response text
+        
+    Returns:
+        Parsed JSON value
+        
+    Raises:
+        json.JSONDecodeError: If no JSON object can be recovered
+    """
+    text = text or ''
+    
+    # Fast path: the whole response is JSON
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as e:
+        error = e
+    
+    first = text.find('{')
+    if first == -1:
+        raise error
+    
+    # The first object, complete or repaired, wins over any nested or later one
+    decoder = json.JSONDecoder()
+    try:
+        value, _ = decoder.raw_decode(text, first)
+        logger.debug("Extracted JSON object from surrounding text")
+        return value
+    except json.JSONDecodeError:
+        pass
+    
+    value = _try_repair(text[first:])
+    if value is not None:
+        return value
+    
+    # The first brace wasn't JSON (e.g. prose "{like this}"): try later ones
+    start = text.find('{', first + 1)
+    while start != -1:
+        try:
+            value, _ = decoder.raw_decode(text, start)
+            logger.debug("Extracted JSON object from surrounding text")
+            return value
+        except json.JSONDecodeError:
+            start = text.find('{', start + 1)
+    
+    raise error
+
+
+def _try_repair(candidate: str) -> Optional[Any]:
+    """
+    Repair a fragment starting at '{', dropping partial trailing elements if needed.
+    
+    Args:
+        candidate: Text from the opening brace on
+        
+    Returns:
+        Parsed value, or None if it can't be repaired
+    """
+    for _ in range(MAX_REPAIR_CUTS):
+        try:
+            value = json.loads(_repair(candidate))
+            logger.warning("Repaired malformed JSON response")
+            return value
+        except json.JSONDecodeError:
+            cut = candidate.rfind(',')
+            if cut <= 0:
+                return None
+            candidate = candidate[:cut]
+    return None
+
+
+def _repair(fragment: str) -> str:
+    """
+    Fix common defects in a JSON fragment starting at '{'.
+    
+    Args:
+        fragment: Text from the opening brace on
+        
+    Returns:
+        Repaired JSON text (may still be invalid)
+    """
+    out: List[str] = []
+    closers: List[str] = []
+    in_string = False
+    escaped = False
+    
+    for char in fragment:
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+        
+        if char in '}]':
+            _drop_trailing_comma(out)
+            if not closers:
+                break
+            out.append(closers.pop())
+            if not closers:
+                # Object complete; ignore anything after it
+                return ''.join(out)
+            continue
+        
+        if char == '"':
+            in_string = True
+        elif char == '{':
+            closers.append('}')
+        elif char == '[':
+            closers.append(']')
+        out.append(char)
+    
+    # Truncated: close the open string, drop a dangling separator, close containers
+    if in_string:
+        if escaped:
+            out.pop()
+        out.append('"')
+    _drop_trailing_comma(out)
+    while out and out[-1] in ':,':
+        out.pop()
+        _drop_trailing_comma(out)
+    return ''.join(out) + ''.join(reversed(closers))
+
+
+def _drop_trailing_comma(out: List[str]) -> None:
+    """Remove trailing whitespace and a trailing comma from the output buffer."""
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ',':
+        out.pop()
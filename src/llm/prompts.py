@@ -22,6 +22,63 @@ PLANNER_USER_TEMPLATE = """Research Topic: {topic}
 
 Create a research plan. Return only valid JSON."""
 
+PLAN_SCHEMA = {
+    "name": "research_plan",
+    "schema": {
+        "type": "object",
+        "properties": {
+            "subtopics": {"type": "array", "items": {"type": "string"}},
+            "search_queries": {"type": "array", "items": {"type": "string"}}
+        },
+        "required": ["subtopics", "search_queries"],
+        "additionalProperties": False
+    }
+}
+
+
+# ============================================================================
+# GAP ANALYSIS PROMPTS
+# ============================================================================
+
+GAP_SYSTEM_PROMPT = """You are a research planner reviewing a draft report for coverage gaps.
+
+Output JSON with this structure:
+{
+    "sufficient": false,
+    "gaps": ["gap1", "gap2"],
+    "search_queries": ["query1", "query2", "query3"]
+}
+
+Rules:
+- Set "sufficient" to true (and leave "search_queries" empty) if the report already covers the topic well
+- Otherwise list the missing or weakly supported areas as "gaps"
+- Write 1-4 search queries that target only those gaps
+- Never repeat or rephrase a query that was already run"""
+
+GAP_USER_TEMPLATE = """Research Topic: {topic}
+
+Queries already run:
+{executed_queries}
+
+Draft report:
+{report}
+
+Find the coverage gaps. Return only valid JSON."""
+
+GAP_SCHEMA = {
+    "name": "gap_analysis",
+    "schema": {
+        "type": "object",
+        "properties": {
+            "sufficient": {"type": "boolean"},
+            "gaps": {"type": "array", "items": {"type": "string"}},
+            "search_queries": {"type": "array", "items": {"type": "string"}}
+        },
+        "required": ["sufficient", "gaps", "search_queries"],
+        "additionalProperties": False
+    }
+}
+
 
 # ============================================================================
 # SYNTHESIZER PROMPTS  
@@ -0,0 +1,267 @@
+"""
+Rate Limiter
+Process-wide, priority-aware scheduling of LLM requests within
+requests-per-minute, tokens-per-minute and concurrency budgets.
+"""
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator, List, Optional
+from src.utils.config import settings
+from src.utils.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+# How often async waiters re-check the budgets (they can't be notified)
+ASYNC_POLL_INTERVAL = 0.01
+
+
+class Priority:
+    """Request priorities; lower values are scheduled first."""
+    INTERACTIVE = 0   # Q&A a user is waiting on
+    NORMAL = 1        # Planning and gap analysis
+    BATCH = 2         # Report synthesis
+
+
+class Reservation:
+    """Budget taken by one request; settle() refunds the unused tokens."""
+    
+    def __init__(self, limiter: "RateLimiter", tokens: int):
+        self._limiter = limiter
+        self.tokens = tokens
+    
+    def settle(self, used_tokens: int) -> None:
+        """
+        Replace the up-front token estimate with the actual usage.
+        
+        Args:
+            used_tokens: Prompt plus completion tokens reported by the API
+        """
+        if used_tokens < self.tokens:
+            self._limiter._refund(self.tokens - used_tokens)
+            self.tokens = used_tokens
+
+
+class RateLimiter:
+    """
+    Token buckets for requests and tokens per minute, plus a cap on
+    requests in flight.
+    
+    Waiters are served strictly in (priority, arrival) order, so batch
+    work queued behind interactive requests can't overtake them even
+    when a smaller batch request would fit. Sync callers block on a
+    condition; async callers sleep on their event loop instead of
+    holding a thread.
+    """
+    
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_concurrency: int
+    ):
+        """
+        Initialize with full buckets.
+        
+        Args:
+            requests_per_minute: Request budget
+            tokens_per_minute: Token budget (prompt + completion)
+            max_concurrency: Max requests in flight
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrency = max_concurrency
+        
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._refilled_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._in_flight = 0
+        
+        self._queue: List[tuple] = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+    
+    @contextmanager
+    def slot(self, tokens: int, priority: int = Priority.NORMAL) -> Iterator[Reservation]:
+        """
+        Block until the request may run, and hold its slot until exit.
+        
+        Args:
+            tokens: Estimated tokens (prompt + max completion)
+            priority: Priority.* value
+            
+        Yields:
+            Reservation; settle() it with the real token usage
+        """
+        ticket = self._enqueue(priority)
+        with self._cond:
+            try:
+                while True:
+                    delay = self._try_acquire(ticket, tokens)
+                    if delay == 0:
+                        break
+                    # Recheck at least every second in case an async waiter vanished
+                    self._cond.wait(timeout=min(delay or 1.0, 1.0))
+            except BaseException:
+                self._dequeue(ticket)
+                raise
+        
+        reservation = Reservation(self, self._clamp(tokens))
+        try:
+            yield reservation
+        finally:
+            self._finish()
+    
+    @asynccontextmanager
+    async def aslot(self, tokens: int, priority: int = Priority.NORMAL) -> AsyncIterator[Reservation]:
+        """
+        Async slot(): waits on the event loop, not a thread.
+        
+        Args:
+            tokens: Estimated tokens (prompt + max completion)
+            priority: Priority.* value
+            
+        Yields:
+            Reservation; settle() it with the real token usage
+        """
+        ticket = self._enqueue(priority)
+        try:
+            while True:
+                with self._cond:
+                    delay = self._try_acquire(ticket, tokens)
+                if delay == 0:
+                    break
+                await asyncio.sleep(min(delay or ASYNC_POLL_INTERVAL, 1.0))
+        except BaseException:
+            with self._cond:
+                self._dequeue(ticket)
+            raise
+        
+        reservation = Reservation(self, self._clamp(tokens))
+        try:
+            yield reservation
+        finally:
+            self._finish()
+    
+    def penalize(self, seconds: float) -> None:
+        """
+        Hold all requests back, e.g. for a 429's Retry-After.
+        
+        Args:
+            seconds: How long to pause from now
+        """
+        with self._cond:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            logger.warning(f"Rate limited: pausing LLM requests for {seconds:.1f}s")
+    
+    def stats(self) -> dict:
+        """Current budgets and queue length."""
+        with self._cond:
+            self._refill(time.monotonic())
+            return {
+                'requests_available': int(self._requests),
+                'tokens_available': int(self._tokens),
+                'in_flight': self._in_flight,
+                'waiting': len(self._queue),
+            }
+    
+    def _enqueue(self, priority: int) -> tuple:
+        """Join the queue; tickets order by (priority, arrival)."""
+        ticket = (priority, next(self._sequence))
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+        return ticket
+    
+    def _dequeue(self, ticket: tuple) -> None:
+        """Drop an abandoned ticket (caller holds the lock)."""
+        if ticket in self._queue:
+            self._queue.remove(ticket)
+            heapq.heapify(self._queue)
+            self._cond.notify_all()
+    
+    def _try_acquire(self, ticket: tuple, tokens: int) -> Optional[float]:
+        """
+        Take the budget for a ticket if it is first in line and fits.
+        
+        Caller holds the lock.
+        
+        Returns:
+            0 when acquired, seconds until the budget refills, or None
+            to wait for another request to finish or leave the queue
+        """
+        now = time.monotonic()
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        if self._queue[0] != ticket or self._in_flight >= self.max_concurrency:
+            return None
+        
+        self._refill(now)
+        tokens = self._clamp(tokens)
+        missing_requests = 1 - self._requests
+        missing_tokens = tokens - self._tokens
+        if missing_requests > 0 or missing_tokens > 0:
+            return max(
+                missing_requests * 60 / self.requests_per_minute,
+                missing_tokens * 60 / self.tokens_per_minute
+            )
+        
+        self._requests -= 1
+        self._tokens -= tokens
+        self._in_flight += 1
+        heapq.heappop(self._queue)
+        # The next ticket is now first in line
+        self._cond.notify_all()
+        return 0
+    
+    def _refill(self, now: float) -> None:
+        """Top both buckets up for the time since the last refill."""
+        elapsed = now - self._refilled_at
+        self._refilled_at = now
+        self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60)
+        self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60)
+    
+    def _refund(self, tokens: int) -> None:
+        """Return unused tokens to the bucket."""
+        with self._cond:
+            self._tokens = min(self.tokens_per_minute, self._tokens + tokens)
+            self._cond.notify_all()
+    
+    def _finish(self) -> None:
+        """Release a request's concurrency slot."""
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+    
+    def _clamp(self, tokens: int) -> int:
+        """A request larger than the whole bucket waits for a full bucket."""
+        return max(0, min(tokens, self.tokens_per_minute))
+
+
+_rate_limiter: Optional[RateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Get the process-wide LLM rate limiter.
+    
+    Returns:
+        RateLimiter configured from Settings.llm_* budgets
+    """
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter(
+                requests_per_minute=settings.llm_requests_per_minute,
+                tokens_per_minute=settings.llm_tokens_per_minute,
+                max_concurrency=settings.llm_max_concurrency
+            )
+            logger.info(f"LLM rate limiter: {settings.llm_requests_per_minute} RPM, "
+                        f"{settings.llm_tokens_per_minute} TPM, "
+                        f"{settings.llm_max_concurrency} concurrent")
+        return _rate_limiter
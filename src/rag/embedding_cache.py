@@ -0,0 +1,117 @@
+"""Persistent embedding cache keyed by model and content hash."""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from array import array
+from typing import Dict, List, Optional
+from src.utils.config import settings
+from src.utils.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+# SQLite caps bound parameters per statement; stay well below it
+LOOKUP_BATCH_SIZE = 500
+
+
+class EmbeddingCache:
+    """
+    SQLite store of embedding vectors keyed by (model, sha256(text)).
+    
+    Vectors are stored as packed float32 blobs, about 6 KB per
+    1536-dimension embedding.
+    """
+    
+    def __init__(self, path: Optional[str] = None):
+        """
+        Open (or create) the embedding cache.
+        
+        Args:
+            path: SQLite file (defaults to <cache_dir>/embeddings.sqlite)
+        """
+        self.path = path or os.path.join(settings.cache_dir, 'embeddings.sqlite')
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " model TEXT NOT NULL, text_hash TEXT NOT NULL, vector BLOB NOT NULL,"
+                " PRIMARY KEY (model, text_hash)) WITHOUT ROWID"
+            )
+        
+        logger.info(f"Embedding cache opened: {self.path}")
+    
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Look up embeddings for many texts at once.
+        
+        Args:
+            model: Embedding model name
+            texts: Texts to look up
+        
+        Returns:
+            One vector per text, None where not cached
+        """
+        hashes = [self._hash(text) for text in texts]
+        found: Dict[str, List[float]] = {}
+        
+        with self._lock:
+            unique = list(dict.fromkeys(hashes))
+            for start in range(0, len(unique), LOOKUP_BATCH_SIZE):
+                batch = unique[start:start + LOOKUP_BATCH_SIZE]
+                placeholders = ','.join('?' * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings"
+                    f" WHERE model = ? AND text_hash IN ({placeholders})",
+                    (model, *batch)
+                ).fetchall()
+                for text_hash, blob in rows:
+                    found[text_hash] = array('f', blob).tolist()
+            
+            vectors = [found.get(h) for h in hashes]
+            hits = sum(1 for v in vectors if v is not None)
+            self.hits += hits
+            self.misses += len(vectors) - hits
+        
+        return vectors
+    
+    def put_many(self, model: str, texts: List[str], vectors: List[List[float]]) -> None:
+        """
+        Store embeddings for many texts at once.
+        
+        Args:
+            model: Embedding model name
+            texts: Embedded texts
+            vectors: Their embeddings, in the same order
+        """
+        rows = [
+            (model, self._hash(text), array('f', vector).tobytes())
+            for text, vector in zip(texts, vectors)
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)",
+                rows
+            )
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache counters.
+        
+        Returns:
+            Dict with hits, misses and stored vector count
+        """
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        return {'hits': self.hits, 'misses': self.misses, 'size': count}
+    
+    @staticmethod
+    def _hash(text: str) -> str:
+        """Content hash of a text."""
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
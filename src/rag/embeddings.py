@@ -1,62 +1,329 @@
 """Embedding function for ChromaDB."""
 
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from openai import OpenAI
 from chromadb.api.types import EmbeddingFunction, Documents
-from typing import List
+from typing import Dict, List, Optional
+from src.rag.embedding_cache import EmbeddingCache
 from src.utils.config import settings
 from src.utils.logging import setup_logger
+from src.utils.tracing import span, submit
 
 logger = setup_logger(__name__)
 
+# Rough chars-per-token ratio for English when tiktoken is unavailable
+CHARS_PER_TOKEN = 4
 
-class CustomOpenAIEmbedding(EmbeddingFunction):
+# Settings.embedding_model prefix selecting the local backend
+LOCAL_MODEL_PREFIX = "local:"
+
+
+class CachedEmbeddingFunction(EmbeddingFunction, ABC):
+    """Base embedding function that serves repeated texts from an EmbeddingCache."""
+    
+    model: str
+    cache: Optional[EmbeddingCache]
+    
+    def __call__(self, input: Documents) -> List[List[float]]:
+        """
+        Generate embeddings for input texts.
+        
+        Cached vectors are looked up in one batch; only the misses are
+        sent to the API, then written back to the cache.
+        
+        Args:
+            input: List of text strings
+            
+        Returns:
+            List of embedding vectors
+        """
+        texts = list(input)
+        
+        with span('embed', model=self.model, texts=len(texts)) as record:
+            embeddings = self.cache.get_many(self.model, texts) if self.cache else [None] * len(texts)
+            
+            misses = [i for i, vector in enumerate(embeddings) if vector is None]
+            record['cache_hits'] = len(texts) - len(misses)
+            if misses:
+                # Embed each distinct missing text once
+                unique_texts = list(dict.fromkeys(texts[i] for i in misses))
+                fresh = self._embed(unique_texts)
+                
+                by_text = dict(zip(unique_texts, fresh))
+                for i in misses:
+                    embeddings[i] = by_text[texts[i]]
+                
+                if self.cache:
+                    self.cache.put_many(self.model, unique_texts, fresh)
+        
+        if self.cache:
+            logger.info(f"Embedded {len(texts)} texts ({len(texts) - len(misses)} from cache)")
+        
+        return embeddings
+    
+    @abstractmethod
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts that missed the cache.
+        
+        Args:
+            texts: Texts to embed
+        
+        Returns:
+            Embedding vectors in input order
+        """
+
+
+class CustomOpenAIEmbedding(CachedEmbeddingFunction):
     """Custom embedding function using new OpenAI API (>=1.0.0)."""
     
-    def __init__(self, api_key: str, model: str):
+    def __init__(self, api_key: str, model: str, cache: Optional[EmbeddingCache] = None):
         """
         Initialize with OpenAI client.
         
         Args:
             api_key: OpenAI API key
             model: Embedding model name
+            cache: Persistent embedding cache (None disables caching)
         """
-        self.client = OpenAI(api_key=api_key)
+        # Retries are handled per batch in _embed_batch
+        self.client = OpenAI(api_key=api_key, max_retries=0)
         self.model = model
+        self.cache = cache
+        self._encoding = self._load_encoding(model)
         logger.info(f"Custom embedding function created with model: {model}")
     
-    def __call__(self, input: Documents) -> List[List[float]]:
+    def _embed(self, texts: List[str]) -> List[List[float]]:
         """
-        Generate embeddings for input texts.
+        Embed texts in token-bounded batches sent concurrently.
         
         Args:
-            input: List of text strings
-            
+            texts: Texts to embed
+        
         Returns:
-            List of embedding vectors
+            Embedding vectors in input order
         """
-        # Call OpenAI API
-        response = self.client.embeddings.create(
-            input=input,
-            model=self.model
-        )
+        batches = self._make_batches(texts)
+        if len(batches) == 1:
+            return self._embed_batch(texts)
+        
+        logger.info(f"Embedding {len(texts)} texts in {len(batches)} batches")
+
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+        with ThreadPoolExecutor(
+            max_workers=min(settings.embedding_max_parallel, len(batches)),
+            thread_name_prefix="embed"
+        ) as pool:
+            futures = {
+                submit(pool, self._embed_batch, [texts[i] for i in batch]): batch
+                for batch in batches
+            }
+            for future in as_completed(futures):
+                # Put each batch's vectors back at their original positions
+                for i, vector in zip(futures[future], future.result()):
+                    embeddings[i] = vector
         
-        # Extract embeddings
-        embeddings = [item.embedding for item in response.data]
         return embeddings
+    
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Call the embeddings API for one batch, retrying with backoff.
+        
+        Args:
+            texts: Texts to embed
+        
+        Returns:
+            Embedding vectors in input order
+        """
+        for attempt in range(settings.embedding_max_retries + 1):
+            try:
+                with span('embed.batch', items=len(texts), attempt=attempt) as record:
+                    # Call OpenAI API
+                    response = self.client.embeddings.create(
+                        input=texts,
+                        model=self.model
+                    )
+                    record['tokens'] = getattr(response.usage, 'total_tokens', 0)
+                
+                # Extract embeddings
+                return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+            
+            except Exception as e:
+                if attempt == settings.embedding_max_retries:
+                    raise
+                delay = 2 ** attempt
+                logger.warning(f"Embedding batch of {len(texts)} failed ({e}), retrying in {delay}s")
+                time.sleep(delay)
+    
+    def _make_batches(self, texts: List[str]) -> List[List[int]]:
+        """
+        Group text indices into batches bounded by item and token count.
+        
+        Args:
+            texts: Texts to batch
+        
+        Returns:
+            List of index batches (a single oversized text gets its own batch)
+        """
+        batches: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+        
+        for i, text in enumerate(texts):
+            tokens = self._count_tokens(text)
+            if current and (len(current) >= settings.embedding_batch_max_items
+                            or current_tokens + tokens > settings.embedding_batch_max_tokens):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+        
+        if current:
+            batches.append(current)
+        return batches
+    
+    def _count_tokens(self, text: str) -> int:
+        """Count (or estimate) tokens in a text."""
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return len(text) // CHARS_PER_TOKEN + 1
+    
+    @staticmethod
+    def _load_encoding(model: str):
+        """
+        Load the tiktoken encoding for a model.
+        
+        Args:
+            model: Embedding model name
+        
+        Returns:
+            tiktoken Encoding, or None to fall back to a character estimate
+        """
+        try:
+            import tiktoken
+            try:
+                return tiktoken.encoding_for_model(model)
+            except KeyError:
+                return tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            logger.warning(f"tiktoken unavailable ({e}), estimating tokens from length")
+            return None
+
+
+class LocalEmbedding(CachedEmbeddingFunction):
+    """Embedding function running a sentence-transformers model on local CPU."""
+    
+    # Loaded models, shared by every instance in the process
+    _models: Dict[str, object] = {}
+    _models_lock = threading.Lock()
+    
+    def __init__(
+        self,
+        model: str,
+        cache: Optional[EmbeddingCache] = None,
+        batch_size: Optional[int] = None,
+        threads: Optional[int] = None
+    ):
+        """
+        Initialize local embedding function (the model loads on first use).
+        
+        Args:
+            model: Configured model name, e.g. "local:all-MiniLM-L6-v2"
+            cache: Persistent embedding cache (None disables caching)
+            batch_size: Texts per inference batch (defaults to config)
+            threads: Torch CPU threads, 0 for torch default (defaults to config)
+        """
+        self.model = model
+        self.model_name = model[len(LOCAL_MODEL_PREFIX):] if model.startswith(LOCAL_MODEL_PREFIX) else model
+        self.cache = cache
+        self.batch_size = batch_size or settings.embedding_local_batch_size
+        self.threads = settings.embedding_threads if threads is None else threads
+        self._encode_lock = threading.Lock()
+        logger.info(f"Local embedding function created with model: {self.model_name}")
+    
+    def warm_up(self) -> None:
+        """Load the model and run one inference so the first real call is fast."""
+        start = time.perf_counter()
+        self._load_model().encode(["warm up"], show_progress_bar=False)
+        logger.info(f"Local embedding model ready in {time.perf_counter() - start:.1f}s")
+    
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts with batched local inference.
+        
+        Args:
+            texts: Texts to embed
+        
+        Returns:
+            Normalized embedding vectors in input order
+        """
+        model = self._load_model()
+        
+        # One inference at a time; torch already spreads it across threads
+        with self._encode_lock, span('embed.local', items=len(texts)):
+            vectors = model.encode(
+                texts,
+                batch_size=self.batch_size,
+                normalize_embeddings=True,
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
+        return vectors.tolist()
+    
+    def _load_model(self):
+        """Load (once per process) and return the sentence-transformers model."""
+        with self._models_lock:
+            if self.model_name not in self._models:
+                import torch
+                from sentence_transformers import SentenceTransformer
+                
+                if self.threads:
+                    torch.set_num_threads(self.threads)
+                logger.info(f"Loading local embedding model: {self.model_name}")
+                self._models[self.model_name] = SentenceTransformer(self.model_name, device='cpu')
+            return self._models[self.model_name]
+
+
+def is_local_model(model: str) -> bool:
+    """
+    Check whether a configured embedding model runs locally.
+    
+    Args:
+        model: Settings.embedding_model value
+    
+    Returns:
+        True for "local:<name>" or "sentence-transformers/<name>" models
+    """
+    return model.startswith(LOCAL_MODEL_PREFIX) or model.startswith("sentence-transformers/")
 
 
 def get_embedding_function():
     """
-    Get OpenAI embedding function for ChromaDB.
+    Get embedding function for ChromaDB.
+    
+    Uses a local sentence-transformers model when Settings.embedding_model
+    is "local:<name>" or "sentence-transformers/<name>", otherwise OpenAI.
     
     Returns:
-        Custom OpenAI embedding function compatible with new API
+        Embedding function compatible with ChromaDB
     """
     logger.info(f"Creating embedding function with model: {settings.embedding_model}")
     
+    cache = EmbeddingCache() if settings.enable_caching else None
+    
+    if is_local_model(settings.embedding_model):
+        embedding_fn = LocalEmbedding(model=settings.embedding_model, cache=cache)
+        if settings.embedding_warmup:
+            embedding_fn.warm_up()
+        return embedding_fn
+    
     embedding_fn = CustomOpenAIEmbedding(
         api_key=settings.openai_api_key,
-        model=settings.embedding_model
+        model=settings.embedding_model,
+        cache=cache
     )
     
     return embedding_fn
\ No newline at end of file
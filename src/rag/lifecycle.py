@@ -0,0 +1,409 @@
+"""
+Collection Lifecycle
+Tracks when each session collection was last used and garbage-collects
+expired or excess ones so the Chroma directory stays bounded.
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from src.utils.config import settings
+from src.utils.logging import setup_logger
+from src.utils.tracing import span
+
+logger = setup_logger(__name__)
+
+# Chroma's own SQLite file inside the persist directory
+CHROMA_DB_FILE = "chroma.sqlite3"
+# stats() rescans the persistence directory at most this often (seconds)
+DISK_USAGE_REFRESH_S = 300
+
+
+class CollectionManager:
+    """
+    Last-access tracking and TTL / capacity eviction for Chroma collections.
+    
+    Access times live in a small SQLite file next to the Chroma data.
+    Reads are recorded at most once per `touch_interval` per collection,
+    so queries don't turn into writes. The same file records which
+    shared-corpus chunks each session references (see add_members).
+    """
+    
+    def __init__(
+        self,
+        client,
+        persist_dir: Optional[str] = None,
+        list_names: Optional[Callable[[], List[str]]] = None,
+        delete: Optional[Callable[[str], None]] = None
+    ):
+        """
+        Open the access-time table.
+        
+        Args:
+            client: chromadb client owning the collections
+            persist_dir: Chroma persistence directory (defaults to config)
+            list_names: Returns the names being managed (defaults to the
+                client's collections)
+            delete: Deletes one name (defaults to dropping the collection)
+        """
+        self.client = client
+        self._list_names = list_names or (lambda: [c.name for c in client.list_collections()])
+        self._delete = delete or (lambda name: client.delete_collection(name=name))
+        self.persist_dir = persist_dir or settings.chroma_persist_dir
+        self.ttl = settings.collection_ttl_hours * 3600
+        self.max_collections = settings.max_collections
+        self.touch_interval = settings.collection_touch_interval
+        
+        self._lock = threading.Lock()
+        self._last_touch: Dict[str, float] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.evicted = 0
+        self.last_gc: Dict[str, float] = {}
+        self._disk_usage: Optional[Tuple[float, int]] = None
+        
+        os.makedirs(self.persist_dir, exist_ok=True)
+        self._conn = sqlite3.connect(
+            os.path.join(self.persist_dir, "lifecycle.sqlite"),
+            timeout=30,
+            check_same_thread=False
+        )
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS collections ("
+                " name TEXT PRIMARY KEY, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS members ("
+                " corpus TEXT NOT NULL, session TEXT NOT NULL, chunk_id TEXT NOT NULL,"
+                " metadata TEXT NOT NULL DEFAULT '{}',"
+                " PRIMARY KEY (corpus, session, chunk_id))"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS members_by_chunk ON members (corpus, chunk_id)"
+            )
+    
+    def touch(self, name: str, force: bool = False) -> None:
+        """
+        Record that a collection was used.
+        
+        Args:
+            name: Collection name
+            force: Write even if it was recorded less than touch_interval ago
+        """
+        now = time.time()
+        with self._lock:
+            if not force and now - self._last_touch.get(name, 0) < self.touch_interval:
+                return
+            self._last_touch[name] = now
+            with self._conn:
+                self._conn.execute(
+                    "INSERT INTO collections (name, created_at, accessed_at) VALUES (?, ?, ?)"
+                    " ON CONFLICT(name) DO UPDATE SET accessed_at = excluded.accessed_at",
+                    (name, now, now)
+                )
+    
+    def forget(self, name: str) -> None:
+        """Stop tracking a deleted collection."""
+        with self._lock, self._conn:
+            self._last_touch.pop(name, None)
+            self._conn.execute("DELETE FROM collections WHERE name = ?", (name,))
+    
+    def add_members(self, corpus: str, session: str, chunks: Dict[str, Dict]) -> None:
+        """
+        Record that a session references chunks of a shared corpus.
+        
+        The session's own metadata (url, title, ...) is kept per chunk:
+        the corpus stores only the first session's copy of identical text.
+        
+        Args:
+            corpus: Corpus collection name
+            session: Session name
+            chunks: Chunk ID -> this session's metadata for it (already
+                referenced chunks keep their first metadata)
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO members (corpus, session, chunk_id, metadata)"
+                " VALUES (?, ?, ?, ?)",
+                [
+                    (corpus, session, chunk_id, json.dumps(metadata))
+                    for chunk_id, metadata in chunks.items()
+                ]
+            )
+    
+    def members(self, corpus: str, session: str) -> List[str]:
+        """
+        Chunk IDs a session references in a shared corpus.
+        
+        Args:
+            corpus: Corpus collection name
+            session: Session name
+            
+        Returns:
+            Chunk IDs (empty for unknown sessions)
+        """
+        with self._lock:
+            return [row[0] for row in self._conn.execute(
+                "SELECT chunk_id FROM members WHERE corpus = ? AND session = ?",
+                (corpus, session)
+            )]
+    
+    def member_metadata(self, corpus: str, session: str, chunk_ids: List[str]) -> Dict[str, Dict]:
+        """
+        A session's own metadata for some of its shared-corpus chunks.
+        
+        Args:
+            corpus: Corpus collection name
+            session: Session name
+            chunk_ids: Chunk IDs to look up
+            
+        Returns:
+            Chunk ID -> metadata, for the chunks the session references
+        """
+        metadata: Dict[str, Dict] = {}
+        with self._lock:
+            for start in range(0, len(chunk_ids), 500):
+                batch = chunk_ids[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                for chunk_id, value in self._conn.execute(
+                    "SELECT chunk_id, metadata FROM members WHERE corpus = ? AND session = ?"
+                    f" AND chunk_id IN ({placeholders})",
+                    (corpus, session, *batch)
+                ):
+                    metadata[chunk_id] = json.loads(value)
+        return metadata
+    
+    def release_members(self, corpus: str, session: str) -> List[str]:
+        """
+        Drop a session's references to a shared corpus.
+        
+        Args:
+            corpus: Corpus collection name
+            session: Session name
+            
+        Returns:
+            Chunk IDs no session references any more (safe to delete)
+        """
+        with self._lock, self._conn:
+            chunk_ids = [row[0] for row in self._conn.execute(
+                "SELECT chunk_id FROM members WHERE corpus = ? AND session = ?",
+                (corpus, session)
+            )]
+            self._conn.execute(
+                "DELETE FROM members WHERE corpus = ? AND session = ?", (corpus, session)
+            )
+            still_referenced = set()
+            for start in range(0, len(chunk_ids), 500):
+                batch = chunk_ids[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                still_referenced.update(row[0] for row in self._conn.execute(
+                    f"SELECT DISTINCT chunk_id FROM members WHERE corpus = ? AND chunk_id IN ({placeholders})",
+                    (corpus, *batch)
+                ))
+        return [chunk_id for chunk_id in chunk_ids if chunk_id not in still_referenced]
+    
+    def collect_garbage(self) -> Dict[str, float]:
+        """
+        Delete expired collections, then the least recently used ones
+        over capacity, and remove their index directories.
+        
+        Collections Chroma has but the tracker doesn't (e.g. created
+        before tracking existed) are adopted as freshly used.
+        
+        Returns:
+            Dict with evicted count, remaining collections, bytes freed,
+            bytes on disk afterwards and duration
+        """
+        with span('chroma.gc') as record:
+            start = time.perf_counter()
+            bytes_before = self.disk_usage()
+            
+            existing = set(self._list_names())
+            tracked = self.tracked()
+            for name in existing - set(tracked):
+                self.touch(name, force=True)
+                tracked[name] = time.time()
+            
+            victims = self._select_victims(
+                {name: tracked[name] for name in existing}, time.time()
+            )
+            # Read before deleting: afterwards Chroma no longer knows them
+            victim_segments = self._segment_ids(victims)
+            for name in victims:
+                try:
+                    self._delete(name)
+                except Exception as e:
+                    logger.warning(f"Failed to evict collection {name}: {e}")
+                    victim_segments.pop(name, None)
+                    continue
+                self.forget(name)
+            
+            # Rows for collections deleted outside the tracker
+            for name in set(tracked) - existing:
+                self.forget(name)
+            
+            self._remove_index_dirs(
+                [segment for segments in victim_segments.values() for segment in segments]
+            )
+            
+            bytes_after = self.disk_usage()
+            result = {
+                'evicted': len(victims),
+                'collections': len(existing) - len(victims),
+                'bytes_freed': max(0, bytes_before - bytes_after),
+                'bytes_on_disk': bytes_after,
+                'duration_s': round(time.perf_counter() - start, 3),
+            }
+            record.update(result)
+        
+        self.evicted += len(victims)
+        self.last_gc = {'at': time.time(), **result}
+        if victims:
+            logger.info(f"Collection GC: evicted {len(victims)}, "
+                        f"{result['collections']} left, freed {result['bytes_freed']} bytes")
+        return result
+    
+    def _segment_ids(self, names: List[str]) -> Dict[str, List[str]]:
+        """
+        Look up the segment IDs of Chroma collections (read-only).
+        
+        Args:
+            names: Collection names (names that aren't collections are skipped)
+            
+        Returns:
+            Collection name -> segment IDs
+        """
+        db_path = os.path.join(self.persist_dir, CHROMA_DB_FILE)
+        if not names or not os.path.exists(db_path):
+            return {}
+        
+        try:
+            conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, timeout=30)
+            try:
+                placeholders = ",".join("?" * len(names))
+                rows = conn.execute(
+                    "SELECT c.name, s.id FROM segments s JOIN collections c ON s.collection = c.id"
+                    f" WHERE c.name IN ({placeholders})",
+                    tuple(names)
+                ).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read Chroma segments: {e}")
+            return {}
+        
+        segments: Dict[str, List[str]] = {}
+        for name, segment_id in rows:
+            segments.setdefault(name, []).append(segment_id)
+        return segments
+    
+    def _remove_index_dirs(self, segment_ids: List[str]) -> None:
+        """
+        Remove HNSW index directories Chroma left behind for deleted segments.
+        
+        Each vector segment keeps its index in a directory named by its ID.
+        Only IDs of collections deleted in this pass are given, so indexes
+        of collections created meanwhile are never touched.
+        """
+        for segment_id in segment_ids:
+            path = os.path.join(self.persist_dir, segment_id)
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+                logger.info(f"Removed index directory of deleted segment {segment_id}")
+    
+    def start_background_gc(self, interval: Optional[float] = None) -> None:
+        """
+        Run collect_garbage() periodically on a daemon thread.
+        
+        Args:
+            interval: Seconds between passes (defaults to config; 0 disables)
+        """
+        interval = settings.collection_gc_interval if interval is None else interval
+        if interval <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.collect_garbage()
+                except Exception as e:
+                    logger.error(f"Collection GC failed: {e}")
+        
+        self._stop.clear()
+        self._thread = threading.Thread(target=loop, name="collection-gc", daemon=True)
+        self._thread.start()
+        logger.info(f"Background collection GC every {interval}s")
+    
+    def stop_background_gc(self) -> None:
+        """Stop the background GC thread."""
+        self._stop.set()
+    
+    def disk_usage(self) -> int:
+        """Total bytes under the persistence directory (walks it)."""
+        total = 0
+        for root, _, files in os.walk(self.persist_dir):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    pass
+        self._disk_usage = (time.time(), total)
+        return total
+    
+    def stats(self) -> Dict:
+        """
+        Get lifecycle metrics.
+        
+        bytes_on_disk comes from the last GC pass or scan, rescanned at
+        most every DISK_USAGE_REFRESH_S seconds, so frequent calls (e.g. a
+        UI sidebar) don't walk the directory each time.
+        
+        Returns:
+            Dict with collections, tracked, bytes_on_disk, oldest_access_age_s,
+            evicted (since start) and last_gc
+        """
+        tracked = self.tracked()
+        oldest = min(tracked.values()) if tracked else None
+        cached = self._disk_usage
+        if cached is None or time.time() - cached[0] > DISK_USAGE_REFRESH_S:
+            bytes_on_disk = self.disk_usage()
+        else:
+            bytes_on_disk = cached[1]
+        return {
+            'collections': len(self._list_names()),
+            'tracked': len(tracked),
+            'bytes_on_disk': bytes_on_disk,
+            'oldest_access_age_s': round(time.time() - oldest) if oldest else 0,
+            'evicted': self.evicted,
+            'last_gc': self.last_gc,
+        }
+    
+    def _select_victims(self, accessed: Dict[str, float], now: float) -> List[str]:
+        """
+        Choose collections to delete.
+        
+        Args:
+            accessed: Collection name -> last access time
+            now: Current time
+            
+        Returns:
+            Expired collections, then the least recently used over capacity
+        """
+        by_age = sorted(accessed, key=accessed.get)
+        victims = [name for name in by_age if self.ttl and now - accessed[name] > self.ttl]
+        
+        remaining = [name for name in by_age if name not in victims]
+        if self.max_collections and len(remaining) > self.max_collections:
+            victims += remaining[:len(remaining) - self.max_collections]
+        return victims
+    
+    def tracked(self) -> Dict[str, float]:
+        """Tracked collection name -> last access time."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT name, accessed_at FROM collections"))
+
@@ -88,6 +88,55 @@ class Retriever:
             logger.error(f"Failed to retrieve chunks: {e}")
             raise
     
+    def retrieve_many(
+        self,
+        queries: List[str],
+        session_id: str,
+        top_k: Optional[int] = None
+    ) -> List[List[Dict]]:
+        """
+        Retrieve relevant chunks for several queries in one round-trip.
+        
+        Args:
+            queries: Search queries (e.g. one per subtopic)
+            session_id: Session identifier
+            top_k: Number of chunks per query (defaults to config)
+            
+        Returns:
+            One list per query of hits, best first: dicts with 'text',
+            'distance', 'url', 'title', 'chunk_index' and 'metadata'
+        """
+        try:
+            top_k = top_k or settings.retrieval_top_k
+            
+            logger.info(f"Retrieving top {top_k} chunks for {len(queries)} queries")
+            
+            results = self.vector_store.query_many(
+                collection_name=session_id,
+                queries=queries,
+                top_k=top_k
+            )
+            
+            logger.info(f"Retrieved {sum(len(hits) for hits in results)} relevant chunks")
+            
+            return results
+        
+        except Exception as e:
+            logger.error(f"Failed to retrieve chunks: {e}")
+            raise
+    
+    def has_session(self, session_id: str) -> bool:
+        """
+        Check whether a session's documents are still stored.
+        
+        Args:
+            session_id: Session identifier
+            
+        Returns:
+            False if the session was never stored or has been evicted
+        """
+        return self.vector_store.has_collection(session_id)
+    
     def delete_session(self, session_id: str) -> None:
         """
         Delete a session's data.
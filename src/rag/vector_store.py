@@ -1,17 +1,33 @@
 """Vector store using ChromaDB for document embeddings."""
 
+import hashlib
+import threading
 import chromadb
 from chromadb.config import Settings as ChromaSettings
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from src.rag.embeddings import get_embedding_function
+from src.rag.lifecycle import CollectionManager
 from src.utils.config import settings
 from src.utils.logging import setup_logger
+from src.utils.tracing import span
 
 logger = setup_logger(__name__)
 
+# Metadata keys older shared-mode versions used to flag session references
+SESSION_KEY_PREFIX = "session:"
+
 
 class VectorStore:
-    """Manages ChromaDB vector store for document retrieval."""
+    """
+    Manages ChromaDB vector store for document retrieval.
+    
+    In 'session' mode (default) every session gets its own collection.
+    Chunk IDs are content hashes. In 'shared' mode all sessions write to
+    one corpus collection per embedding model: a chunk already embedded for
+    another session is only referenced by this one (in the lifecycle
+    database, with this session's own metadata), and queries filter on the
+    session's chunk IDs.
+    """
     
     def __init__(self):
         """Initialize ChromaDB client with persistent storage."""
@@ -24,7 +40,23 @@ class VectorStore:
         # Get embedding function
         self.embedding_function = get_embedding_function()
         
-        logger.info(f"VectorStore initialized: {settings.chroma_persist_dir}")
+        self.shared = settings.vector_store_mode == 'shared'
+        self._corpus = None
+        # Serializes shared-corpus writes with their membership records
+        self._corpus_lock = threading.Lock()
+        
+        # Last-access tracking and garbage collection of sessions
+        if self.shared:
+            self.lifecycle = CollectionManager(
+                self.client,
+                list_names=lambda: list(self.lifecycle.tracked()),
+                delete=self._release_session
+            )
+        else:
+            self.lifecycle = CollectionManager(self.client)
+        
+        logger.info(f"VectorStore initialized: {settings.chroma_persist_dir} "
+                    f"({settings.vector_store_mode} mode)")
     
     def create_collection(self, collection_name: str) -> None:
         """
@@ -34,10 +66,14 @@ class VectorStore:
             collection_name: Unique name for this collection (e.g., session_id)
         """
         try:
-            self.client.get_or_create_collection(
-                name=collection_name,
-                embedding_function=self.embedding_function
-            )
+            if self.shared:
+                self._corpus_collection()
+            else:
+                self.client.get_or_create_collection(
+                    name=collection_name,
+                    embedding_function=self.embedding_function
+                )
+            self.lifecycle.touch(collection_name, force=True)
             logger.info(f"Collection created/loaded: {collection_name}")
         except Exception as e:
             logger.error(f"Failed to create collection {collection_name}: {e}")
@@ -47,32 +83,40 @@ class VectorStore:
         """
         Add document chunks to a collection.
         
+        Chunk IDs are derived from content, so adding the same chunks again
+        (a re-run or another research iteration) is a no-op; only chunks not
+        already present are embedded.
+        
         Args:
             collection_name: Collection to add to
             chunks: List of dicts with 'text' and 'metadata' keys
         """
         try:
-            collection = self.client.get_collection(
-                name=collection_name,
-                embedding_function=self.embedding_function
-            )
+            if self.shared:
+                collection = self._corpus_collection()
+            else:
+                collection = self.client.get_collection(
+                    name=collection_name,
+                    embedding_function=self.embedding_function
+                )
             
-            # Extract texts and metadata
-            texts = [chunk['text'] for chunk in chunks]
-            metadatas = [chunk['metadata'] for chunk in chunks]
+            self.lifecycle.touch(collection_name)
             
-            # Generate unique IDs
-            ids = [f"{collection_name}_{i}" for i in range(len(chunks))]
-            
-            # Add to collection (ChromaDB auto-generates embeddings)
-            collection.add(
-                documents=texts,
-                metadatas=metadatas,
-                ids=ids
-            )
-            
-            logger.info(f"Added {len(chunks)} chunks to collection {collection_name}")
+            with span('chroma.add', chunks=len(chunks)) as record:
+                if self.shared:
+                    with self._corpus_lock:
+                        added, present, by_id = self._add_new_chunks(collection, chunks)
+                        self.lifecycle.add_members(collection.name, collection_name, {
+                            chunk_id: {**chunk['metadata'], 'chunk_id': chunk_id}
+                            for chunk_id, chunk in by_id.items()
+                        })
+                else:
+                    added, present, _ = self._add_new_chunks(collection, chunks)
+                record.update(embedded=added, reused=present)
             
+            logger.info(f"Added {added} chunks to collection {collection_name} "
+                        f"({present} already present)")
+        
         except Exception as e:
             logger.error(f"Failed to add documents to {collection_name}: {e}")
             raise
@@ -94,25 +138,84 @@ class VectorStore:
         Returns:
             List of relevant text chunks
         """
-        try:
-            collection = self.client.get_collection(
-                name=collection_name,
-                embedding_function=self.embedding_function
-            )
+        hits = self.query_many(collection_name, [query], top_k)[0]
+        logger.info(f"Retrieved {len(hits)} chunks for query: '{query[:50]}...'")
+        return [hit['text'] for hit in hits]
+    
+    def query_many(
+        self,
+        collection_name: str,
+        queries: List[str],
+        top_k: int = 10
+    ) -> List[List[Dict]]:
+        """
+        Query collection for several queries at once.
+        
+        All queries are embedded in one request and searched in one
+        index call.
+        
+        Args:
+            collection_name: Collection to query
+            queries: Search queries
+            top_k: Number of results per query
             
-            # Query (ChromaDB auto-generates embedding for query)
-            results = collection.query(
-                query_texts=[query],
-                n_results=top_k
-            )
+        Returns:
+            One list per query of hits, best first: dicts with 'text',
+            'distance' (lower is closer), 'url', 'title', 'chunk_index'
+            and the full 'metadata'
+        """
+        if not queries:
+            return []
+        
+        try:
+            if self.shared:
+                collection = self._corpus_collection()
+                members = self.lifecycle.members(collection.name, collection_name)
+                if not members:
+                    # Unknown or released session: nothing to search, nothing to touch
+                    return [[] for _ in queries]
+                where = {'chunk_id': {'$in': members}}
+            else:
+                collection = self.client.get_collection(
+                    name=collection_name,
+                    embedding_function=self.embedding_function
+                )
+                where = None
             
-            # Extract documents (first query result)
-            documents = results['documents'][0] if results['documents'] else []
+            self.lifecycle.touch(collection_name)
             
-            logger.info(f"Retrieved {len(documents)} chunks for query: '{query[:50]}...'")
+            # Query (ChromaDB auto-generates embeddings for the queries)
+            with span('chroma.query', top_k=top_k, queries=len(queries)):
+                results = collection.query(
+                    query_texts=queries,
+                    n_results=top_k,
+                    where=where,
+                    include=['documents', 'metadatas', 'distances']
+                )
             
-            return documents
+            metadatas = results['metadatas']
+            if self.shared:
+                # The corpus keeps the metadata of whichever session stored a
+                # chunk first; hits carry this session's url/title instead
+                own = self.lifecycle.member_metadata(
+                    collection.name, collection_name,
+                    list({chunk_id for ids in results['ids'] for chunk_id in ids})
+                )
+                metadatas = [
+                    [own.get(chunk_id, metadata) for chunk_id, metadata in zip(ids, stored)]
+                    for ids, stored in zip(results['ids'], metadatas)
+                ]
             
+            return [
+                [
+                    _hit(text, metadata or {}, distance)
+                    for text, metadata, distance in zip(texts, query_metadatas, distances)
+                ]
+                for texts, query_metadatas, distances in zip(
+                    results['documents'], metadatas, results['distances']
+                )
+            ]
+        
         except Exception as e:
             logger.error(f"Failed to query collection {collection_name}: {e}")
             raise
@@ -125,20 +228,120 @@ class VectorStore:
             collection_name: Collection to delete
         """
         try:
-            self.client.delete_collection(name=collection_name)
+            if self.shared:
+                self._release_session(collection_name)
+            else:
+                self.client.delete_collection(name=collection_name)
+            self.lifecycle.forget(collection_name)
             logger.info(f"Deleted collection: {collection_name}")
         except Exception as e:
             logger.error(f"Failed to delete collection {collection_name}: {e}")
             raise
     
+    def has_collection(self, collection_name: str) -> bool:
+        """
+        Check whether a collection (a session, in shared mode) still exists.
+        
+        Args:
+            collection_name: Collection name
+            
+        Returns:
+            False once it was deleted, e.g. by lifecycle GC
+        """
+        if self.shared:
+            return bool(self.lifecycle.members(self._corpus_collection().name, collection_name))
+        return collection_name in {c.name for c in self.client.list_collections()}
+    
     def list_collections(self) -> List[str]:
         """
-        List all collections.
+        List all collections (sessions, in shared mode).
         
         Returns:
             List of collection names
         """
-        collections = self.client.list_collections()
-        names = [c.name for c in collections]
+        if self.shared:
+            names = list(self.lifecycle.tracked())
+        else:
+            names = [c.name for c in self.client.list_collections()]
         logger.info(f"Found {len(names)} collections")
-        return names
\ No newline at end of file
+        return names
+    
+    def _corpus_collection(self):
+        """
+        Get (creating on first use) the shared corpus collection.
+        
+        The name includes a hash of the embedding model, so switching
+        models starts a new corpus instead of mixing vector spaces.
+        """
+        if self._corpus is None:
+            model = settings.embedding_model
+            digest = hashlib.sha256(model.encode('utf-8')).hexdigest()[:12]
+            self._corpus = self.client.get_or_create_collection(
+                name=f"{settings.corpus_collection}_{digest}",
+                embedding_function=self.embedding_function,
+                metadata={'embedding_model': model}
+            )
+        return self._corpus
+    
+    def _add_new_chunks(self, collection, chunks: List[Dict]) -> Tuple[int, int, Dict[str, Dict]]:
+        """
+        Embed and store the chunks a collection doesn't have yet.
+        
+        Args:
+            collection: Chroma collection
+            chunks: List of dicts with 'text' and 'metadata' keys
+            
+        Returns:
+            Tuple of (chunks added, chunks already present, chunk ID -> chunk)
+        """
+        by_id: Dict[str, Dict] = {}
+        for chunk in chunks:
+            by_id.setdefault(_chunk_id(chunk['text']), chunk)
+        
+        # Checked before embedding so existing chunks cost nothing
+        existing = set(collection.get(ids=list(by_id), include=[])['ids']) if by_id else set()
+        
+        new_ids = [chunk_id for chunk_id in by_id if chunk_id not in existing]
+        if new_ids:
+            collection.add(
+                ids=new_ids,
+                documents=[by_id[i]['text'] for i in new_ids],
+                metadatas=[{**by_id[i]['metadata'], 'chunk_id': i} for i in new_ids]
+            )
+        return len(new_ids), len(existing), by_id
+    
+    def _release_session(self, session: str) -> None:
+        """
+        Drop a session's references to the shared corpus.
+        
+        Chunks no other session references are deleted.
+        
+        Args:
+            session: Session name
+        """
+        collection = self._corpus_collection()
+        with self._corpus_lock:
+            orphaned = self.lifecycle.release_members(collection.name, session)
+            if orphaned:
+                collection.delete(ids=orphaned)
+        logger.info(f"Released session {session}: {len(orphaned)} chunks deleted")
+
+
+def _hit(text: str, metadata: Dict, distance: float) -> Dict:
+    """Structured query result for one chunk."""
+    return {
+        'text': text,
+        'distance': distance,
+        'url': metadata.get('url'),
+        'title': metadata.get('title'),
+        'chunk_index': metadata.get('chunk_index'),
+        'metadata': {
+            key: value for key, value in metadata.items()
+            if not key.startswith(SESSION_KEY_PREFIX)
+        },
+    }
+
+
+def _chunk_id(text: str) -> str:
+    """Content-derived chunk ID, identical for identical text."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:32]
\ No newline at end of file
@@ -0,0 +1,125 @@
+"""On-disk cache of fetched pages and their extracted text."""
+
+import hashlib
+import os
+import time
+from typing import Dict, Optional
+from src.tools.urls import normalize_url
+from src.utils.cache import DiskCache, make_key
+from src.utils.config import settings
+from src.utils.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class PageCache:
+    """
+    Persistent page cache keyed by normalized URL.
+    
+    Each entry keeps the raw HTML, its sha256, the ETag/Last-Modified
+    validators and the extracted text. Fresh entries skip the network;
+    stale ones are revalidated with a conditional request, and an
+    unchanged body (304 or same content hash) skips HTML extraction.
+    """
+    
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: Optional[int] = None,
+        max_bytes: Optional[int] = None
+    ):
+        """
+        Initialize page cache.
+        
+        Args:
+            path: SQLite file (defaults to <cache_dir>/pages.sqlite)
+            ttl: Seconds a page is served without revalidation (defaults to config)
+            max_bytes: Size bound before LRU eviction (defaults to config)
+        """
+        self.ttl = ttl or settings.page_cache_ttl
+        self.store = DiskCache(
+            path or os.path.join(settings.cache_dir, 'pages.sqlite'),
+            max_bytes=max_bytes or settings.page_cache_max_mb * 1024 * 1024
+        )
+        logger.info(f"Page cache initialized (ttl={self.ttl}s)")
+    
+    def lookup(self, url: str) -> Optional[Dict]:
+        """
+        Look up a cached page.
+        
+        Args:
+            url: Page URL (any variant that normalizes to the same key)
+        
+        Returns:
+            Entry dict with an added 'fresh' flag, or None if not cached
+        """
+        cached = self.store.get_entry(self._key(url))
+        if cached is None:
+            return None
+        
+        entry, stored_at = cached
+        return {**entry, 'fresh': time.time() - stored_at <= self.ttl}
+    
+    @staticmethod
+    def validators(entry: Dict) -> Dict[str, str]:
+        """
+        Build conditional request headers for revalidating an entry.
+        
+        Args:
+            entry: Cached entry from lookup()
+        
+        Returns:
+            If-None-Match / If-Modified-Since headers (empty if none stored)
+        """
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+    
+    def refresh(self, url: str) -> None:
+        """
+        Restart an entry's TTL after a successful revalidation.
+        
+        Args:
+            url: Page URL
+        """
+        self.store.touch(self._key(url))
+    
+    def save(self, url: str, html: str, text: str, headers: Dict[str, str]) -> None:
+        """
+        Store a fetched page.
+        
+        Args:
+            url: Page URL
+            html: Raw response body
+            text: Extracted article text
+            headers: Response headers (for ETag/Last-Modified)
+        """
+        self.store.set(self._key(url), {
+            'url': url,
+            'html': html,
+            'content_hash': self.content_hash(html),
+            'text': text,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified')
+        })
+    
+    @staticmethod
+    def content_hash(html: str) -> str:
+        """
+        Hash a response body.
+        
+        Args:
+            html: Raw response body
+        
+        Returns:
+            Hex sha256 digest
+        """
+        return hashlib.sha256(html.encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def _key(url: str) -> str:
+        """Cache key for a URL."""
+        return make_key('page', normalize_url(url))
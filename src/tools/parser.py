@@ -3,6 +3,7 @@ from typing import List, Dict
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from src.utils.config import settings
 from src.utils.logging import setup_logger
+from src.utils.tracing import span
 
 logger = setup_logger(__name__)
 
@@ -60,18 +61,26 @@ class DocumentParser:
         """
         all_chunks = []
         
-        for doc in documents:
-            text = doc.get('content', '')
-            if not text:
-                logger.warning(f"Skipping document with no content: {doc.get('url', 'unknown')}")
-                continue
-            
-            # Extract metadata (everything except 'content')
-            metadata = {k: v for k, v in doc.items() if k != 'content'}
+        with span('chunk', documents=len(documents)) as record:
+            for doc in documents:
+                text = doc.get('content', '')
+                if not text:
+                    logger.warning(f"Skipping document with no content: {doc.get('url', 'unknown')}")
+                    continue
+                
+                # Extract metadata (everything except 'content'); Chroma only
+                # stores scalar metadata, so list values are joined
+                metadata = {
+                    k: ' | '.join(v) if isinstance(v, list) else v
+                    for k, v in doc.items() if k != 'content'
+                }
+                
+                # Chunk this document
+                chunks = self.chunk_document(text, metadata)
+                all_chunks.extend(chunks)
             
-            # Chunk this document
-            chunks = self.chunk_document(text, metadata)
-            all_chunks.extend(chunks)
+            record['chunks'] = len(all_chunks)
+            record['chars'] = sum(len(chunk['text']) for chunk in all_chunks)
         
         logger.info(f"Chunked {len(documents)} documents into {len(all_chunks)} total chunks")
         return all_chunks
\ No newline at end of file
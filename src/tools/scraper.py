@@ -1,11 +1,16 @@
 """Web scraper for extracting article content."""
 
+import threading
 import requests
-from bs4 import BeautifulSoup
-from readability import Document
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry, make_headers
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from urllib.parse import urlparse
 from typing import Optional, List, Dict
+from src.tools.page_cache import PageCache
 from src.utils.config import settings
 from src.utils.logging import setup_logger
+from src.utils.tracing import span, submit
 
 logger = setup_logger(__name__)
 
@@ -13,23 +18,47 @@ logger = setup_logger(__name__)
 class WebScraper:
     """Scrapes web pages and extracts main content."""
     
-    def __init__(self, timeout: int = 10):
+    def __init__(
+        self,
+        timeout: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        per_host_limit: Optional[int] = None,
+        cache: Optional[PageCache] = None
+    ):
         """
         Initialize scraper.
         
         Args:
-            timeout: Request timeout in seconds
+            timeout: Request timeout in seconds (defaults to config)
+            max_workers: Max pages scraped concurrently (defaults to config)
+            per_host_limit: Max concurrent requests per host (defaults to config)
+            cache: Page cache (defaults to an on-disk cache when caching is enabled)
         """
-        self.timeout = timeout
+        self.timeout = timeout or settings.scrape_timeout
+        self.max_workers = max_workers or settings.scrape_max_workers
+        self.per_host_limit = per_host_limit or settings.scrape_per_host_limit
         self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+            # gzip/deflate, plus br/zstd when their decoders are installed
+            **make_headers(accept_encoding=True)
         }
-        logger.info("Web scraper initialized")
+        self.session = self._create_session()
+        self.cache = cache or (PageCache() if settings.enable_caching else None)
+        
+        # One semaphore per host, shared by every thread using this scraper
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_lock = threading.Lock()
+        
+        logger.info(f"Web scraper initialized (max_workers={self.max_workers}, "
+                    f"per_host_limit={self.per_host_limit})")
     
     def scrape_url(self, url: str) -> Optional[str]:
         """
         Scrape a single URL and extract main content.
         
+        Safe to call from several threads at once; requests to the same host
+        are capped at `per_host_limit`.
+        
         Args:
             url: URL to scrape
             
@@ -37,47 +66,166 @@ class WebScraper:
             Cleaned text content, or None if failed
         """
         try:
-            logger.info(f"Scraping: {url}")
-            
-            # Download HTML
-            response = requests.get(url, headers=self.headers, timeout=self.timeout)
-            response.raise_for_status()
-            
-            # Extract main content using readability
-            doc = Document(response.text)
-            html_content = doc.summary()
-            
-            # Convert to clean text
-            soup = BeautifulSoup(html_content, 'html.parser')
-            text = soup.get_text(separator='\n', strip=True)
-            
-            # Remove extra whitespace
-            text = '\n'.join(line.strip() for line in text.splitlines() if line.strip())
-            
-            logger.info(f"Scraped {len(text)} characters from {url}")
-            return text
-            
+            with span('scrape', url=url) as record:
+                # Serve fresh pages straight from cache
+                cached = self.cache.lookup(url) if self.cache else None
+                record['cache_hit'] = bool(cached and cached['fresh'])
+                if cached and cached['fresh']:
+                    logger.info(f"Cache hit: {url}")
+                    return cached['text']
+                
+                logger.info(f"Scraping: {url}")
+                
+                # Download HTML (bounded per host), revalidating stale entries
+                headers = PageCache.validators(cached) if cached else {}
+                with span('scrape.fetch', url=url) as fetch:
+                    with self._host_slot(url):
+                        response = self.session.get(url, headers=headers, timeout=self.timeout)
+                    fetch['bytes'] = len(response.content)
+                
+                if cached and response.status_code == 304:
+                    logger.info(f"Not modified, reusing cached page: {url}")
+                    record['revalidated'] = True
+                    self.cache.refresh(url)
+                    return cached['text']
+                
+                response.raise_for_status()
+                
+                # Skip extraction if the body is byte-for-byte unchanged
+                if cached and cached['content_hash'] == PageCache.content_hash(response.text):
+                    record['revalidated'] = True
+                    text = cached['text']
+                else:
+                    text = self._extract_text(response.text)
+                
+                if self.cache:
+                    self.cache.save(url, response.text, text, response.headers)
+                
+                record['chars'] = len(text)
+                logger.info(f"Scraped {len(text)} characters from {url}")
+                return text
+        
         except Exception as e:
             logger.error(f"Failed to scrape {url}: {str(e)}")
             return None
     
-    def scrape_multiple(self, urls: List[str]) -> Dict[str, Optional[str]]:
+    def scrape_multiple(
+        self,
+        urls: List[str],
+        deadline: Optional[float] = None
+    ) -> Dict[str, Optional[str]]:
         """
-        Scrape multiple URLs.
+        Scrape multiple URLs concurrently.
+        
+        Pages are fetched on a bounded worker pool. URLs still pending when
+        the batch deadline passes are reported as failed.
         
         Args:
             urls: List of URLs to scrape
+            deadline: Seconds allowed for the whole batch (defaults to config)
             
         Returns:
             Dict mapping url -> content (None if failed)
         """
-        results = {}
+        results: Dict[str, Optional[str]] = {url: None for url in urls}
+        if not results:
+            return results
         
-        for url in urls:
-            content = self.scrape_url(url)
-            results[url] = content
+        deadline = deadline or settings.scrape_batch_timeout
+        pool = ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(results)),
+            thread_name_prefix="scraper"
+        )
+        futures = {submit(pool, self.scrape_url, url): url for url in results}
+        
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                results[futures[future]] = future.result()
+        except FuturesTimeout:
+            pending = sum(1 for f in futures if not f.done())
+            logger.warning(f"Scrape deadline of {deadline}s reached, "
+                           f"dropping {pending} pending URLs")
+        finally:
+            # Don't block on stragglers; they finish within their own timeout
+            pool.shutdown(wait=False, cancel_futures=True)
         
         success_count = sum(1 for v in results.values() if v is not None)
-        logger.info(f"Scraped {success_count}/{len(urls)} URLs successfully")
+        logger.info(f"Scraped {success_count}/{len(results)} URLs successfully")
         
-        return results
\ No newline at end of file
+        return results
+    
+    def _extract_text(self, html: str) -> str:
+        """
+        Extract clean article text from HTML.
+        
+        Args:
+            html: Raw page HTML
+        
+        Returns:
+            Main content as plain text
+        """
+        # Imported on first use: readability/lxml and bs4 are slow to load
+        from bs4 import BeautifulSoup
+        from readability import Document
+        
+        # Extract main content using readability
+        with span('scrape.readability', chars=len(html)):
+            doc = Document(html)
+            html_content = doc.summary()
+        
+        # Convert to clean text
+        with span('scrape.soup', chars=len(html_content)):
+            soup = BeautifulSoup(html_content, 'html.parser')
+            text = soup.get_text(separator='\n', strip=True)
+        
+        # Remove extra whitespace
+        return '\n'.join(line.strip() for line in text.splitlines() if line.strip())
+    
+    def close(self) -> None:
+        """Close pooled connections."""
+        self.session.close()
+    
+    def _create_session(self) -> requests.Session:
+        """
+        Create a pooled HTTP session with keep-alive and retry policy.
+        
+        Returns:
+            Session reusing connections per host across scrapes
+        """
+        retry = Retry(
+            total=settings.scrape_max_retries,
+            backoff_factor=settings.scrape_backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({'GET', 'HEAD'}),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=settings.scrape_pool_connections,
+            pool_maxsize=max(settings.scrape_pool_maxsize, self.per_host_limit),
+            max_retries=retry
+        )
+        
+        session = requests.Session()
+        session.headers.update(self.headers)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+    
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        """
+        Get the concurrency slot for a URL's host.
+        
+        Args:
+            url: URL about to be fetched
+        
+        Returns:
+            Semaphore limiting concurrent requests to that host
+        """
+        host = urlparse(url).netloc.lower()
+        with self._host_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.per_host_limit)
+                self._host_slots[host] = slot
+        return slot
\ No newline at end of file
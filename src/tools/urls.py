@@ -0,0 +1,55 @@
+"""URL normalization for deduplicating sources."""
+
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query parameters that only track the click, never change the page
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    '_hsenc', '_hsmi', 'ref', 'ref_src', 'spm', 'cmpid', 'ocid'
+}
+TRACKING_PREFIXES = ('utm_',)
+
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a URL so that trivially different links compare equal.
+    
+    Treats http/https and `www.` as the same site, lowercases the host,
+    drops default ports, fragments, trailing slashes and tracking
+    parameters, and sorts the remaining query string. The result is a
+    dedup/cache key only; always fetch the original URL.
+    
+    Args:
+        url: URL as returned by search
+    
+    Returns:
+        Canonical form of the URL
+    """
+    parts = urlsplit(url.strip())
+    
+    scheme = parts.scheme.lower()
+    if scheme in DEFAULT_PORTS:
+        scheme = 'https'
+    
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    try:
+        port = parts.port
+    except ValueError:
+        # Malformed port: keep the URL as-is rather than guess
+        return url.strip()
+    if port and str(port) not in DEFAULT_PORTS.values():
+        host = f"{host}:{port}"
+    
+    path = parts.path.rstrip('/') or '/'
+    
+    params = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ]
+    query = urlencode(sorted(params))
+    
+    return urlunsplit((scheme, host, path, query, ''))
@@ -1,26 +1,73 @@
 """Tavily web search tool."""
+import os
+import re
+import unicodedata
 from typing import List, Dict, Optional
-from tavily import TavilyClient
+from src.utils.cache import MemoryCache, DiskCache, make_key
 from src.utils.config import settings
 from src.utils.logging import setup_logger
+from src.utils.tracing import span
 
 logger = setup_logger(__name__)
 
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a search query for cache lookups.
+    
+    Case, Unicode form, repeated whitespace and surrounding punctuation
+    don't change what Tavily returns, so they don't split the cache.
+    
+    Args:
+        query: Raw search query
+    
+    Returns:
+        Canonical form of the query
+    """
+    query = unicodedata.normalize('NFKC', query).lower()
+    query = re.sub(r'\s+', ' ', query)
+    return query.strip(' \t\n"\'.,;:!?')
+
+
 class TavilySearch:
     """Wrapper for Tavily search API."""
     
     def __init__(self):
-        """Initialize Tavily client."""
+        """Initialize Tavily client and result caches."""
+        from tavily import TavilyClient
+        
         self.client = TavilyClient(api_key=settings.tavily_api_key)
+        
+        # In-process tier, plus an optional on-disk tier shared across restarts
+        self.cache = None
+        self.disk_cache = None
+        if settings.enable_caching:
+            self.cache = MemoryCache(
+                max_entries=settings.search_cache_max_entries,
+                ttl=settings.search_cache_ttl
+            )
+            if settings.search_cache_disk:
+                self.disk_cache = DiskCache(
+                    os.path.join(settings.cache_dir, 'search.sqlite'),
+                    ttl=settings.search_cache_ttl,
+                    max_bytes=settings.search_cache_max_mb * 1024 * 1024
+                )
+        
         logger.info("Initialized Tavily search client")
     
-    def search(self, query: str, max_results: Optional[int] = None) -> List[Dict]:
+    def search(
+        self,
+        query: str,
+        max_results: Optional[int] = None,
+        search_depth: str = "basic"
+    ) -> List[Dict]:
         """
         Search the web using Tavily.
         
         Args:
             query: Search query string
             max_results: Maximum number of results (defaults to config)
+            search_depth: Tavily search depth ("basic" or "advanced")
             
         Returns:
             List of search results with keys: url, title, content, score
@@ -29,21 +76,81 @@ class TavilySearch:
             # Use config default if max_results not provided
             max_results = max_results or settings.max_search_results
             
-            logger.info(f"Searching: '{query}' (max_results={max_results})")
-            
-            # Call Tavily API
-            response = self.client.search(
-                query=query,
-                max_results=max_results,
-                search_depth="basic"
-            )
+            with span('search', query=query) as record:
+                key = make_key('search', normalize_query(query), max_results, search_depth)
+                cached = self._cache_get(key)
+                record['cache_hit'] = cached is not None
+                if cached is not None:
+                    logger.info(f"Search cache hit: '{query}'")
+                    record['results'] = len(cached)
+                    return [dict(r) for r in cached]
+                
+                logger.info(f"Searching: '{query}' (max_results={max_results})")
+                
+                # Call Tavily API
+                response = self.client.search(
+                    query=query,
+                    max_results=max_results,
+                    search_depth=search_depth
+                )
+                
+                # Extract results
+                results = response.get('results', [])
+                record['results'] = len(results)
+                record['chars'] = sum(len(r.get('content') or '') for r in results)
+                logger.info(f"Found {len(results)} results")
             
-            # Extract results
-            results = response.get('results', [])
-            logger.info(f"Found {len(results)} results")
+            # Only cache real answers; an empty list may be a transient failure.
+            # A copy, so callers mutating their results can't change the cache.
+            if results:
+                self._cache_set(key, [dict(r) for r in results])
             
             return results
             
         except Exception as e:
             logger.error(f"Search failed for '{query}': {str(e)}")
-            return []
\ No newline at end of file
+            return []
+    
+    def cache_stats(self) -> Dict[str, int]:
+        """
+        Get search cache counters.
+        
+        Returns:
+            Dict with hits, misses and in-process size (zeros if caching is off)
+        """
+        if not self.cache:
+            return {'hits': 0, 'misses': 0, 'size': 0}
+        
+        memory = self.cache.stats()
+        if not self.disk_cache:
+            return memory
+        
+        # Memory misses fall through to disk, so disk decides the final miss count
+        disk = self.disk_cache.stats()
+        return {
+            'hits': memory['hits'] + disk['hits'],
+            'misses': disk['misses'],
+            'size': memory['size'],
+            'disk_size': disk['size']
+        }
+    
+    def _cache_get(self, key: str) -> Optional[List[Dict]]:
+        """Look up results in memory, then on disk (promoting disk hits)."""
+        if not self.cache:
+            return None
+        
+        results = self.cache.get(key)
+        if results is None and self.disk_cache:
+            results = self.disk_cache.get(key)
+            if results is not None:
+                self.cache.set(key, results)
+        return results
+    
+    def _cache_set(self, key: str, results: List[Dict]) -> None:
+        """Store results in every enabled tier."""
+        if not self.cache:
+            return
+        
+        self.cache.set(key, results)
+        if self.disk_cache:
+            self.disk_cache.set(key, results)
\ No newline at end of file
@@ -0,0 +1,262 @@
+"""Caching primitives shared across layers."""
+
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from src.utils.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def make_key(*parts: Any) -> str:
+    """
+    Build a stable cache key from arbitrary parts.
+    
+    Args:
+        *parts: Values identifying the cached item
+    
+    Returns:
+        Hex sha256 digest of the joined parts
+    """
+    joined = '\x1f'.join(str(part) for part in parts)
+    return hashlib.sha256(joined.encode('utf-8')).hexdigest()
+
+
+class MemoryCache:
+    """Thread-safe in-process LRU cache with optional TTL."""
+    
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None):
+        """
+        Initialize memory cache.
+        
+        Args:
+            max_entries: Entries kept before least-recently-used eviction
+            ttl: Seconds an entry stays valid (None = no expiry)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a value if present and not expired.
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Cached value, or None on miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and time.time() - entry[1] > self.ttl:
+                del self._entries[key]
+                entry = None
+            
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a value, evicting the least recently used entries if full.
+        
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache counters.
+        
+        Returns:
+            Dict with hits, misses and current size
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+
+class DiskCache:
+    """Persistent key-value cache in SQLite with TTL and size-bounded LRU eviction."""
+    
+    def __init__(
+        self,
+        path: str,
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = None
+    ):
+        """
+        Open (or create) a disk cache.
+        
+        Args:
+            path: SQLite file path (parent directories are created)
+            ttl: Seconds an entry stays valid for get() (None = no expiry)
+            max_bytes: Total value size kept before LRU eviction (None = unbounded)
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)"
+            )
+        
+        logger.info(f"Disk cache opened: {path}")
+    
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a value if present and not expired.
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Cached value, or None on miss
+        """
+        entry = self.get_entry(key)
+        if entry is None or (self.ttl is not None and time.time() - entry[1] > self.ttl):
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        return entry[0]
+    
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """
+        Get a value and its store time, ignoring TTL.
+        
+        Lets callers revalidate stale entries instead of dropping them.
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Tuple of (value, created_at), or None if absent
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+        
+        try:
+            return pickle.loads(row[0]), row[1]
+        except Exception as e:
+            logger.warning(f"Dropping unreadable cache entry {key[:12]}: {e}")
+            self.delete(key)
+            return None
+    
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a value, then evict least recently used entries over the size bound.
+        
+        Args:
+            key: Cache key
+            value: Picklable value to store
+        """
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, blob, len(blob), now, now)
+            )
+            self._evict()
+    
+    def touch(self, key: str) -> None:
+        """
+        Mark an entry as freshly stored (e.g. after a 304 revalidation).
+        
+        Args:
+            key: Cache key
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE entries SET created_at = ?, accessed_at = ? WHERE key = ?",
+                (now, now, key)
+            )
+    
+    def delete(self, key: str) -> None:
+        """
+        Remove an entry.
+        
+        Args:
+            key: Cache key
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache counters.
+        
+        Returns:
+            Dict with hits, misses, entry count and stored bytes
+        """
+        with self._lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        return {'hits': self.hits, 'misses': self.misses, 'size': count, 'bytes': total}
+    
+    def _evict(self) -> None:
+        """Delete least recently used entries until under max_bytes (caller holds lock)."""
+        if self.max_bytes is None:
+            return
+        
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        
+        evicted = 0
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM entries ORDER BY accessed_at"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        
+        logger.info(f"Evicted {evicted} entries from {self.path}")
@@ -15,24 +15,76 @@ class Settings(BaseSettings):
     temperature_planner: float = Field(default=0.3, description="Temperature for planner agent")
     temperature_synthesizer: float = Field(default=0.7, description="Temperature for synthesizer agent")
     max_tokens: int = Field(default=2000, description="Max tokens for LLM responses")
+    llm_requests_per_minute: int = Field(default=500, description="Process-wide LLM request budget per minute")
+    llm_tokens_per_minute: int = Field(default=200000, description="Process-wide LLM token budget per minute (prompt + completion)")
+    llm_max_concurrency: int = Field(default=16, description="Max LLM requests in flight across the process")
+    llm_max_retries: int = Field(default=3, description="Retries for transient LLM errors (429, 5xx, timeouts, connection errors)")
+    llm_json_mode: str = Field(default='off', description="Structured output for JSON calls: 'off', 'json_schema' or 'json_object' (needs openai>=1.40)")
+    llm_cache_ttl: int = Field(default=3600, description="Seconds a cached LLM response stays valid")
+    llm_cache_max_entries: int = Field(default=256, description="LLM responses kept in memory")
+    llm_cache_disk: bool = Field(default=False, description="Also cache LLM responses on disk")
+    llm_cache_max_mb: int = Field(default=32, description="On-disk LLM response cache size before LRU eviction")
     
     # Search Settings
     max_search_results: int = Field(default=3, description="Max results per search query")
     max_sources_per_query: int = Field(default=3, description="Max sources to scrape per query")
     search_timeout: int = Field(default=30, description="Search timeout in seconds")
+    executor_max_searches: int = Field(default=8, description="Max search queries run concurrently")
+    search_cache_ttl: int = Field(default=3600, description="Seconds a cached search response stays valid")
+    search_cache_max_entries: int = Field(default=512, description="Search responses kept in memory")
+    search_cache_disk: bool = Field(default=False, description="Also cache search responses on disk")
+    search_cache_max_mb: int = Field(default=64, description="On-disk search cache size before LRU eviction")
+    
+    # Scraper Settings
+    scrape_timeout: int = Field(default=10, description="Per-page request timeout in seconds")
+    scrape_max_workers: int = Field(default=8, description="Max pages scraped concurrently")
+    scrape_per_host_limit: int = Field(default=2, description="Max concurrent requests to a single host")
+    scrape_batch_timeout: int = Field(default=30, description="Deadline in seconds for a whole scrape batch")
+    scrape_pool_connections: int = Field(default=20, description="Number of per-host connection pools kept alive")
+    scrape_pool_maxsize: int = Field(default=4, description="Keep-alive connections per host pool")
+    scrape_max_retries: int = Field(default=2, description="HTTP retries for connection errors and 429/5xx responses")
+    scrape_backoff_factor: float = Field(default=0.5, description="Exponential backoff factor between retries")
     
     # RAG Settings
     chunk_size: int = Field(default=1000, description="Text chunk size for embeddings")
     chunk_overlap: int = Field(default=200, description="Overlap between chunks")
     retrieval_top_k: int = Field(default=10, description="Number of chunks to retrieve")
-    embedding_model: str = Field(default="text-embedding-3-small", description="OpenAI embedding model")
+    vector_store_mode: str = Field(default='session', description="Chunk storage: 'session' (one collection per run) or 'shared' (one deduplicated corpus)")
+    corpus_collection: str = Field(default='shared_corpus', description="Collection holding all chunks in shared mode")
+    collection_ttl_hours: float = Field(default=168, description="Delete session collections unused for this long (0 = never)")
+    max_collections: int = Field(default=200, description="Session collections kept before least-recently-used eviction (0 = unbounded)")
+    collection_gc_interval: int = Field(default=3600, description="Seconds between background collection GC passes (0 = off)")
+    collection_touch_interval: int = Field(default=60, description="Min seconds between recorded accesses of one collection")
+    embedding_model: str = Field(default="text-embedding-3-small", description="OpenAI embedding model, or local:<name> for sentence-transformers")
+    embedding_batch_max_items: int = Field(default=128, description="Max texts per embedding request")
+    embedding_batch_max_tokens: int = Field(default=50000, description="Max tokens per embedding request")
+    embedding_max_parallel: int = Field(default=4, description="Max embedding requests in flight")
+    embedding_max_retries: int = Field(default=3, description="Retries for a failed embedding batch")
+    embedding_local_batch_size: int = Field(default=32, description="Texts per local inference batch")
+    embedding_threads: int = Field(default=0, description="CPU threads for local embeddings (0 = torch default)")
+    embedding_warmup: bool = Field(default=True, description="Load the local embedding model at startup")
     
     # Paths
     chroma_persist_dir: str = Field(default='./data/chroma_db', description="Chroma DB persistence directory")
+    cache_dir: str = Field(default='./data/cache', description="Directory for on-disk caches")
+    checkpoint_path: str = Field(default='./data/checkpoints.sqlite', description="SQLite file for research run checkpoints")
+    trace_dir: str = Field(default='./data/traces', description="Directory for per-run span exports (JSON lines)")
     
     # Application Settings
     max_iterations: int = Field(default=3, description="Max iterations for research loop")
+    iterative_research: bool = Field(default=False, description="Run gap analysis and follow-up passes after the first report")
+    min_marginal_yield: float = Field(default=0.2, description="Stop iterating when a pass adds fewer new documents than this fraction of those already collected")
+    graph_mode: str = Field(default='sequential', description="Graph topology: 'sequential' or 'parallel'")
+    executor_shards: int = Field(default=4, description="Parallel executor branches in parallel graph mode")
     enable_caching: bool = Field(default=True, description="Enable result caching")
+    enable_checkpoints: bool = Field(default=True, description="Checkpoint run_research state after every graph step")
+    checkpoint_keep_per_run: int = Field(default=20, description="Newest checkpoints kept per run (0 = all)")
+    checkpoint_max_runs: int = Field(default=50, description="Most recent runs whose checkpoints are kept (0 = all)")
+    enable_tracing: bool = Field(default=True, description="Record per-stage timing spans for research runs")
+    export_traces: bool = Field(default=False, description="Write each run's spans to <trace_dir>/<run_id>.jsonl")
+    trace_max_files: int = Field(default=100, description="Exported trace files kept, newest first (0 = all)")
+    page_cache_ttl: int = Field(default=86400, description="Seconds a cached page is served without revalidation")
+    page_cache_max_mb: int = Field(default=512, description="Page cache size before LRU eviction")
     
     model_config = SettingsConfigDict(
         env_file='.env',
@@ -0,0 +1,210 @@
+"""Per-stage timing spans for research runs."""
+
+import contextvars
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+from src.utils.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+# Span attributes that are counts and can be summed across spans; others
+# (top_k, attempt, remaining collections, ...) describe a single span
+ADDITIVE_ATTRIBUTES = frozenset({
+    'alloc_kb', 'bytes', 'bytes_freed', 'cache_hits', 'chars', 'chunks',
+    'completion_tokens', 'documents', 'embedded', 'evicted', 'items',
+    'output_chars', 'prompt_tokens', 'queries', 'results', 'reused',
+    'texts', 'tokens',
+})
+
+# Trace of the run executing in this context (None when not tracing)
+_current_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar(
+    "current_trace", default=None
+)
+
+
+class Trace:
+    """
+    Spans recorded during one research run.
+    
+    Spans nest (e.g. embedding batches run inside a Chroma add), so
+    per-name totals overlap and should not be summed across names.
+    """
+    
+    def __init__(self, run_id: str):
+        """
+        Initialize an empty trace.
+        
+        Args:
+            run_id: Research run the spans belong to
+        """
+        self.run_id = run_id
+        self.started_at = time.time()
+        self.spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+    
+    def add(self, record: Dict[str, Any]) -> None:
+        """Record a finished span (thread-safe)."""
+        with self._lock:
+            self.spans.append(record)
+    
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Aggregate spans by name.
+        
+        Returns:
+            Dict mapping span name -> count, total_ms, max_ms, plus the sum
+            of each counter in ADDITIVE_ATTRIBUTES (bytes, tokens) and the
+            number of spans with each boolean flag set (cache_hit)
+        """
+        with self._lock:
+            spans = list(self.spans)
+        
+        summary: Dict[str, Dict[str, float]] = {}
+        for record in spans:
+            stats = summary.setdefault(record['name'], {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            stats['count'] += 1
+            stats['total_ms'] += record['duration_ms']
+            stats['max_ms'] = max(stats['max_ms'], record['duration_ms'])
+            
+            for key, value in record.items():
+                if isinstance(value, bool) or (
+                    key in ADDITIVE_ATTRIBUTES and isinstance(value, (int, float))
+                ):
+                    stats[key] = stats.get(key, 0) + value
+        
+        for stats in summary.values():
+            stats['total_ms'] = round(stats['total_ms'], 1)
+            stats['max_ms'] = round(stats['max_ms'], 1)
+        return summary
+    
+    def export_jsonl(self, path: str) -> None:
+        """
+        Append one JSON object per span to a file.
+        
+        Args:
+            path: Output file (parent directories are created); a resumed
+                run appends to the file of its first attempt
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._lock:
+            spans = list(self.spans)
+        
+        with open(path, 'a', encoding='utf-8') as f:
+            for record in spans:
+                f.write(json.dumps({'run_id': self.run_id, **record}, default=str) + '\n')
+        
+        logger.info(f"Exported {len(spans)} spans to {path}")
+
+
+def prune_trace_files(directory: str, keep: int) -> int:
+    """
+    Delete all but the newest exported trace files.
+    
+    Args:
+        directory: Trace export directory
+        keep: Files to keep (0 = all)
+        
+    Returns:
+        Number of files deleted
+    """
+    if not keep or not os.path.isdir(directory):
+        return 0
+    
+    paths = [
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.endswith('.jsonl')
+    ]
+    paths.sort(key=os.path.getmtime, reverse=True)
+    
+    deleted = 0
+    for path in paths[keep:]:
+        try:
+            os.remove(path)
+            deleted += 1
+        except OSError as e:
+            logger.warning(f"Failed to delete trace file {path}: {e}")
+    return deleted
+
+
+@contextmanager
+def start_trace(run_id: str) -> Iterator[Trace]:
+    """
+    Collect spans for everything run in this context until exit.
+    
+    Args:
+        run_id: Research run ID
+        
+    Yields:
+        The active Trace
+    """
+    trace = Trace(run_id)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def current_trace() -> Optional[Trace]:
+    """Get the trace active in this context, if any."""
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Dict[str, Any]]:
+    """
+    Time a block as a span of the current trace.
+    
+    Without an active trace this only yields a scratch dict, so call
+    sites cost next to nothing when tracing is off. While tracemalloc
+    is running the net memory allocated during the span is recorded as
+    alloc_kb (process-wide, so concurrent spans blur into each other).
+    
+    Args:
+        name: Stage name, e.g. "search" or "scrape.fetch"
+        **attributes: Initial attributes (url, model, ...)
+        
+    Yields:
+        Span record; add attributes such as bytes, tokens or cache_hit to it
+    """
+    trace = _current_trace.get()
+    record: Dict[str, Any] = {'name': name, 'start': time.time(), **attributes}
+    if trace is None:
+        yield record
+        return
+    
+    mem_start = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+    start = time.perf_counter()
+    try:
+        yield record
+    except Exception as e:
+        record['error'] = type(e).__name__
+        raise
+    finally:
+        record['duration_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        if mem_start is not None and tracemalloc.is_tracing():
+            record['alloc_kb'] = round((tracemalloc.get_traced_memory()[0] - mem_start) / 1024, 1)
+        trace.add(record)
+
+
+def submit(pool, fn, *args, **kwargs):
+    """
+    Submit work to a thread pool, carrying the current trace along.
+    
+    Worker threads don't inherit context variables, so spans recorded
+    there would otherwise be lost.
+    
+    Args:
+        pool: concurrent.futures executor
+        fn: Callable to run
+        *args, **kwargs: Arguments for fn
+        
+    Returns:
+        Future for the call
+    """
+    return pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
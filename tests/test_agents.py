@@ -1,5 +1,6 @@
 """Tests for agents."""
 import sys
+import time
 from pathlib import Path
 import uuid
 
@@ -45,6 +46,14 @@ def test_planner_agent():
             print(f"   {i}. {query}")
         print(f"   ... and {len(plan['search_queries']) - 3} more")
         
+        # Same topic again: served from the LLM response cache
+        start = time.time()
+        cached_plan = planner.create_plan(test_topic)
+        elapsed = time.time() - start
+        if planner.llm.cache:
+            assert cached_plan == plan, "Cached plan differs from the original"
+            print(f"\n✅ Repeated plan served from cache in {elapsed:.3f}s ({planner.llm.cache_stats()})")
+        
         # Return plan for next test
         return plan
         
@@ -138,12 +147,26 @@ def test_synthesizer_agent(topic, documents):
         print(f"\n📄 Report preview (first 300 chars):")
         print(f"   {result['report'][:300]}...")
         
+        # Citation numbers are stable per source and follow the sources list
+        hits = synthesizer.retriever.retrieve_many([topic], session_id, top_k=5)[0]
+        context = synthesizer._format_context_with_citations(hits, result['sources'])
+        for hit in hits:
+            index = result['sources'].index(hit['url']) + 1
+            assert context.count(f"[{index}] ") == 1, f"Source {hit['url']} cited under several numbers"
+        print(f"✅ Context cites {len({hit['url'] for hit in hits})} sources with stable numbers "
+              f"({len(context)} chars from {len(hits)} chunks)")
+        
+        # A short accidental match between chunks is not treated as overlap
+        from src.agents.synthesizer import _join_overlapping
+        joined = _join_overlapping("the cat sat", "at on the mat")
+        assert joined == "the cat sat at on the mat", f"Chunks joined mid-word: {joined!r}"
+        
         # Test Q&A
         print(f"\n💬 Testing Q&A capability...")
         test_question = "What are the main benefits?"
         print(f"   Question: '{test_question}'")
         
-        answer = synthesizer.answer_question(test_question, session_id)
+        answer = synthesizer.answer_question(test_question, session_id, result['sources'])
         print(f"✅ Answer generated ({len(answer)} chars)")
         print(f"\n   Answer preview:")
         print(f"   {answer[:200]}...")
@@ -0,0 +1,120 @@
+"""Test import time of the main entry points (python -X importtime)"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+print("="*80)
+print("IMPORT TIME TEST")
+print("="*80)
+
+# Entry points and their cold-import budget in milliseconds
+ENTRY_POINTS = {
+    'src.utils.config': 500,
+    'src.agents.pool': 1000,
+    'src.graph.workflow': 1000,
+}
+
+# Libraries that must only load once their code path runs
+DEFERRED_MODULES = [
+    'langgraph',
+    'langchain_openai',
+    'chromadb',
+    'openai',
+    'tavily',
+    'bs4',
+    'readability',
+    'lxml',
+]
+
+
+def measure_import(module: str):
+    """
+    Import a module in a fresh interpreter with -X importtime.
+    
+    Returns:
+        (cumulative microseconds per imported module, total ms for `module`)
+    """
+    env = dict(os.environ)
+    # Settings requires API keys; dummy ones are enough to import
+    env.setdefault('OPENAI_API_KEY', 'sk-import-time-test')
+    env.setdefault('TAVILY_API_KEY', 'tvly-import-time-test')
+    
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=project_root,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    
+    # Lines look like: "import time:  self [us] | cumulative | imported package"
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, total, name = line[len('import time:'):].split('|')
+        cumulative[name.strip()] = int(total)
+    
+    return cumulative, cumulative[module] / 1000
+
+
+def test_entry_points():
+    """Record import time of each entry point and check it against its budget."""
+    print("\n[TEST 1] Measuring entry point import time...")
+    print("="*80)
+    
+    all_ok = True
+    for module, budget_ms in ENTRY_POINTS.items():
+        try:
+            cumulative, total_ms = measure_import(module)
+            
+            # Slowest direct and transitive imports, for the record
+            slowest = sorted(cumulative.items(), key=lambda item: item[1], reverse=True)[1:4]
+            print(f"   {module}: {total_ms:.0f} ms (budget {budget_ms} ms)")
+            for name, micros in slowest:
+                print(f"      - {name}: {micros / 1000:.0f} ms")
+            
+            loaded = [m for m in DEFERRED_MODULES if m in cumulative]
+            if loaded:
+                print(f"❌ {module} eagerly imports: {', '.join(loaded)}")
+                all_ok = False
+            elif total_ms > budget_ms:
+                print(f"❌ {module} is over budget")
+                all_ok = False
+        
+        except Exception as e:
+            print(f"❌ Import of {module} failed: {e}")
+            all_ok = False
+    
+    if all_ok:
+        print("\n✅ All entry points import within budget")
+    return all_ok
+
+
+if __name__ == "__main__":
+    results = []
+    
+    results.append(("EntryPoints", test_entry_points()))
+    
+    # Summary
+    print("\n" + "="*80)
+    passed = sum(1 for _, result in results if result)
+    total = len(results)
+    
+    if passed == total:
+        print(f"✅ ALL {total} IMPORT TIME TESTS PASSED!")
+    else:
+        print(f"⚠️  {passed}/{total} TESTS PASSED")
+    
+    print("="*80)
+    
+    for name, result in results:
+        status = "✅" if result else "❌"
+        print(f"  {status} {name}")
@@ -144,6 +144,168 @@ except Exception as e:
     print(f"❌ Planner-style call failed: {e}\n")
     sys.exit(1)
 
+# ============================================================================
+# TEST 8: Streaming Invocation
+# ============================================================================
+print("Test 8: Testing streaming invocation...")
+try:
+    chunks = list(llm.stream(
+        system_prompt="You are a helpful assistant.",
+        user_message="Count from one to five in words."
+    ))
+    assert len(chunks) > 1, "Expected the response in several chunks"
+    print(f"✅ Streaming successful")
+    print(f"   Chunks: {len(chunks)}")
+    print(f"   Response: {''.join(chunks)}\n")
+except Exception as e:
+    print(f"❌ Streaming failed: {e}\n")
+    sys.exit(1)
+
+# ============================================================================
+# TEST 9: Async Invocation Through The Rate Limiter
+# ============================================================================
+print("Test 9: Testing async invocation with priorities...")
+try:
+    import asyncio
+    from src.llm.rate_limiter import Priority
+    
+    async def ask_concurrently():
+        return await asyncio.gather(
+            llm.ainvoke("You are a helpful assistant.", "Name one planet.", priority=Priority.BATCH),
+            llm.ainvoke("You are a helpful assistant.", "Name one color.", priority=Priority.INTERACTIVE),
+            llm.ainvoke_with_json("Return JSON only.", 'Return JSON: {"ok": true}')
+        )
+    
+    planet, color, payload = asyncio.run(ask_concurrently())
+    assert planet and color, "Expected text answers"
+    assert isinstance(payload, dict), "Expected a parsed JSON dict"
+    print(f"✅ Async invocation successful")
+    print(f"   Answers: {planet!r}, {color!r}, {payload}")
+    print(f"   Limiter: {llm.limiter.stats()}\n")
+except Exception as e:
+    print(f"❌ Async invocation failed: {e}\n")
+    sys.exit(1)
+
+# ============================================================================
+# TEST 10: Tolerant JSON Extraction
+# ============================================================================
+print("Test 10: Testing tolerant JSON extraction...")
+try:
+    from src.llm.json_parser import extract_json
+    
+    samples = {
+        'code fence': '```json\n{"subtopics": ["a"], "search_queries": ["q"]}\n```',
+        'prose around': 'Here is the plan: {"subtopics": ["a"], "search_queries": ["q"]} Good luck!',
+        'trailing comma': '{"subtopics": ["a",], "search_queries": ["q"],}',
+        'truncated': '{"subtopics": ["a"], "search_queries": ["q", "r',
+    }
+    for label, text in samples.items():
+        parsed = extract_json(text)
+        assert parsed['subtopics'] == ["a"], f"{label}: wrong subtopics {parsed}"
+        assert parsed['search_queries'][0] == "q", f"{label}: wrong queries {parsed}"
+        print(f"   {label}: {parsed}")
+    print(f"✅ Tolerant JSON extraction works\n")
+except Exception as e:
+    print(f"❌ Tolerant JSON extraction failed: {e}\n")
+    sys.exit(1)
+
+# ============================================================================
+# TEST 11: Retries For Transient Errors And Rate-Limited Streams
+# ============================================================================
+print("Test 11: Testing retries of transient errors and 429s...")
+try:
+    import httpx
+    import openai
+    from types import SimpleNamespace
+    from src.llm.client import LLMClient
+    from src.utils.config import settings
+    
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    rate_limited = openai.RateLimitError(
+        "rate limited", response=httpx.Response(429, headers={'retry-after-ms': '50'}, request=request), body=None
+    )
+    
+    class FlakyModel:
+        """Fails with the given errors, then answers."""
+        def __init__(self, errors):
+            self.errors = list(errors)
+        
+        def invoke(self, messages, **kwargs):
+            if self.errors:
+                raise self.errors.pop(0)
+            return SimpleNamespace(content="ok", response_metadata={})
+        
+        def stream(self, messages, **kwargs):
+            if self.errors:
+                raise self.errors.pop(0)
+            yield SimpleNamespace(content="o")
+            yield SimpleNamespace(content="k")
+    
+    flaky = LLMClient(name="flaky")
+    flaky.llm = FlakyModel([openai.APIConnectionError(request=request), rate_limited])
+    assert flaky.invoke("system", "user") == "ok", "Invoke not retried"
+    
+    flaky.llm = FlakyModel([rate_limited, openai.APITimeoutError(request=request)])
+    assert "".join(flaky.stream("system", "user")) == "ok", "Stream not retried"
+    
+    flaky.llm = FlakyModel([ValueError("bad request")])
+    try:
+        flaky.invoke("system", "user")
+        raise AssertionError("Non-transient error was retried")
+    except ValueError:
+        pass
+    print(f"✅ Transient errors and 429s retried (max {settings.llm_max_retries}), others raised\n")
+except Exception as e:
+    print(f"❌ Retry test failed: {e}\n")
+    sys.exit(1)
+
+# ============================================================================
+# TEST 12: JSON Calls Through The Real Chat Model Payload
+# ============================================================================
+print("Test 12: Testing JSON calls with the installed langchain-openai/openai...")
+try:
+    import json as json_lib
+    from langchain_openai import ChatOpenAI
+    from src.llm.client import _structured_output_supported
+    from src.llm.prompts import PLAN_SCHEMA
+    
+    sent = []
+    
+    def fake_api(request):
+        """Answer chat completions with a chatty, fenced plan."""
+        sent.append(json_lib.loads(request.content))
+        content = 'Sure!\n```json\n{"subtopics": ["a"], "search_queries": ["q"]}\n```'
+        return httpx.Response(200, json={
+            'id': 'x', 'object': 'chat.completion', 'created': 0, 'model': settings.llm_model,
+            'choices': [{'index': 0, 'finish_reason': 'stop',
+                         'message': {'role': 'assistant', 'content': content}}],
+            'usage': {'prompt_tokens': 10, 'completion_tokens': 10, 'total_tokens': 20}
+        })
+    
+    offline = LLMClient(name="payload")
+    offline.llm = ChatOpenAI(
+        model=settings.llm_model,
+        openai_api_key="sk-test",
+        max_retries=0,
+        http_client=httpx.Client(transport=httpx.MockTransport(fake_api))
+    )
+    
+    original_mode = settings.llm_json_mode
+    try:
+        for mode in ('off', 'json_schema', 'json_object'):
+            settings.llm_json_mode = mode
+            plan = offline.invoke_with_json("You are a research planner.", "Plan: solar", schema=PLAN_SCHEMA)
+            assert plan['subtopics'] == ["a"], f"{mode}: wrong plan {plan}"
+            expect_format = mode != 'off' and _structured_output_supported()
+            assert ('response_format' in sent[-1]) == expect_format, f"{mode}: unexpected payload {sent[-1]}"
+            print(f"   {mode}: response_format={'response_format' in sent[-1]}")
+    finally:
+        settings.llm_json_mode = original_mode
+    print("✅ JSON calls work with the installed SDK versions\n")
+except Exception as e:
+    print(f"❌ JSON payload test failed: {e}\n")
+    sys.exit(1)
+
 # ============================================================================
 # SUMMARY
 # ============================================================================
@@ -158,6 +320,11 @@ print("  ✓ LLM client initializes")
 print("  ✓ invoke() method works")
 print("  ✓ invoke_with_json() method works")
 print("  ✓ Prompt templates format correctly")
+print("  ✓ Transient errors and 429s are retried, streams included")
+print("  ✓ JSON calls build a payload the installed SDKs accept")
 print("  ✓ Real planner-style JSON call works")
+print("  ✓ stream() method works")
+print("  ✓ ainvoke() / ainvoke_with_json() work through the rate limiter")
+print("  ✓ Malformed JSON responses are repaired locally")
 print("\nReady to move to Layer 2 (Tools)! 🚀")
 print("="*70 + "\n")
\ No newline at end of file
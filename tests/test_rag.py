@@ -22,6 +22,15 @@ try:
     print("✅ Embedding function created")
     print(f"   Type: {type(embedding_fn)}")
     
+    if embedding_fn.cache:
+        sample = ["Embedding cache check: the same text is embedded only once."]
+        first = embedding_fn(sample)
+        hits_before = embedding_fn.cache.stats()['hits']
+        second = embedding_fn(sample)
+        assert embedding_fn.cache.stats()['hits'] == hits_before + 1, "Repeat text missed the cache"
+        assert len(first[0]) == len(second[0]), "Cached vector has wrong dimension"
+        print(f"✅ Embedding cache hit on repeat ({len(second[0])} dims)")
+    
 except Exception as e:
     print(f"❌ Embeddings test failed: {e}")
     import traceback
@@ -64,6 +73,16 @@ try:
     store.add_documents(test_collection, test_chunks)
     print("✅ Documents added")
     
+    # Re-adding is idempotent; only the new chunk is stored
+    extra_chunk = {
+        'text': 'Robotic surgery systems assist surgeons with precise movements.',
+        'metadata': {'url': 'https://example.com/robots', 'source': 'web', 'chunk_index': 0}
+    }
+    store.add_documents(test_collection, test_chunks + [extra_chunk])
+    count = store.client.get_collection(test_collection).count()
+    assert count == len(test_chunks) + 1, f"Expected {len(test_chunks) + 1} chunks, got {count}"
+    print(f"✅ Re-add skipped existing chunks ({count} stored)")
+    
     # Query collection
     test_query = "How is AI used in medical diagnosis?"
     print(f"\n🔍 Querying: '{test_query}'")
@@ -145,6 +164,16 @@ try:
         print(f"✅ Retrieved {len(chunks)} chunks")
         print(f"   First chunk preview: {chunks[0][:80]}...")
     
+    # Batched retrieval matches one-at-a-time retrieval
+    print(f"\n🔍 Batched retrieval for {len(test_queries)} queries")
+    batched = retriever.retrieve_many(test_queries, test_session, top_k=3)
+    assert len(batched) == len(test_queries), f"Expected {len(test_queries)} result lists, got {len(batched)}"
+    for query, hits in zip(test_queries, batched):
+        assert [hit['text'] for hit in hits] == retriever.retrieve(query, test_session, top_k=3), \
+            f"Batched results differ for '{query}'"
+        assert all('distance' in hit and 'metadata' in hit for hit in hits), "Hit missing score or metadata"
+    print(f"✅ Batched results match single queries (best distance {batched[0][0]['distance']:.3f})")
+    
     # Cleanup
     print(f"\n🗑️  Deleting test session")
     retriever.delete_session(test_session)
@@ -219,6 +248,109 @@ except Exception as e:
     traceback.print_exc()
     sys.exit(1)
 
+# Test 5: Collection Lifecycle
+print("\n[TEST 5] Testing collection lifecycle GC...")
+print("="*80)
+try:
+    import os
+    import tempfile
+    import chromadb
+    from src.rag.lifecycle import CollectionManager
+    
+    # Separate store so the GC can't touch real sessions
+    gc_dir = tempfile.mkdtemp()
+    lifecycle = CollectionManager(chromadb.PersistentClient(path=gc_dir), persist_dir=gc_dir)
+    lifecycle.max_collections = 2
+    
+    for i in range(3):
+        lifecycle.client.create_collection(f"gc_test_{i}")
+        lifecycle.touch(f"gc_test_{i}", force=True)
+    
+    # An index directory Chroma doesn't list yet (e.g. a collection being
+    # created concurrently) must survive the pass
+    in_flight = os.path.join(gc_dir, str(uuid.uuid4()))
+    os.makedirs(in_flight)
+    
+    # Oldest access should be evicted first
+    lifecycle._conn.execute("UPDATE collections SET accessed_at = 0 WHERE name = 'gc_test_1'")
+    result = lifecycle.collect_garbage()
+    remaining = sorted(c.name for c in lifecycle.client.list_collections())
+    
+    assert result['evicted'] == 1, f"Expected 1 eviction, got {result}"
+    assert remaining == ["gc_test_0", "gc_test_2"], f"Wrong collection evicted: {remaining}"
+    assert os.path.isdir(in_flight), "GC removed an index directory it didn't evict"
+    print(f"✅ Evicted least recently used collection: {result}")
+    print(f"   Stats: {lifecycle.stats()}")
+
+except Exception as e:
+    print(f"❌ Lifecycle test failed: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
+
+# Test 6: Shared Corpus Mode
+print("\n[TEST 6] Testing shared corpus mode...")
+print("="*80)
+try:
+    from src.rag.vector_store import VectorStore
+    from src.utils.config import settings
+    
+    # Separate store in shared mode
+    original = (settings.vector_store_mode, settings.chroma_persist_dir)
+    settings.vector_store_mode, settings.chroma_persist_dir = 'shared', tempfile.mkdtemp()
+    try:
+        shared_store = VectorStore()
+    finally:
+        settings.vector_store_mode, settings.chroma_persist_dir = original
+    
+    common = {'text': "Solar panels convert sunlight into electricity.", 'metadata': {'source': 'a'}}
+    only_b = {'text': "Wind turbines generate power from moving air.", 'metadata': {'source': 'b'}}
+    shared_store.create_collection("shared_a")
+    shared_store.add_documents("shared_a", [common])
+    shared_store.create_collection("shared_b")
+    shared_store.add_documents("shared_b", [common, only_b])
+    
+    corpus = shared_store._corpus_collection()
+    assert corpus.count() == 2, f"Common chunk stored twice: {corpus.count()}"
+    results_a = shared_store.query_collection("shared_a", "renewable energy", top_k=5)
+    assert results_a == [common['text']], f"Session filter leaked chunks: {results_a}"
+    hit = shared_store.query_many("shared_b", ["renewable energy"], top_k=5)[0][0]
+    assert not any(key.startswith("session:") for key in hit['metadata']), \
+        f"Session keys leaked into hit metadata: {hit['metadata']}"
+    assert settings.embedding_model == corpus.metadata['embedding_model'], \
+        f"Corpus not keyed by embedding model: {corpus.name} {corpus.metadata}"
+    print("✅ Common chunk embedded once, queries scoped per session")
+    
+    shared_store.delete_collection("shared_a")
+    assert shared_store.query_many("shared_a", ["renewable energy"]) == [[]], \
+        "Released session still returns chunks"
+    assert "shared_a" not in shared_store.lifecycle.tracked(), "Read re-tracked a released session"
+    assert not shared_store.has_collection("shared_a"), "Released session still reported present"
+    results_b = shared_store.query_collection("shared_b", "renewable energy", top_k=5)
+    assert len(results_b) == 2, f"Releasing one session removed another's chunks: {results_b}"
+    
+    # Same text reached through different URLs: each session cites its own page
+    mirrored = "Heat pumps move heat instead of generating it."
+    for session, url in (("shared_c", "https://example.com/heat"), ("shared_d", "https://mirror.example.org/heat")):
+        shared_store.create_collection(session)
+        shared_store.add_documents(session, [{'text': mirrored, 'metadata': {'url': url, 'title': session}}])
+    for session, url in (("shared_c", "https://example.com/heat"), ("shared_d", "https://mirror.example.org/heat")):
+        hit = shared_store.query_many(session, ["heat pumps"], top_k=1)[0][0]
+        assert hit['text'] == mirrored and hit['url'] == url and hit['title'] == session, \
+            f"{session} got another session's source: {hit['url']}"
+    print("✅ Shared chunks carry each session's own URL")
+    
+    for session in ("shared_b", "shared_c", "shared_d"):
+        shared_store.delete_collection(session)
+    assert corpus.count() == 0, "Unreferenced chunks left in the corpus"
+    print("✅ Released sessions delete only unreferenced chunks")
+
+except Exception as e:
+    print(f"❌ Shared corpus test failed: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
+
 # Summary
 print("\n" + "="*80)
 print("✅ ALL LAYER 3 TESTS PASSED!")
@@ -228,5 +360,7 @@ print("  ✅ Embeddings - OpenAI embedding function")
 print("  ✅ VectorStore - ChromaDB operations")
 print("  ✅ Retriever - High-level RAG interface")
 print("  ✅ Full Pipeline - Store → Query → Retrieve")
+print("  ✅ Lifecycle - LRU / TTL collection GC")
+print("  ✅ Shared Corpus - Deduplicated chunks, per-session filtering")
 print("\n🚀 Ready for Layer 4 (Agents)!")
 print("="*80)
\ No newline at end of file
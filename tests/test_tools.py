@@ -47,6 +47,11 @@ try:
         print(f"   Title: {results[0].get('title', 'N/A')[:80]}...")
         print(f"   Score: {results[0].get('score', 'N/A')}")
         test_urls = [r['url'] for r in results[:2]]
+        
+        if search.cache:
+            repeat = search.search(f"  {test_query.upper()}? ")
+            assert [r['url'] for r in repeat] == [r['url'] for r in results], "Cached results differ"
+            print(f"✅ Repeated query served from cache: {search.cache_stats()}")
     else:
         print("❌ Search returned no results")
         sys.exit(1)
@@ -84,6 +89,16 @@ try:
         else:
             print("❌ Both URLs failed")
             sys.exit(1)
+    
+    print(f"\n🕷️  Scraping {len(test_urls)} URLs concurrently...")
+    batch = scraper.scrape_multiple(test_urls)
+    assert list(batch.keys()) == test_urls, "scrape_multiple must return every requested URL"
+    print(f"✅ Batch scrape returned {sum(1 for v in batch.values() if v)}/{len(test_urls)} pages")
+    
+    if scraper.cache:
+        cached = [scraper.cache.lookup(u) for u in test_urls]
+        assert any(c and c['text'] == test_content for c in cached), "Scraped page was not cached"
+        print(f"✅ Page cache serving {scraper.cache.store.stats()['size']} pages")
 except Exception as e:
     print(f"❌ WebScraper test failed: {e}")
     import traceback
@@ -114,6 +129,31 @@ except Exception as e:
     traceback.print_exc()
     sys.exit(1)
 
+# Test 5: URL normalization
+print("\n" + "="*80)
+print("[TEST 5] Testing URL normalization...")
+print("="*80)
+try:
+    from src.tools.urls import normalize_url
+    
+    variants = [
+        "https://example.com/article",
+        "http://www.example.com/article/",
+        "https://EXAMPLE.com:443/article?utm_source=news&utm_medium=email",
+        "https://example.com/article#comments"
+    ]
+    normalized = {normalize_url(u) for u in variants}
+    assert len(normalized) == 1, f"Expected one canonical URL, got {normalized}"
+    assert normalize_url("https://example.com/a?b=2&a=1") == normalize_url("https://example.com/a?a=1&b=2")
+    assert normalize_url("https://example.com/a?id=1") != normalize_url("https://example.com/a?id=2")
+    
+    print(f"✅ {len(variants)} variants normalized to: {normalized.pop()}")
+except Exception as e:
+    print(f"❌ URL normalization test failed: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
+
 # Summary
 print("\n" + "="*80)
 print("✅ ALL LAYER 2 TESTS PASSED!")
@@ -122,5 +162,6 @@ print("\nLayer 2 (Tools) working:")
 print("  ✅ TavilySearch")
 print("  ✅ WebScraper")
 print("  ✅ DocumentParser")
+print("  ✅ URL normalization")
 print("\n🚀 Ready for Layer 3 (RAG)!")
 print("="*80)
\ No newline at end of file